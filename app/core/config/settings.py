@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     EMAIL_HOST_PASSWORD: str = "zfrr wwru xeru rbhf"
     EMAIL_USE_TLS: bool = True
     DEFAULT_FROM_EMAIL: str = "Sahara Team <saharaai.noreply@gmail.com>"
+    EMAIL_RATE_PER_MINUTE: int = 20
 
     # File upload settings
     UPLOAD_DIR: str = "uploads"
@@ -1,52 +1,160 @@
 import smtplib
+import heapq
+import itertools
+import logging
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formatdate
-import traceback
 
-# Email configuration
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
-EMAIL_HOST_USER = "saharaai.noreply@gmail.com"
-EMAIL_HOST_PASSWORD = "zfrr wwru xeru rbhf"
-EMAIL_USE_TLS = True
-DEFAULT_FROM_EMAIL = "Sahara Team <saharaai.noreply@gmail.com>"
+from app.core.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Outbox tuning, the rate limit keeps bursts under the provider's quota
+MAIL_MAX_ATTEMPTS = 5
+MAIL_BACKOFF_SECONDS = 30  # doubled after every failed attempt
+MAIL_BACKOFF_MAX_SECONDS = 3600
+MAIL_IDLE_SECONDS = 60  # close the pooled SMTP session after this long without mail
+MAIL_SMTP_TIMEOUT = 30
+
+
+class MailOutbox:
+    """
+    In-memory outbox delivered by one background thread
+
+    The thread keeps a single authenticated SMTP session open while there is
+    mail, waits between messages to respect EMAIL_RATE_PER_MINUTE and retries
+    transient failures with exponential backoff. Queued mail is lost if the
+    process exits before it was delivered.
+    """
+    def __init__(self):
+        self.queue = []  # heap of (due, seq, attempts, to_email, subject, html_content)
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.smtp = None
+        self.smtp_used_at = 0.0
+        self.next_send_at = 0.0
+
+    def put(self, to_email: str, subject: str, html_content: str, attempts: int = 0, delay: float = 0.0):
+        with self.condition:
+            heapq.heappush(self.queue, (time.monotonic() + delay, next(self.counter), attempts, to_email, subject, html_content))
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="mail-outbox", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def take(self):
+        """Wait for the next due message, closing an idle SMTP session meanwhile"""
+        while True:
+            with self.condition:
+                now = time.monotonic()
+                if self.queue and self.queue[0][0] <= now:
+                    return heapq.heappop(self.queue)
+                timeout = self.queue[0][0] - now if self.queue else MAIL_IDLE_SECONDS
+                idle = self.smtp is not None and now - self.smtp_used_at >= MAIL_IDLE_SECONDS
+                if not idle:
+                    self.condition.wait(min(timeout, MAIL_IDLE_SECONDS))
+                    continue
+            # Outside the lock, quitting may take a network round trip
+            self.close_smtp()
+
+    def run(self):
+        while True:
+            _, _, attempts, to_email, subject, html_content = self.take()
+            interval = 60.0 / get_settings().EMAIL_RATE_PER_MINUTE
+            wait = self.next_send_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.next_send_at = time.monotonic() + interval
+
+            error, permanent = self.deliver(to_email, subject, html_content)
+            attempts += 1
+            if error is None:
+                continue
+            if permanent or attempts >= MAIL_MAX_ATTEMPTS:
+                logger.warning("Giving up on email to %s: %s", to_email, error)
+                continue
+            backoff = min(MAIL_BACKOFF_SECONDS * 2 ** (attempts - 1), MAIL_BACKOFF_MAX_SECONDS)
+            self.put(to_email, subject, html_content, attempts=attempts, delay=backoff)
+
+    def connect(self):
+        if self.smtp is None:
+            settings = get_settings()
+            smtp = smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=MAIL_SMTP_TIMEOUT)
+            try:
+                if settings.EMAIL_USE_TLS:
+                    smtp.starttls()
+                if settings.EMAIL_HOST_PASSWORD:
+                    smtp.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
+            except Exception:
+                smtp.close()
+                raise
+            self.smtp = smtp
+        return self.smtp
+
+    def close_smtp(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except Exception:
+                self.smtp.close()
+            self.smtp = None
+
+    def deliver(self, to_email: str, subject: str, html_content: str):
+        """Returns (None, False) when sent, otherwise (error message, whether retrying is pointless)"""
+        settings = get_settings()
+        msg = MIMEMultipart()
+        msg['From'] = settings.DEFAULT_FROM_EMAIL
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg['Date'] = formatdate(localtime=True)
+        msg.attach(MIMEText(html_content, 'html'))
+        message = msg.as_string()
+
+        # A pooled session may have been dropped by the server, reconnect once
+        for reconnect in (False, True):
+            try:
+                self.connect().sendmail(settings.EMAIL_HOST_USER, [to_email], message)
+                self.smtp_used_at = time.monotonic()
+                return None, False
+            except smtplib.SMTPServerDisconnected as e:
+                self.close_smtp()
+                if reconnect:
+                    return f"Disconnected: {str(e)}", False
+            except smtplib.SMTPRecipientsRefused as e:
+                try:
+                    self.smtp.rset()
+                except Exception:
+                    self.close_smtp()
+                return f"Recipient refused: {e.recipients}", True
+            except smtplib.SMTPResponseException as e:
+                self.close_smtp()
+                permanent = e.smtp_code >= 500 and isinstance(e, smtplib.SMTPDataError)
+                return f"SMTP {e.smtp_code}: {e.smtp_error!r}", permanent
+            except (smtplib.SMTPException, OSError) as e:
+                self.close_smtp()
+                return f"{type(e).__name__}: {str(e)}", False
+
+
+outbox = MailOutbox()
 
 def send_email(to_email: str, subject: str, html_content: str) -> bool:
     """
-    Send an HTML email using SMTP
+    Queue an HTML email for background delivery
     
     Args:
         to_email: Recipient email address
         subject: Email subject
         html_content: HTML body of the email
+
+    Returns:
+        True once the message is queued, delivery happens on the outbox thread
     """
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = DEFAULT_FROM_EMAIL
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg['Date'] = formatdate(localtime=True)
-        
-        # Attach HTML content
-        msg.attach(MIMEText(html_content, 'html'))
-        
-        # Connect to SMTP server
-        server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
-        server.set_debuglevel(1)
-        
-        if EMAIL_USE_TLS:
-            server.starttls()
-        
-        server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
-        server.sendmail(EMAIL_HOST_USER, to_email, msg.as_string())
-        server.quit()
-        
-        return True
-    except Exception as e:
-        print(f"Failed to send email: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
-        return False
+    outbox.put(to_email, subject, html_content)
+    return True
 
 def create_otp_email(otp: str, expiry_minutes: int = 10) -> str:
     """
@@ -0,0 +1,16 @@
+"""
+Load tests for main.py
+
+The suite seeds a synthetic course into a local Postgres database, starts
+main.py under uvicorn against it and drives scripted scenarios over HTTP and
+WebSockets. Throughput and p50/p95/p99 latency per endpoint are written as
+JSON, and a run can be compared against a saved baseline.
+
+Usage:
+    python -m benchmarks --database-url postgresql://postgres@localhost/sahara_bench
+    python -m benchmarks --database-url ... --scenarios login_storm,chat_fanout --students 400
+    python -m benchmarks --database-url ... --out run.json --baseline baseline.json
+
+The database is modified (users, teams, submissions, messages are added),
+never point it at a real course.
+"""
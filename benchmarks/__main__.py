@@ -0,0 +1,128 @@
+"""Command line entry point, see benchmarks/__init__.py"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from .recorder import Recorder, compare, format_table
+from .scenarios import SCENARIOS, Context
+from .seed import seed_course
+from .server import REPO_ROOT, Server, prepare_workdir
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run_scenarios(ctx, names):
+    results = {}
+    for name in names:
+        recorder = Recorder(name)
+        print(f"Running {name}...", file=sys.stderr)
+        await SCENARIOS[name](ctx, recorder)
+        results[name] = recorder.summary()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Load-test main.py against a seeded local database")
+    parser.add_argument("--database-url", required=True, help="disposable Postgres database, it is seeded and written to")
+    parser.add_argument("--base-url", help="benchmark an already running server instead of starting uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--workdir", help="working directory of main.py (uploads go here), a temporary one by default")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=40)
+    parser.add_argument("--tas", type=int, default=8)
+    parser.add_argument("--messages", type=int, default=2000, help="chat history the message list endpoints return")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=50, help="simulated clients with a request in flight")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of the polling scenarios")
+    parser.add_argument("--ws-clients", type=int, default=100)
+    parser.add_argument("--chat-messages", type=int, default=50)
+    parser.add_argument("--submission-kb", type=int, default=256)
+    parser.add_argument("--roster-batches", type=int, default=5)
+    parser.add_argument("--roster-size", type=int, default=50)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth over the baseline, 0.2 is +20%%")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    # main.py resolves its upload directories against the working directory
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    workdir = prepare_workdir(args.workdir)
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+
+    print("Seeding course...", file=sys.stderr)
+    layout = seed_course(args.database_url, students=args.students, teams=args.teams, tas=args.tas, messages=args.messages, seed=args.seed)
+    options = {
+        "ws_clients": args.ws_clients,
+        "chat_messages": args.chat_messages,
+        "submission_kb": args.submission_kb,
+        "roster_batches": args.roster_batches,
+        "roster_size": args.roster_size,
+    }
+
+    # Let a SIGTERM (e.g. a CI timeout) run the finally below instead of orphaning uvicorn
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(1))
+    server = None if args.base_url else Server(args.database_url, workdir, port=args.port, workers=args.workers).start()
+    try:
+        ctx = Context(args.base_url or server.base_url, layout, concurrency=args.concurrency, duration=args.duration, options=options)
+        results = asyncio.run(run_scenarios(ctx, names))
+    finally:
+        if server:
+            server.stop()
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "workers": args.workers,
+            "students": args.students,
+            "teams": args.teams,
+            "messages": args.messages,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "options": options,
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2)
+    if out:
+        with open(out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    print(format_table(report), file=sys.stderr)
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Connection checkouts of the create endpoints
+
+The ORM validators on Submittable, Assignable, Announcement and Gradeable used
+to open a session of their own to look up the creator's role, so every create
+held a second pooled connection while the request's session held the first.
+They now read the request's AuthContext instead. This check drives each create
+endpoint in-process and counts pool "checkout" events: a request may check out
+again after a commit, but never while its own connection is still out.
+
+Usage:
+    python -m benchmarks.checkouts --database-url postgresql://postgres@localhost/sahara_bench
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import event
+
+from .seed import seed_course
+from .server import REPO_ROOT, prepare_workdir
+
+
+def create_requests(student_id):
+    """(name, path, form data, files) of every create that runs a creator validator"""
+    return [
+        ("POST /announcements", "/announcements", {"title": "Checkout check", "description": "d"}, None),
+        (
+            "POST /submittables/create", "/submittables/create",
+            {"title": "Checkout check", "deadline": "2099-01-01T00:00:00Z", "description": "d", "max_score": "10"},
+            {"file": ("brief.txt", b"brief", "text/plain")},
+        ),
+        (
+            "POST /assignables/create", "/assignables/create",
+            {"title": "Checkout check", "deadline": "2099-01-01T00:00:00Z", "description": "d", "max_score": "10"},
+            {"file": ("brief.txt", b"brief", "text/plain")},
+        ),
+        (
+            "POST /gradeables/create", "/gradeables/create",
+            {"title": "Checkout check", "max_points": "10"},
+            {"file": ("scores.csv", f"RollNo,score\n{student_id},7\n", "text/csv")},
+        ),
+    ]
+
+
+class CheckoutCounter:
+    """Counts pool checkouts and the most connections out at once"""
+    def __init__(self, engine):
+        self.engine = engine
+        self.out = 0
+        self.reset()
+        event.listen(engine, "checkout", self.on_checkout)
+        event.listen(engine, "checkin", self.on_checkin)
+
+    def reset(self):
+        self.checkouts = 0
+        self.peak = self.out
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        self.out += 1
+        self.peak = max(self.peak, self.out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        self.out -= 1
+
+    def close(self):
+        event.remove(self.engine, "checkout", self.on_checkout)
+        event.remove(self.engine, "checkin", self.on_checkin)
+
+
+def check_checkouts(main, client, layout):
+    """
+    Run every create request once as the seeded professor
+
+    Returns:
+    - one dict per request with its status code, checkouts and peak
+      concurrent checkouts; "ok" is False when the peak exceeds one
+    """
+    login = client.post("/login", data={"username": layout["prof"], "password": layout["password"]})
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    with main.SessionLocal() as db:
+        student_id = db.query(main.User.id).filter(main.User.username == layout["students"][0]).scalar()
+
+    counter = CheckoutCounter(main.engine)
+    results = []
+    try:
+        for name, path, data, files in create_requests(student_id):
+            counter.reset()
+            response = client.post(path, data=data, files=files, headers=headers)
+            results.append({
+                "request": name,
+                "status": response.status_code,
+                "checkouts": counter.checkouts,
+                "peak": counter.peak,
+                "ok": response.status_code < 400 and counter.peak <= 1,
+            })
+    finally:
+        counter.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.checkouts", description="Fail when a create request checks out a second connection")
+    parser.add_argument("--database-url", required=True, help="disposable Postgres database, the benchmark course is seeded into it if missing")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--teams", type=int, default=40)
+    parser.add_argument("--tas", type=int, default=8)
+    parser.add_argument("--workdir", help="working directory of main.py, a temporary one by default")
+    args = parser.parse_args()
+
+    workdir = prepare_workdir(args.workdir)
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+    layout = seed_course(args.database_url, students=args.students, teams=args.teams, tas=args.tas)
+
+    import main as app_module
+    from fastapi.testclient import TestClient
+
+    # Not entered as a context manager: the startup hooks would start the mail
+    # sender, whose outbox polling would count as a second connection
+    results = check_checkouts(app_module, TestClient(app_module.app), layout)
+
+    for result in results:
+        print(f"{'ok' if result['ok'] else 'FAIL':<5} {result['request']:<28} status={result['status']} checkouts={result['checkouts']} peak={result['peak']}")
+    failures = [result for result in results if not result["ok"]]
+    if failures:
+        print(f"{len(failures)} of {len(results)} create requests failed or held a second connection", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Query-plan regression checks
+
+Runs EXPLAIN (no ANALYZE, nothing is executed) on the lookups the hot
+endpoints make, against the seeded benchmark course, and fails when a plan
+falls back to a sequential scan of a table large enough for that to matter.
+Parameters are sampled from the data so the planner sees realistic values.
+
+Usage:
+    python -m benchmarks.query_plans --database-url postgresql://postgres@localhost/sahara_bench
+    python -m benchmarks.query_plans --database-url ... --students 2000 --messages 100000 --verbose
+"""
+import argparse
+import json
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+
+from .seed import seed_course
+from .server import REPO_ROOT, prepare_workdir
+
+# (name, query as the endpoint issues it, query returning one row of its parameters)
+HOT_QUERIES = [
+    (
+        "channel messages",
+        "SELECT * FROM messages WHERE channel_id = :channel_id ORDER BY created_at",
+        "SELECT id AS channel_id FROM channels WHERE type = 'team' ORDER BY id LIMIT 1",
+    ),
+    (
+        "team channel",
+        "SELECT * FROM channels WHERE type = 'team' AND team_id = :team_id",
+        "SELECT id AS team_id FROM teams ORDER BY id LIMIT 1",
+    ),
+    (
+        "team submission",
+        "SELECT * FROM submissions WHERE team_id = :team_id AND submittable_id = :submittable_id",
+        "SELECT team_id, submittable_id FROM submissions ORDER BY id LIMIT 1",
+    ),
+    (
+        "team submissions",
+        "SELECT * FROM submissions WHERE team_id = :team_id",
+        "SELECT team_id FROM submissions ORDER BY id LIMIT 1",
+    ),
+    (
+        "student assignment",
+        "SELECT * FROM assignments WHERE user_id = :user_id AND assignable_id = :assignable_id",
+        "SELECT user_id, assignable_id FROM assignments ORDER BY id LIMIT 1",
+    ),
+    (
+        "student assignments",
+        "SELECT * FROM assignments WHERE user_id = :user_id",
+        "SELECT user_id FROM assignments ORDER BY id LIMIT 1",
+    ),
+    (
+        "gradeable score",
+        "SELECT * FROM gradeable_scores WHERE gradeable_id = :gradeable_id AND user_id = :user_id",
+        "SELECT gradeable_id, user_id FROM gradeable_scores ORDER BY id LIMIT 1",
+    ),
+    (
+        "student gradeable scores",
+        "SELECT * FROM gradeable_scores WHERE user_id = :user_id",
+        "SELECT user_id FROM gradeable_scores ORDER BY id LIMIT 1",
+    ),
+    (
+        "form response",
+        "SELECT * FROM form_responses WHERE form_id = :form_id AND user_id = :user_id",
+        "SELECT form_id, user_id FROM form_responses ORDER BY id LIMIT 1",
+    ),
+    (
+        "student form responses",
+        "SELECT * FROM form_responses WHERE user_id = :user_id",
+        "SELECT user_id FROM form_responses ORDER BY id LIMIT 1",
+    ),
+    (
+        "feedback submission",
+        "SELECT * FROM feedback_submissions WHERE submitter_id = :submitter_id AND team_id = :team_id",
+        "SELECT submitter_id, team_id FROM feedback_submissions ORDER BY id LIMIT 1",
+    ),
+    (
+        "feedback details",
+        "SELECT * FROM feedback_details WHERE submission_id = :submission_id",
+        "SELECT submission_id FROM feedback_details ORDER BY id LIMIT 1",
+    ),
+    (
+        "team TAs",
+        "SELECT * FROM team_tas WHERE team_id = :team_id",
+        "SELECT team_id FROM team_tas ORDER BY id LIMIT 1",
+    ),
+    (
+        "TA teams",
+        "SELECT * FROM team_tas WHERE ta_id = :ta_id",
+        "SELECT ta_id FROM team_tas ORDER BY id LIMIT 1",
+    ),
+    (
+        "team users",
+        "SELECT * FROM users WHERE team_id = :team_id",
+        "SELECT team_id FROM users WHERE team_id IS NOT NULL ORDER BY id LIMIT 1",
+    ),
+    (
+        "user teams",
+        "SELECT teams.* FROM teams JOIN team_members ON team_members.team_id = teams.id WHERE team_members.user_id = :user_id",
+        "SELECT user_id FROM team_members ORDER BY user_id LIMIT 1",
+    ),
+    (
+        "student gradebook",
+        "SELECT * FROM gradebook_entries WHERE user_id = :user_id",
+        "SELECT user_id FROM gradebook_entries ORDER BY user_id LIMIT 1",
+    ),
+]
+
+
+def plan_nodes(node):
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def check_plans(connection, min_rows):
+    """
+    EXPLAIN every hot query
+
+    A plan fails when it has a Seq Scan on a table with at least `min_rows`
+    rows according to pg_class; smaller tables are cheaper to scan than to
+    index, so the planner is free to pick either.
+
+    Returns:
+    - one dict per query with its name, status ("ok", "seq scan" or "no data"),
+      the offending tables and the plan
+    """
+    table_rows = dict(connection.execute(text(
+        "SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+    )).all())
+    results = []
+    for name, query, sample in HOT_QUERIES:
+        params = connection.execute(text(sample)).mappings().first()
+        if params is None:
+            results.append({"query": name, "status": "no data", "seq_scans": [], "plan": None})
+            continue
+        plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), dict(params)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]["Plan"]
+        seq_scans = sorted({
+            node["Relation Name"] for node in plan_nodes(plan)
+            if node["Node Type"] == "Seq Scan" and table_rows.get(node["Relation Name"], 0) >= min_rows
+        })
+        results.append({
+            "query": name,
+            "status": "seq scan" if seq_scans else "ok",
+            "seq_scans": seq_scans,
+            "plan": plan,
+        })
+    return results
+
+
+def format_plan(node, depth=0):
+    """Indented one-line-per-node rendering of a JSON plan"""
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        label += f" on {node['Relation Name']}"
+    lines = [f"{'  ' * depth}{label}  (rows={node.get('Plan Rows')}, cost={node.get('Total Cost')})"]
+    for child in node.get("Plans", []):
+        lines.append(format_plan(child, depth + 1))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.query_plans", description="Fail when hot queries regress to sequential scans")
+    parser.add_argument("--database-url", required=True, help="disposable Postgres database, the benchmark course is seeded into it if missing")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--teams", type=int, default=400)
+    parser.add_argument("--tas", type=int, default=40)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-rows", type=int, default=1000, help="tables smaller than this may be scanned")
+    parser.add_argument("--workdir", help="working directory of main.py while seeding, a temporary one by default")
+    parser.add_argument("--out", help="write the JSON results here")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only the failing ones")
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out) if args.out else None
+    workdir = prepare_workdir(args.workdir)
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(workdir)
+
+    # Importing main during seeding also runs its startup migrations, so the indexes under test exist
+    print("Seeding course...", file=sys.stderr)
+    seed_course(args.database_url, students=args.students, teams=args.teams, tas=args.tas, messages=args.messages, seed=args.seed)
+
+    engine = create_engine(args.database_url)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("ANALYZE"))
+            results = check_plans(connection, args.min_rows)
+            connection.rollback()
+    finally:
+        engine.dispose()
+
+    for result in results:
+        print(f"{result['status']:<9} {result['query']}" + (f"  ({', '.join(result['seq_scans'])})" if result["seq_scans"] else ""))
+        if result["plan"] and (args.verbose or result["seq_scans"]):
+            print(format_plan(result["plan"], depth=5))
+    if out:
+        with open(out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failures = [result for result in results if result["status"] == "seq scan"]
+    if failures:
+        print(f"{len(failures)} of {len(results)} hot queries use a sequential scan", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Latency recording and the machine-readable report"""
+import math
+import time
+from collections import defaultdict
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Collects (latency, ok) samples per endpoint for one scenario"""
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def add(self, endpoint, seconds, status=None, ok=True):
+        self.samples[endpoint].append(seconds)
+        if status is not None:
+            self.statuses[endpoint][str(status)] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    async def request(self, client, method, url, endpoint=None, expect=(200, 201), **kwargs):
+        """
+        Send one request through an httpx.AsyncClient and record it
+
+        Parameters:
+        - endpoint: label to aggregate under, defaults to "METHOD url"; pass the
+          route template for urls with ids in them
+        - expect: status codes counted as success
+
+        Returns:
+        - the response, or None when the request itself failed
+        """
+        endpoint = endpoint or f"{method} {url}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as e:
+            self.add(endpoint, time.perf_counter() - started, status=type(e).__name__, ok=False)
+            return None
+        self.add(endpoint, time.perf_counter() - started, status=response.status_code, ok=response.status_code in expect)
+        return response
+
+    def summary(self):
+        duration = (self.finished or time.perf_counter()) - (self.started or 0)
+        endpoints = {}
+        total = 0
+        for endpoint, values in sorted(self.samples.items()):
+            values = sorted(values)
+            total += len(values)
+            endpoints[endpoint] = {
+                "count": len(values),
+                "errors": self.errors[endpoint],
+                "statuses": dict(self.statuses[endpoint]),
+                "throughput_rps": round(len(values) / duration, 2) if duration > 0 else None,
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+        return {
+            "duration_s": round(duration, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / duration, 2) if duration > 0 else None,
+            "endpoints": endpoints,
+        }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Regressions of a report against a baseline report
+
+    An endpoint regresses when its p95 grew by more than `tolerance` (0.2 is
+    +20%) or it has errors the baseline did not have. Endpoints missing from
+    either side are ignored.
+
+    Returns:
+    - list of human-readable regression descriptions, empty when none
+    """
+    regressions = []
+    for scenario, result in report["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if not base:
+            continue
+        for endpoint, stats in result["endpoints"].items():
+            before = base["endpoints"].get(endpoint)
+            if not before:
+                continue
+            if stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{scenario} {endpoint}: p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms"
+                )
+            if stats["errors"] and not before["errors"]:
+                regressions.append(f"{scenario} {endpoint}: {stats['errors']} errors, baseline had none")
+    return regressions
+
+
+def format_table(report):
+    """Plain-text table of a report for the terminal"""
+    lines = [f"{'scenario / endpoint':<58} {'count':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"]
+    for scenario, result in report["scenarios"].items():
+        lines.append(f"{scenario} ({result['duration_s']}s, {result['throughput_rps']} rps)")
+        for endpoint, stats in result["endpoints"].items():
+            lines.append(
+                f"  {endpoint[:56]:<56} {stats['count']:>6} {stats['errors']:>4} {stats['throughput_rps']:>8} "
+                f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8}"
+            )
+    return "\n".join(lines)
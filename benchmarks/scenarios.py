@@ -0,0 +1,266 @@
+"""
+Scripted load scenarios
+
+Each scenario is an async function taking the shared Context and a Recorder.
+Scenarios that need authenticated users log them in first without recording
+those requests, so they can run in any order or on their own.
+"""
+import asyncio
+import io
+import json
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import websockets
+
+
+class Context:
+    """What the scenarios share: the server, the seeded course and the run options"""
+    def __init__(self, base_url, layout, concurrency=50, duration=30.0, options=None):
+        self.base_url = base_url
+        self.layout = layout
+        self.concurrency = concurrency
+        self.duration = duration
+        self.options = options or {}
+        self.tokens = {}
+
+    def client(self):
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=120,
+            limits=httpx.Limits(max_connections=self.concurrency * 2, max_keepalive_connections=self.concurrency * 2),
+        )
+
+    def forwarded_for(self, username):
+        """A stable fake client IP per user, see Server"""
+        index = zlib.crc32(username.encode())
+        return f"10.{index % 250}.{(index // 250) % 250}.{(index // 62500) % 250 + 1}"
+
+    def auth(self, username):
+        return {"Authorization": f"Bearer {self.tokens[username]}"}
+
+    async def login(self, client, username, recorder=None):
+        kwargs = {
+            "data": {"username": username, "password": self.layout["password"]},
+            "headers": {"X-Forwarded-For": self.forwarded_for(username)},
+        }
+        if recorder:
+            response = await recorder.request(client, "POST", "/login", **kwargs)
+        else:
+            response = await client.post("/login", **kwargs)
+        if response is not None and response.status_code == 200:
+            self.tokens[username] = response.json()["access_token"]
+        return response
+
+    async def ensure_logged_in(self, client, usernames):
+        missing = [username for username in usernames if username not in self.tokens]
+        await bounded(self.concurrency, [self.login(client, username) for username in missing])
+        failed = [username for username in usernames if username not in self.tokens]
+        if failed:
+            raise RuntimeError(f"Could not log in {len(failed)} benchmark users, e.g. {failed[0]}")
+
+
+async def bounded(limit, coroutines):
+    """Run coroutines with at most `limit` in flight"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines))
+
+
+async def login_storm(ctx, rec):
+    """Every student logs in at once, as at the start of a lab session"""
+    async with ctx.client() as client:
+        rec.start()
+        await bounded(ctx.concurrency, [ctx.login(client, username, rec) for username in ctx.layout["students"]])
+        rec.stop()
+
+
+def team_submitters(ctx):
+    """The first student of every team, in team order"""
+    submitters = {}
+    for username in ctx.layout["students"]:
+        submitters.setdefault(ctx.layout["team_of"][username], username)
+    return [submitters[team] for team in sorted(submitters)]
+
+
+async def submission_surge(ctx, rec):
+    """
+    Deadline night: every team uploads its submission while the rest of the
+    class keeps refreshing the submittables page
+    """
+    prof = ctx.layout["prof"]
+    submitters = team_submitters(ctx)
+    pollers = [username for username in ctx.layout["students"] if username not in set(submitters)][:ctx.concurrency]
+    payload = b"x" * (ctx.options.get("submission_kb", 256) * 1024)
+    now = datetime.now(timezone.utc)
+
+    async with ctx.client() as client:
+        await ctx.ensure_logged_in(client, [prof] + submitters + pollers)
+        created = await client.post("/submittables/create", headers=ctx.auth(prof), data={
+            "title": f"Bench deadline {int(time.time())}",
+            "opens_at": (now - timedelta(hours=1)).isoformat(),
+            "deadline": (now + timedelta(hours=1)).isoformat(),
+            "description": "Deadline-night benchmark",
+            "max_score": "100",
+        }, files={"file": ("spec.txt", b"spec", "text/plain")})
+        created.raise_for_status()
+        submittable_id = created.json()["submittable"]["id"]
+
+        stop_at = time.monotonic() + ctx.duration
+
+        async def submit(username):
+            await rec.request(
+                client, "POST", f"/submittables/{submittable_id}/submit",
+                endpoint="POST /submittables/{id}/submit", headers=ctx.auth(username),
+                files={"file": (f"{username}.zip", io.BytesIO(payload), "application/zip")},
+            )
+
+        async def poll(username):
+            while time.monotonic() < stop_at:
+                await rec.request(client, "GET", "/submittables/", headers=ctx.auth(username))
+
+        rec.start()
+        polling = asyncio.gather(*(poll(username) for username in pollers))
+        await bounded(ctx.concurrency, [submit(username) for username in submitters])
+        await polling
+        rec.stop()
+
+        # Keep repeated runs comparable, the deadline submittable is per run
+        await client.delete(f"/submittables/{submittable_id}", headers=ctx.auth(prof))
+
+
+async def dashboard_polling(ctx, rec):
+    """Students sitting on the dashboard, which refreshes its widgets in a loop"""
+    students = ctx.layout["students"][:ctx.concurrency]
+    channel_id = ctx.layout["global_channel_id"]
+    now = datetime.now(timezone.utc)
+    calendar_window = {"from": (now - timedelta(days=7)).isoformat(), "to": (now + timedelta(days=28)).isoformat()}
+    interval = ctx.options.get("poll_interval", 0.0)
+
+    async with ctx.client() as client:
+        await ctx.ensure_logged_in(client, students)
+        stop_at = time.monotonic() + ctx.duration
+
+        async def poll(username):
+            headers = ctx.auth(username)
+            while time.monotonic() < stop_at:
+                await rec.request(client, "GET", "/api/users/me", headers=headers)
+                await rec.request(client, "GET", "/announcements", headers=headers)
+                await rec.request(client, "GET", "/submittables/", headers=headers)
+                await rec.request(client, "GET", "/calendar", headers=headers, params=calendar_window)
+                await rec.request(
+                    client, "GET", f"/discussions/channels/{channel_id}/messages",
+                    endpoint="GET /discussions/channels/{id}/messages", headers=headers,
+                )
+                if interval:
+                    await asyncio.sleep(interval)
+
+        rec.start()
+        await asyncio.gather(*(poll(username) for username in students))
+        rec.stop()
+
+
+async def chat_fanout(ctx, rec):
+    """
+    N students listen on the global channel over WebSockets while one posts
+
+    Besides the POST latency, "WS delivery" records the time from sending a
+    message until each listener has received its broadcast.
+    """
+    listeners = ctx.layout["students"][:ctx.options.get("ws_clients", 100)]
+    sender = ctx.layout["students"][-1]
+    channel_id = ctx.layout["global_channel_id"]
+    message_count = ctx.options.get("chat_messages", 50)
+    ws_base = ctx.base_url.replace("http://", "ws://").replace("https://", "wss://")
+    sent_at = {}
+    pending = {}
+
+    async with ctx.client() as client:
+        await ctx.ensure_logged_in(client, listeners + [sender])
+        sender_id = (await client.get("/api/users/me", headers=ctx.auth(sender))).json()["id"]
+
+        async def listen(connection):
+            async for raw in connection:
+                content = json.loads(raw).get("content", "")
+                if content in sent_at:
+                    rec.add("WS delivery", time.perf_counter() - sent_at[content])
+                    pending[content] -= 1
+                    if pending[content] == 0:
+                        del pending[content]
+
+        connections = []
+        rec.start()
+        try:
+            for username in listeners:
+                started = time.perf_counter()
+                try:
+                    connection = await websockets.connect(f"{ws_base}/discussions/ws/{channel_id}/{ctx.tokens[username]}")
+                except Exception as e:
+                    # The server stopped accepting listeners, fan out to the ones connected so far
+                    rec.add("WS connect", time.perf_counter() - started, status=type(e).__name__, ok=False)
+                    break
+                rec.add("WS connect", time.perf_counter() - started, status=101)
+                connections.append(connection)
+            tasks = [asyncio.create_task(listen(connection)) for connection in connections]
+
+            for i in range(message_count):
+                content = f"bench fan-out {i} {time.time()}"
+                sent_at[content] = time.perf_counter()
+                pending[content] = len(connections)
+                await rec.request(client, "POST", "/discussions/messages", headers=ctx.auth(sender), json={
+                    "content": content,
+                    "channel_id": channel_id,
+                    "sender_id": sender_id,
+                })
+            # Wait for the last broadcasts to arrive
+            drain_until = time.monotonic() + 10
+            while pending and time.monotonic() < drain_until:
+                await asyncio.sleep(0.05)
+            rec.stop()
+            if pending:
+                rec.errors["WS delivery"] += sum(pending.values())
+            for task in tasks:
+                task.cancel()
+        finally:
+            for connection in connections:
+                await connection.close()
+
+
+async def roster_import(ctx, rec):
+    """The professor uploads class rosters, each row creates a student with a bcrypt-hashed password"""
+    prof = ctx.layout["prof"]
+    batches = ctx.options.get("roster_batches", 5)
+    rows_per_batch = ctx.options.get("roster_size", 50)
+    if batches * rows_per_batch > 1000:
+        raise ValueError("roster_batches * roster_size must not exceed 1000")
+    # Roll numbers become user ids, keep each run in its own block of ids
+    base = 1_000_000_000 + (int(time.time()) % 1_000_000) * 1000
+
+    async with ctx.client() as client:
+        await ctx.ensure_logged_in(client, [prof])
+        rec.start()
+        for batch in range(batches):
+            lines = ["RollNo,Name,Email"]
+            for i in range(rows_per_batch):
+                roll = base + batch * rows_per_batch + i
+                lines.append(f"{roll},Roster Student {roll},roster{roll}@bench.invalid")
+            await rec.request(
+                client, "POST", "/upload-students", headers=ctx.auth(prof),
+                files={"file": ("roster.csv", "\n".join(lines).encode(), "text/csv")},
+            )
+        rec.stop()
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "submission_surge": submission_surge,
+    "dashboard_polling": dashboard_polling,
+    "chat_fanout": chat_fanout,
+    "roster_import": roster_import,
+}
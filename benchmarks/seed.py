@@ -0,0 +1,57 @@
+"""
+Synthetic course for the load tests
+
+The course comes from generate_course.py with the bench_ prefix. A database
+that already holds it is reused, so repeated runs measure the same data.
+"""
+import sys
+
+from generate_course import course_usernames, generate, load_main, team_index, PASSWORD
+
+PREFIX = "bench"
+
+
+def course_layout(students, teams, tas, global_channel_id):
+    """What the scenarios need to know about the course, without querying it"""
+    usernames = course_usernames(PREFIX, 1, tas, students)
+    return {
+        "prof": usernames["profs"][0],
+        "tas": usernames["tas"],
+        "students": usernames["students"],
+        "team_of": {username: team_index(i, teams) for i, username in enumerate(usernames["students"])},
+        "password": PASSWORD,
+        "global_channel_id": global_channel_id,
+    }
+
+
+def seed_course(database_url, students=200, teams=40, tas=8, messages=2000, seed=1):
+    """
+    Generate the benchmark course unless it already exists
+
+    Parameters:
+    - database_url: SQLAlchemy URL of a disposable Postgres database
+    - students, teams, tas: course size, students are spread over the teams
+    - messages: chat messages spread over the global and team channels
+    - seed: seed of generate_course.generate
+
+    Returns:
+    - the course layout, see course_layout
+    """
+    main = load_main(database_url)
+    db = main.SessionLocal()
+    try:
+        seeded = db.query(main.User).filter(main.User.username.like(f"{PREFIX}\\_s%")).count()
+        global_channel = db.query(main.Channel).filter(main.Channel.type == "global").first()
+    finally:
+        db.close()
+
+    if seeded:
+        if seeded != students:
+            raise RuntimeError(f"Database already holds a course with {seeded} students, use an empty database for --students {students}")
+        return course_layout(students, teams, tas, global_channel.id)
+
+    course = generate(
+        database_url, students=students, teams=teams, tas=tas, messages=messages, prefix=PREFIX, seed=seed,
+        log=lambda message: print(message, file=sys.stderr),
+    )
+    return course_layout(students, teams, tas, course["global_channel_id"])
@@ -0,0 +1,156 @@
+"""
+Serialization micro-benchmark for the large list payloads
+
+Times turning 10k rows into a JSON body the way each endpoint used to (FastAPI's
+jsonable_encoder or response_model validation, then json.dumps in
+JSONResponse.render) against the precompiled TypeAdapters of serialization.py.
+No database or server is involved, only the serialization step is measured.
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 50000 --repeat 7 --out serialization.json
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+from serialization import (
+    ANNOUNCEMENTS_ADAPTER,
+    GRADEABLE_SCORES_ADAPTER,
+    MESSAGES_ADAPTER,
+    PEOPLE_ADAPTER,
+    SUBMITTABLES_BY_STATUS_ADAPTER,
+)
+
+
+class Show(BaseModel):
+    """main.Show, the response_model of GET /announcements"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    creator_id: int
+    created_at: str
+    title: str
+    content: str
+    url_name: Optional[str] = None
+    creator_name: Optional[str] = None
+
+
+SHOW_LIST = TypeAdapter(List[Show])
+
+
+def render(content):
+    """What JSONResponse does with a route's (already encoded) return value"""
+    return JSONResponse(content).body
+
+
+def returned(rows):
+    """A plain dict/list returned from a route: jsonable_encoder, then render"""
+    return render(jsonable_encoder(rows))
+
+
+def response_model(objects):
+    """An ORM list returned from a response_model=List[Show] route"""
+    return render(SHOW_LIST.dump_python(SHOW_LIST.validate_python(objects, from_attributes=True), mode="json"))
+
+
+def sample_rows(rows, seed):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 6, tzinfo=timezone.utc)
+
+    def stamp(i):
+        return (start + timedelta(seconds=37 * i)).isoformat()
+
+    def words(n):
+        return " ".join(rng.choice(("deadline", "review", "merge", "docker", "slides", "bug", "demo", "über")) for _ in range(n))
+
+    people = [
+        {"id": i, "name": f"Student {i}", "email": f"s{i}@example.edu", "role": rng.choice(("Student", "TA", "Professor"))}
+        for i in range(rows)
+    ]
+    messages = [
+        {
+            "id": i, "content": words(12), "sender_id": rng.randrange(1, 500), "sender_name": f"Student {i % 500}",
+            "channel_id": 1, "created_at": stamp(i), "message_type": "text", "file_name": None,
+        }
+        for i in range(rows)
+    ]
+    scores = [
+        {"id": i, "gradeable_id": 1, "user_id": i, "name": f"Student {i}", "score": rng.randint(0, 20)}
+        for i in range(rows)
+    ]
+    submittables = {"upcoming": [], "open": [], "closed": []}
+    for i in range(rows):
+        submittables[rng.choice(("upcoming", "open", "closed"))].append({
+            "id": i, "title": f"Milestone {i}", "description": words(20), "opens_at": stamp(i), "deadline": stamp(i + 5000),
+            "max_score": 100, "created_at": stamp(i - 5000),
+            "reference_files": [{"file_url": f"uploads/ref_{i}.pdf", "original_filename": "brief.pdf"}],
+        })
+    announcements = [
+        {
+            "id": i, "creator_id": 1, "created_at": stamp(i), "title": f"Announcement {i}", "content": words(40),
+            "url_name": None, "creator_name": "Prof",
+        }
+        for i in range(rows)
+    ]
+    return {
+        # name: (before, after, payload of the old path, payload of the new path)
+        "GET /people/": (returned, PEOPLE_ADAPTER.dump_json, people, people),
+        "GET /discussions/channels/{id}/messages": (returned, MESSAGES_ADAPTER.dump_json, messages, messages),
+        "GET /gradeables/{id}/scores": (render, GRADEABLE_SCORES_ADAPTER.dump_json, scores, scores),
+        "GET /submittables/all": (returned, SUBMITTABLES_BY_STATUS_ADAPTER.dump_json, submittables, submittables),
+        "GET /announcements": (
+            response_model, ANNOUNCEMENTS_ADAPTER.dump_json,
+            [SimpleNamespace(**row) for row in announcements], announcements,
+        ),
+    }
+
+
+def best_of(function, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(payload)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization", description="Serialization cost of the large list payloads")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the fastest is reported")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON results here")
+    args = parser.parse_args()
+
+    results = {}
+    for name, (before, after, old_payload, new_payload) in sample_rows(args.rows, args.seed).items():
+        if json.loads(before(old_payload)) != json.loads(after(new_payload)):
+            raise SystemExit(f"{name}: the two paths produce different JSON")
+        before_s = best_of(before, old_payload, args.repeat)
+        after_s = best_of(after, new_payload, args.repeat)
+        per_10k = 10_000 / args.rows * 1000
+        results[name] = {
+            "before_ms_per_10k": round(before_s * per_10k, 2),
+            "after_ms_per_10k": round(after_s * per_10k, 2),
+            "speedup": round(before_s / after_s, 1),
+        }
+
+    print(f"{'payload':<44} {'before':>10} {'after':>10} {'speedup':>8}   (ms per 10k rows, best of {args.repeat})")
+    for name, stats in results.items():
+        print(f"{name:<44} {stats['before_ms_per_10k']:>10} {stats['after_ms_per_10k']:>10} {stats['speedup']:>7}x")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"rows": args.rows, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
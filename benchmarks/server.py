@@ -0,0 +1,93 @@
+"""Run main.py under uvicorn in a child process for the duration of a benchmark"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNTIME_DIRS = ("uploads", "static", "forums_uploads")  # mounted by main.py at import
+
+
+def prepare_workdir(path=None):
+    """
+    Working directory for main.py, with the directories it serves files from
+
+    Uploads made during a run land here instead of in the checkout.
+    """
+    path = path or tempfile.mkdtemp(prefix="sahara-bench-")
+    for name in RUNTIME_DIRS:
+        os.makedirs(os.path.join(path, name), exist_ok=True)
+    return path
+
+
+class Server:
+    """
+    uvicorn main:app bound to localhost, used as a context manager
+
+    The server trusts X-Forwarded-For so each simulated student gets its own
+    auth rate-limit bucket, as real students behind the reverse proxy do.
+    Its mail sender is off and SMTP points at a closed local port, so
+    nothing a scenario queues (roster credentials, OTPs) is ever delivered.
+    """
+    def __init__(self, database_url, workdir, port=8765, workers=1, env=None):
+        self.database_url = database_url
+        self.workdir = workdir
+        self.port = port
+        self.workers = workers
+        self.extra_env = env or {}
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout=60):
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": self.database_url,
+            "PYTHONPATH": REPO_ROOT,
+            "RATE_LIMIT_TRUSTED_PROXIES": "1",
+            "MAIL_SENDER_ENABLED": "0",
+            "EMAIL_HOST": "127.0.0.1",
+            "EMAIL_PORT": "9",
+            "EMAIL_USE_TLS": "0",
+            "EMAIL_HOST_PASSWORD": "",
+            "LOG_LEVEL": "WARNING",
+        })
+        env.update(self.extra_env)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--workers", str(self.workers), "--no-access-log", "--log-level", "warning"],
+            cwd=self.workdir,
+            env=env,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {self.process.returncode}")
+            try:
+                if httpx.get(f"{self.base_url}/config/team-phase", timeout=1).status_code < 500:
+                    return self
+            except httpx.TransportError:
+                pass
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"uvicorn did not answer on {self.base_url} within {timeout}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
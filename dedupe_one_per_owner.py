@@ -0,0 +1,88 @@
+"""
+One-off cleanup of owners with several rows where the app expects one
+
+Startup only creates the unique indexes of ONE_PER_OWNER_INDEXES (one submission
+per team and submittable, one assignment per student and assignable, ...) when
+no owner has two rows, and logs the owners that do. This lists those rows and,
+with --apply, keeps the newest row of every owner and deletes the older ones,
+together with their feedback details, uploaded files and gradebook rows. Every
+removed row is printed, so keep the output. Restart the app afterwards to
+create the indexes.
+
+Run it from the app's working directory, file_url paths are relative to it.
+
+Usage:
+    python dedupe_one_per_owner.py            # list what would be removed
+    python dedupe_one_per_owner.py --apply
+"""
+import argparse
+import os
+
+from sqlalchemy import text
+
+from main import ONE_PER_OWNER_INDEXES, SessionLocal, duplicate_owner_rows, sync_gradebook_item
+
+# table -> (gradebook item type, column holding the item id), for tables the gradebook reads
+GRADEBOOK_ITEMS = {
+    "submissions": ("submittable", "submittable_id"),
+    "assignments": ("assignable", "assignable_id"),
+    "gradeable_scores": ("gradeable", "gradeable_id"),
+}
+
+
+def dedupe_table(db, table_name, owner_columns, apply: bool) -> int:
+    """Print (and with apply, delete) all but the newest row of every duplicated owner, returns the row count"""
+    duplicates = duplicate_owner_rows(db.connection(), table_name, owner_columns)
+    removed_ids = [row_id for row in duplicates for row_id in row.ids[:-1]]
+    if not removed_ids:
+        return 0
+
+    rows = db.execute(
+        text(f"SELECT * FROM {table_name} WHERE id = ANY(:ids) ORDER BY id"),
+        {"ids": removed_ids}
+    ).mappings().all()
+    for row in rows:
+        print(f"{table_name}: {dict(row)}")
+    if not apply:
+        return len(rows)
+
+    if table_name == "feedback_submissions":
+        db.execute(text("DELETE FROM feedback_details WHERE submission_id = ANY(:ids)"), {"ids": removed_ids})
+    db.execute(text(f"DELETE FROM {table_name} WHERE id = ANY(:ids)"), {"ids": removed_ids})
+    if table_name in GRADEBOOK_ITEMS:
+        item_type, item_column = GRADEBOOK_ITEMS[table_name]
+        for item_id in sorted({row[item_column] for row in rows}):
+            sync_gradebook_item(db, item_type, item_id)
+    db.commit()
+
+    # Only once the rows are gone, a failed commit keeps the files they point to
+    for row in rows:
+        local_path = (row.get("file_url") or "").lstrip("/")
+        if local_path and os.path.exists(local_path):
+            os.remove(local_path)
+            print(f"  removed file {local_path}")
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove older duplicate rows that block the one-per-owner unique indexes")
+    parser.add_argument("--apply", action="store_true", help="delete the listed rows and their files, otherwise only list them")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = 0
+        for table_name, owner_columns, _ in ONE_PER_OWNER_INDEXES:
+            total += dedupe_table(db, table_name, owner_columns, args.apply)
+        if not total:
+            print("No duplicate rows")
+        elif args.apply:
+            print(f"Removed {total} rows, restart the app to create the unique indexes")
+        else:
+            print(f"{total} rows would be removed, rerun with --apply to delete them")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
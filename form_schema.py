@@ -0,0 +1,97 @@
+"""
+JSON schemas for SurveyJS form responses
+
+form_json is a SurveyJS definition; build_form_response_schema turns it into a
+JSON schema for the answers, which main.py compiles with fastjsonschema. The
+schema has to accept everything SurveyJS can send for the definition, so it
+stays loose where SurveyJS is flexible:
+- questions that can be hidden, disabled or made optional by a condition
+  (visibleIf, enableIf, requiredIf, also on an enclosing page or panel) are
+  never required
+- the special items (showNoneItem/hasNone, showRefuseItem, showDontKnowItem)
+  add their values to a choice enum
+- booleans with valueTrue/valueFalse accept those values
+"""
+from typing import Any, Dict, Iterator, List, Optional
+
+CONTAINER_KEYS = ("pages", "elements", "questions", "templateElements")
+NON_QUESTION_TYPES = ("panel", "paneldynamic", "html", "image")
+CONDITION_KEYS = ("visibleIf", "enableIf", "requiredIf")
+
+# (flag(s) on the question, value SurveyJS sends for that item)
+SPECIAL_CHOICES = (
+    (("showNoneItem", "hasNone"), "none"),
+    (("showRefuseItem",), "refused"),
+    (("showDontKnowItem",), "dontknow"),
+)
+
+
+def iter_form_questions(node, conditional: bool = False, with_conditions: bool = False) -> Iterator:
+    """
+    Yield every question element of a SurveyJS definition, descending into pages and panels
+
+    With with_conditions, yield (question, conditional) pairs instead, where
+    conditional tells whether the question or one of its containers has a
+    visibleIf, enableIf or requiredIf.
+    """
+    if isinstance(node, list):
+        for item in node:
+            yield from iter_form_questions(item, conditional, with_conditions)
+        return
+    if not isinstance(node, dict):
+        return
+    conditional = conditional or any(node.get(key) for key in CONDITION_KEYS)
+    if "name" in node and "type" in node and node["type"] not in NON_QUESTION_TYPES:
+        yield (node, conditional) if with_conditions else node
+    for key in CONTAINER_KEYS:
+        if key in node:
+            yield from iter_form_questions(node[key], conditional, with_conditions)
+
+
+def choice_values(question: Dict[str, Any]) -> Optional[List[Any]]:
+    choices = question.get("choices")
+    if not isinstance(choices, list) or not choices or question.get("hasOther") or question.get("showOtherItem") or question.get("choicesByUrl"):
+        return None
+    values = [choice.get("value") if isinstance(choice, dict) else choice for choice in choices]
+    for flags, value in SPECIAL_CHOICES:
+        if any(question.get(flag) for flag in flags) and value not in values:
+            values.append(value)
+    return values
+
+
+def question_answer_schema(question: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON schema for the answer of one SurveyJS question"""
+    question_type = question.get("type")
+    if question_type == "text":
+        if question.get("inputType") in ("number", "range"):
+            return {"type": "number"}
+        return {"type": "string"}
+    if question_type == "comment":
+        return {"type": "string"}
+    if question_type == "boolean":
+        if "valueTrue" in question or "valueFalse" in question:
+            return {"enum": [question.get("valueTrue", True), question.get("valueFalse", False)]}
+        return {"type": "boolean"}
+    if question_type == "rating":
+        if question.get("rateValues"):
+            return {}
+        return {"type": "number"}
+    if question_type in ("radiogroup", "dropdown"):
+        values = choice_values(question)
+        return {"enum": values} if values else {}
+    if question_type in ("checkbox", "tagbox"):
+        values = choice_values(question)
+        return {"type": "array", "items": {"enum": values} if values else {}}
+    # matrices, files, signatures etc. are accepted as-is
+    return {}
+
+
+def build_form_response_schema(form_json: Dict[str, Any]) -> Dict[str, Any]:
+    questions = list(iter_form_questions(form_json, with_conditions=True))
+    return {
+        "type": "object",
+        "properties": {question["name"]: question_answer_schema(question) for question, _ in questions},
+        "required": [question["name"] for question, conditional in questions if question.get("isRequired") and not conditional],
+        # SurveyJS adds keys such as "<name>-Comment" for "other" answers
+        "additionalProperties": True,
+    }
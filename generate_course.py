@@ -0,0 +1,484 @@
+"""
+Generate a synthetic course of any size for benchmarks and query-plan checks
+
+Creates professors, TAs, students, teams (with members, TAs and skills),
+channels and messages, announcements, submittables with submission files,
+assignables with assignments, gradeables with scores, SurveyJS forms with
+responses and peer feedback. Everything is bulk-loaded with COPY in a single
+transaction, so a course with tens of thousands of students takes minutes.
+
+The data only depends on --seed, --anchor and the size options, not on
+--no-files: ids are allocated after the rows already in the database, so an
+empty database always ends up with identical contents. All generated accounts share one password and
+their usernames start with --prefix, so several courses can live side by side.
+
+Usage:
+    python generate_course.py --database-url postgresql://postgres@localhost/sahara_bench
+    python generate_course.py --students 20000 --teams 4000 --tas 60 --messages 500000 --seed 7
+    python generate_course.py --no-files   # rows only, no submission files on disk
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+PASSWORD = "password123"
+SKILL_COLORS = ["#f89820", "#4DB33D", "#339933", "#3776AB", "#61DAFB", "#6DB33F", "#E34F26", "#F7DF1E"]
+WORDS = (
+    "sprint review backlog deploy merge branch schema index query cache latency test fixture mock api "
+    "frontend backend docker login token session upload deadline rubric demo slides report bug fix"
+).split()
+
+FEEDBACK_FORM = {
+    "pages": [{
+        "name": "page1",
+        "elements": [
+            {"type": "rating", "name": "workload", "title": "How was the workload?", "isRequired": True},
+            {"type": "radiogroup", "name": "pace", "title": "Pace of the course", "choices": ["slow", "right", "fast"], "isRequired": True},
+            {"type": "checkbox", "name": "topics", "title": "Topics you liked", "choices": ["design", "testing", "deployment", "teamwork"]},
+            {"type": "comment", "name": "comments", "title": "Anything else?"},
+        ],
+    }],
+}
+
+
+def load_main(database_url=None):
+    """
+    Import main.py, which creates the schema and default rows on first use
+
+    Parameters:
+    - database_url: overrides the DATABASE_URL of constants.py
+    """
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import main
+    return main
+
+
+def course_usernames(prefix, profs, tas, students):
+    return {
+        "profs": [f"{prefix}_prof{i:02d}" for i in range(profs)],
+        "tas": [f"{prefix}_ta{i:03d}" for i in range(tas)],
+        "students": [f"{prefix}_s{i:05d}" for i in range(students)],
+    }
+
+
+def team_index(student_index, teams):
+    """Round-robin assignment keeps team sizes within one of each other"""
+    return student_index % teams
+
+
+def sentence(rng, low=4, high=14):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+class CopyLoader:
+    """
+    Streams rows into tables with COPY ... FROM STDIN (FORMAT csv)
+
+    None is written as an unquoted empty field, which COPY reads as NULL.
+    Rows are sent in chunks so the generated data never has to fit in memory.
+    """
+    def __init__(self, cursor, chunk_rows=50_000):
+        self.cursor = cursor
+        self.chunk_rows = chunk_rows
+        self.counts = {}
+
+    def load(self, table, columns, rows):
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        statement = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+        for row in rows:
+            writer.writerow(row)
+            pending += 1
+            if pending >= self.chunk_rows:
+                self.flush(table, statement, buffer, pending)
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                pending = 0
+        self.flush(table, statement, buffer, pending)
+
+    def flush(self, table, statement, buffer, pending):
+        self.counts[table] = self.counts.get(table, 0) + pending
+        if pending:
+            buffer.seek(0)
+            self.cursor.copy_expert(statement, buffer)
+
+
+class IdAllocator:
+    """Hands out ids after the current MAX(id) of each table, so COPY can set foreign keys up front"""
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.next_ids = {}
+
+    def block(self, table, count):
+        if table not in self.next_ids:
+            self.cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+            self.next_ids[table] = self.cursor.fetchone()[0]
+        start = self.next_ids[table]
+        self.next_ids[table] += count
+        return list(range(start, start + count))
+
+    def reset_sequences(self):
+        for table in self.next_ids:
+            self.cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))",
+                (table,)
+            )
+
+
+def generate(
+    database_url=None,
+    students=500,
+    teams=None,
+    tas=10,
+    profs=1,
+    skills=12,
+    submittables=8,
+    assignables=4,
+    gradeables=6,
+    forms=3,
+    announcements=50,
+    messages=20_000,
+    file_kb=4,
+    write_files=True,
+    prefix="gen",
+    seed=1,
+    anchor=None,
+    log=print,
+):
+    """
+    Generate one course
+
+    Parameters:
+    - database_url: target database, DATABASE_URL / constants.py when None
+    - students, teams, tas, profs: course size, teams defaults to students / 5
+    - skills: skills that must exist, missing ones are created
+    - submittables, assignables, gradeables, forms, announcements, messages: item counts
+    - file_kb: size of every submission / assignment file
+    - write_files: write those files into uploads/ (relative to the working directory)
+    - prefix: username prefix of the generated accounts
+    - seed: seeds every random choice
+    - anchor: the course's "now", deadlines and timestamps are placed around it;
+      defaults to today 00:00 UTC
+
+    Returns:
+    - dict with the usernames, the team index of every student, the shared
+      password, the global channel id and the rows loaded per table
+    """
+    main = load_main(database_url)
+    rng = random.Random(seed)
+    anchor = anchor or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    term_start = anchor - timedelta(days=60)
+    teams = teams or max(1, students // 5)
+    usernames = course_usernames(prefix, profs, tas, students)
+    started = time.perf_counter()
+
+    db = main.SessionLocal()
+    try:
+        if db.query(main.User).filter(main.User.username.in_(usernames["profs"][:1] or usernames["students"][:1])).first():
+            raise RuntimeError(f"A course with prefix '{prefix}' already exists in this database")
+        role_ids = {role: main.role_id_for(role, db) for role in main.RoleType}
+        hashed_password = main.pwd_context.hash(PASSWORD)
+        global_channel = db.query(main.Channel).filter(main.Channel.type == "global").first()
+        has_config = db.query(main.CourseConfig).first() is not None
+        existing_skills = [skill.id for skill in db.query(main.Skill).order_by(main.Skill.id)]
+    finally:
+        db.close()
+
+    connection = main.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        ids = IdAllocator(cursor)
+        loader = CopyLoader(cursor)
+
+        prof_ids = ids.block("users", profs)
+        ta_ids = ids.block("users", tas)
+        student_ids = ids.block("users", students)
+        team_ids = ids.block("teams", teams)
+        student_team = [team_ids[team_index(i, teams)] for i in range(students)]
+        members_of = {team_id: [] for team_id in team_ids}
+        for student_id, team_id in zip(student_ids, student_team):
+            members_of[team_id].append(student_id)
+
+        log("Loading users and teams...")
+        loader.load("teams", ["id", "name"], ((team_id, f"{prefix.title()} Team {i + 1}") for i, team_id in enumerate(team_ids)))
+
+        def user_rows():
+            groups = [
+                (usernames["profs"], prof_ids, main.RoleType.PROF, [None] * profs),
+                (usernames["tas"], ta_ids, main.RoleType.TA, [None] * tas),
+                (usernames["students"], student_ids, main.RoleType.STUDENT, student_team),
+            ]
+            for names, user_ids, role, user_teams in groups:
+                for username, user_id, team_id in zip(names, user_ids, user_teams):
+                    yield (user_id, username.replace("_", " ").title(), f"{username}@example.edu", username, role_ids[role], team_id, hashed_password)
+
+        loader.load("users", ["id", "name", "email", "username", "role_id", "team_id", "hashed_password"], user_rows())
+        loader.load("team_members", ["team_id", "user_id"], zip(student_team, student_ids))
+        if ta_ids:
+            loader.load("team_tas", ["id", "team_id", "ta_id"], zip(ids.block("team_tas", teams), team_ids, (ta_ids[i % tas] for i in range(teams))))
+
+        missing_skills = max(0, skills - len(existing_skills))
+        new_skill_ids = ids.block("skills", missing_skills)
+        loader.load("skills", ["id", "name", "bgColor", "color", "icon"], (
+            (skill_id, f"{prefix.title()} Skill {skill_id}", SKILL_COLORS[i % len(SKILL_COLORS)], "#ffffff", "code")
+            for i, skill_id in enumerate(new_skill_ids)
+        ))
+        skill_ids = (existing_skills + new_skill_ids)[:skills]
+        if skill_ids:
+            loader.load("user_skills", ["user_id", "skill_id"], (
+                (ta_id, skill_id) for ta_id in ta_ids for skill_id in rng.sample(skill_ids, min(len(skill_ids), rng.randint(2, 4)))
+            ))
+            loader.load("team_skills", ["team_id", "skill_id"], (
+                (team_id, skill_id) for team_id in team_ids for skill_id in rng.sample(skill_ids, min(len(skill_ids), rng.randint(1, 3)))
+            ))
+
+        log("Loading channels and messages...")
+        new_channels = [] if global_channel else [("General", "global", None)]
+        new_channels += [(f"Team {i + 1}", "team", team_id) for i, team_id in enumerate(team_ids)]
+        new_channels += [(f"TA Team {i + 1}", "ta-team", team_id) for i, team_id in enumerate(team_ids)]
+        channel_ids = ids.block("channels", len(new_channels))
+        loader.load("channels", ["id", "name", "type", "team_id"], (
+            (channel_id, name, channel_type, team_id) for channel_id, (name, channel_type, team_id) in zip(channel_ids, new_channels)
+        ))
+        global_channel_id = global_channel.id if global_channel else channel_ids[0]
+        team_channels = [(channel_id, team_id) for channel_id, (_, channel_type, team_id) in zip(channel_ids, new_channels) if channel_type == "team"]
+        if not has_config and prof_ids:
+            loader.load("course_config", ["id", "team_phase_enabled", "discussions_enabled", "feedback_enabled", "updated_at", "updated_by"],
+                        [(ids.block("course_config", 1)[0], True, True, True, anchor, prof_ids[0])])
+
+        everyone = student_ids + ta_ids + prof_ids
+
+        def message_rows():
+            span = (anchor - term_start).total_seconds()
+            # Sorted offsets so ids follow created_at, as they do in production
+            offsets = sorted(rng.random() * span for _ in range(messages))
+            for message_id, offset in zip(ids.block("messages", messages), offsets):
+                if rng.random() < 0.3 or not team_channels:
+                    channel_id, sender_id = global_channel_id, rng.choice(everyone)
+                else:
+                    channel_id, team_id = rng.choice(team_channels)
+                    sender_id = rng.choice(members_of[team_id])
+                created_at = term_start + timedelta(seconds=offset)
+                yield (message_id, sentence(rng), sender_id, channel_id, created_at, "text", None)
+
+        if student_ids:
+            loader.load("messages", ["id", "content", "sender_id", "channel_id", "created_at", "message_type", "file_name"], message_rows())
+
+        staff_ids = prof_ids + ta_ids
+        loader.load("announcements", ["id", "creator_id", "created_at", "title", "content"], (
+            (announcement_id, rng.choice(prof_ids), (anchor - timedelta(hours=i * 20)).isoformat(), f"Announcement {i + 1}",
+             "\n\n".join(sentence(rng, 10, 30) for _ in range(rng.randint(1, 4))))
+            for i, announcement_id in enumerate(ids.block("announcements", announcements if prof_ids else 0))
+        ))
+
+        log("Loading graded work...")
+        file_bytes = file_kb * 1024
+        files_written = 0
+        # File contents get their own stream, so --no-files leaves the rows unchanged
+        file_rng = random.Random(seed)
+
+        def work_file(name):
+            nonlocal files_written
+            path = os.path.join("uploads", name)
+            if write_files:
+                with open(path, "wb") as f:
+                    f.write(file_rng.randbytes(file_bytes))
+                files_written += 1
+            return path
+
+        if write_files:
+            os.makedirs("uploads", exist_ok=True)
+
+        def deadlines(count):
+            """Deadlines spread over the term, the last ones still in the future"""
+            return [term_start + timedelta(days=(i + 1) * 80 / max(count, 1), hours=23, minutes=59) for i in range(count)]
+
+        submittable_rows = []
+        for submittable_id, deadline in zip(ids.block("submittables", submittables if staff_ids else 0), deadlines(submittables)):
+            submittable_rows.append((submittable_id, f"Milestone {len(submittable_rows) + 1}", deadline - timedelta(days=14), deadline,
+                                     sentence(rng), None, "milestone.pdf", 100, (anchor - timedelta(days=70)).isoformat(), rng.choice(staff_ids)))
+        loader.load("submittables", ["id", "title", "opens_at", "deadline", "description", "file_url", "original_filename",
+                                     "max_score", "created_at", "creator_id"], submittable_rows)
+
+        def submission_rows():
+            for submittable_id, _, opens_at, deadline, *_ in submittable_rows:
+                if opens_at > anchor:
+                    continue
+                for team_id in team_ids:
+                    if rng.random() < 0.1:
+                        continue  # some teams never submit
+                    submitted_on = opens_at + (min(deadline, anchor) - opens_at) * rng.random()
+                    score = rng.randint(40, 100) if deadline < anchor and rng.random() < 0.85 else None
+                    name = f"submission_{prefix}_{submittable_id}_{team_id}.zip"
+                    yield (ids.block("submissions", 1)[0], team_id, submitted_on.isoformat(), work_file(name), "project.zip", submittable_id, score)
+
+        loader.load("submissions", ["id", "team_id", "submitted_on", "file_url", "original_filename", "submittable_id", "score"], submission_rows())
+
+        assignable_rows = []
+        for assignable_id, deadline in zip(ids.block("assignables", assignables if staff_ids else 0), deadlines(assignables)):
+            assignable_rows.append((assignable_id, f"Assignment {len(assignable_rows) + 1}", deadline - timedelta(days=7), deadline,
+                                    sentence(rng), f"uploads/assignable_{prefix}_{assignable_id}.pdf", "assignment.pdf", 10,
+                                    (anchor - timedelta(days=70)).isoformat(), rng.choice(staff_ids)))
+        loader.load("assignables", ["id", "title", "opens_at", "deadline", "description", "file_url", "original_filename",
+                                    "max_score", "created_at", "creator_id"], assignable_rows)
+
+        def assignment_rows():
+            for assignable_id, _, opens_at, deadline, *_ in assignable_rows:
+                if opens_at > anchor:
+                    continue
+                for student_id in student_ids:
+                    if rng.random() < 0.15:
+                        continue
+                    submitted_on = opens_at + (min(deadline, anchor) - opens_at) * rng.random()
+                    score = rng.randint(3, 10) if deadline < anchor and rng.random() < 0.85 else None
+                    name = f"assignment_{prefix}_{assignable_id}_{student_id}.pdf"
+                    yield (ids.block("assignments", 1)[0], student_id, submitted_on.isoformat(), work_file(name), "answers.pdf", assignable_id, score)
+
+        loader.load("assignments", ["id", "user_id", "submitted_on", "file_url", "original_filename", "assignable_id", "score"], assignment_rows())
+
+        gradeable_ids = ids.block("gradeables", gradeables if staff_ids else 0)
+        loader.load("gradeables", ["id", "title", "max_points", "creator_id", "created_at"], (
+            (gradeable_id, f"Quiz {i + 1}", 20, rng.choice(staff_ids), (term_start + timedelta(days=i * 9)).isoformat())
+            for i, gradeable_id in enumerate(gradeable_ids)
+        ))
+        loader.load("gradeable_scores", ["id", "gradeable_id", "user_id", "score"], (
+            (ids.block("gradeable_scores", 1)[0], gradeable_id, student_id, rng.randint(5, 20))
+            for gradeable_id in gradeable_ids for student_id in student_ids
+        ))
+
+        log("Loading forms and feedback...")
+        form_ids = ids.block("forms", forms)
+        form_deadlines = deadlines(forms)
+        loader.load("forms", ["id", "title", "description", "created_at", "deadline", "form_json", "version"], (
+            (form_id, f"Course survey {i + 1}", "Form description", (deadline - timedelta(days=10)).isoformat(),
+             deadline.isoformat(), json.dumps(FEEDBACK_FORM), 1)
+            for i, (form_id, deadline) in enumerate(zip(form_ids, form_deadlines))
+        ))
+
+        def form_response_rows():
+            for form_id, deadline in zip(form_ids, form_deadlines):
+                for student_id in student_ids:
+                    if rng.random() < 0.2:
+                        continue
+                    answers = {
+                        "workload": rng.randint(1, 5),
+                        "pace": rng.choice(["slow", "right", "fast"]),
+                        "topics": rng.sample(["design", "testing", "deployment", "teamwork"], rng.randint(0, 3)),
+                    }
+                    if rng.random() < 0.3:
+                        answers["comments"] = sentence(rng)
+                    submitted_at = min(deadline, anchor) - timedelta(hours=rng.randint(1, 200))
+                    yield (ids.block("form_responses", 1)[0], student_id, form_id, submitted_at.isoformat(), json.dumps(answers))
+
+        loader.load("form_responses", ["id", "user_id", "form_id", "submitted_at", "response_data"], form_response_rows())
+
+        feedback_rows = []
+        feedback_detail_rows = []
+        for student_id, team_id in zip(student_ids, student_team):
+            teammates = [member for member in members_of[team_id] if member != student_id]
+            if not teammates or rng.random() < 0.25:
+                continue
+            submission_id = ids.block("feedback_submissions", 1)[0]
+            feedback_rows.append((submission_id, student_id, team_id, anchor - timedelta(days=rng.randint(1, 20))))
+            weights = [rng.random() + 0.5 for _ in teammates]
+            for member_id, weight in zip(teammates, weights):
+                feedback_detail_rows.append((ids.block("feedback_details", 1)[0], submission_id, member_id,
+                                             round(100 * weight / sum(weights), 1), sentence(rng, 3, 10)))
+        loader.load("feedback_submissions", ["id", "submitter_id", "team_id", "submitted_at"], feedback_rows)
+        loader.load("feedback_details", ["id", "submission_id", "member_id", "contribution", "remarks"], feedback_detail_rows)
+
+        ids.reset_sequences()
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    db = main.SessionLocal()
+    try:
+        # The grade tables were written behind the API, bring the read model up to date
+        main.rebuild_gradebook(db)
+        db.execute(text("ANALYZE"))
+        db.commit()
+    finally:
+        db.close()
+
+    log(f"Generated course '{prefix}' in {time.perf_counter() - started:.1f}s, {files_written} files written")
+    return {
+        **usernames,
+        "team_of": {username: team_index(i, teams) for i, username in enumerate(usernames["students"])},
+        "password": PASSWORD,
+        "global_channel_id": global_channel_id,
+        "rows": loader.counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a deterministic synthetic course")
+    parser.add_argument("--database-url", help="target database, defaults to DATABASE_URL / constants.py")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--teams", type=int, help="defaults to students / 5")
+    parser.add_argument("--tas", type=int, default=10)
+    parser.add_argument("--profs", type=int, default=1)
+    parser.add_argument("--skills", type=int, default=12)
+    parser.add_argument("--submittables", type=int, default=8)
+    parser.add_argument("--assignables", type=int, default=4)
+    parser.add_argument("--gradeables", type=int, default=6)
+    parser.add_argument("--forms", type=int, default=3)
+    parser.add_argument("--announcements", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--file-kb", type=int, default=4, help="size of each submission file")
+    parser.add_argument("--no-files", action="store_true", help="only insert rows, do not write submission files")
+    parser.add_argument("--prefix", default="gen", help="username prefix of the generated accounts")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--anchor", help="ISO date the course is generated around, defaults to today")
+    args = parser.parse_args()
+
+    if args.profs < 1:
+        parser.error("--profs must be at least 1")
+    anchor = datetime.fromisoformat(args.anchor) if args.anchor else None
+    if anchor and anchor.tzinfo is None:
+        anchor = anchor.replace(tzinfo=timezone.utc)
+    try:
+        course = generate(
+            database_url=args.database_url,
+            students=args.students,
+            teams=args.teams,
+            tas=args.tas,
+            profs=args.profs,
+            skills=args.skills,
+            submittables=args.submittables,
+            assignables=args.assignables,
+            gradeables=args.gradeables,
+            forms=args.forms,
+            announcements=args.announcements,
+            messages=args.messages,
+            file_kb=args.file_kb,
+            write_files=not args.no_files,
+            prefix=args.prefix,
+            seed=args.seed,
+            anchor=anchor,
+        )
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+    for table, count in course["rows"].items():
+        print(f"  {table}: {count} rows")
+    print(f"Log in as {course['profs'][0]} / {course['students'][0]} with password {course['password']}")
+
+
+if __name__ == "__main__":
+    main()
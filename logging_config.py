@@ -0,0 +1,185 @@
+"""
+Structured, non-blocking logging shared by main.py and split/
+
+setup_logging() puts a single QueueHandler on the root logger. Request threads
+only render the message and append the record to a bounded in-memory queue;
+a QueueListener thread turns records into JSON lines and writes them to
+stdout. When the queue is full records are dropped (and counted) instead of
+making the caller wait.
+
+Every record carries the id of the HTTP request it was logged from, set by
+RequestIdMiddleware from the X-Request-ID header (or generated) and echoed
+back in the response.
+
+Environment:
+- LOG_LEVEL: root level, INFO by default
+- LOG_SAMPLE: per-logger sampling of records below WARNING, e.g.
+  "sahara.chat=0.1,sahara.csv=0.01" keeps 10% and 1% of those loggers' records
+- LOG_QUEUE_SIZE: records buffered before new ones are dropped
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Attributes every LogRecord has, anything else was passed through `extra=`
+STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "request_id", "sample_rate"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, `extra=` fields included as top-level keys"""
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if getattr(record, "sample_rate", 1.0) < 1.0:
+            entry["sample_rate"] = record.sample_rate
+        for key, value in record.__dict__.items():
+            if key not in STANDARD_RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the sub-WARNING records of chosen loggers (and their children)"""
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates)
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        record.sample_rate = rate
+        return random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never waits on a full queue
+
+    The message, request id and traceback are captured in the calling thread,
+    where the arguments and the request context are still valid.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_sample_rates(value):
+    rates = {}
+    for item in (value or "").split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+listener = None
+
+def setup_logging(level=None, sample_rates=None):
+    """
+    Route all logging through the queue, safe to call more than once
+
+    Parameters:
+    - level: root level name, defaults to LOG_LEVEL or INFO
+    - sample_rates: {logger name: kept fraction}, defaults to LOG_SAMPLE
+
+    Returns:
+    - the running QueueListener
+    """
+    global listener
+    if listener is not None:
+        return listener
+
+    log_queue = queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", 10000)))
+    handler = NonBlockingQueueHandler(log_queue)
+    rates = sample_rates if sample_rates is not None else parse_sample_rates(os.environ.get("LOG_SAMPLE"))
+    handler.addFilter(SamplingFilter(rates))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level or os.environ.get("LOG_LEVEL", "INFO"))
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
+
+
+class RequestIdMiddleware:
+    """Tag every HTTP request (and its log records) with an id, returned as X-Request-ID"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for key, value in scope["headers"]:
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
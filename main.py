@@ -1,10 +1,12 @@
 import json
+import logging
 # Explicitly import FastAPI's Form and rename it to avoid conflicts
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, Query, Header, Body, File, Form as FastAPIForm, WebSocket, WebSocketDisconnect, WebSocketException
-from fastapi.responses import JSONResponse, Response, FileResponse
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, Query, Header, Body, File, Form as FastAPIForm, Request, WebSocket, WebSocketDisconnect, WebSocketException
+from fastapi.responses import JSONResponse, Response, FileResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import ForeignKey, create_engine, Column, Integer, String, Enum, Table, Text, DateTime, text, Float, Boolean, JSON
+from sqlalchemy import event, ForeignKey, create_engine, Column, Integer, BigInteger, String, Enum, Table, Text, DateTime, text, Float, Boolean, JSON, Index, Sequence, select, union_all, literal, and_, or_, func, case, cast
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import sessionmaker, Session, relationship, validates
 from sqlalchemy.dialects.postgresql import JSONB, insert
 from passlib.context import CryptContext
@@ -16,12 +18,12 @@ from pydantic import BaseModel, EmailStr, validator
 from typing import Annotated, List, Dict, Any, Optional
 import enum
 import secrets
+from contextvars import ContextVar
 import os
 import tempfile
 import io
 from datetime import datetime, timezone
 from fastapi.middleware.cors import CORSMiddleware
-import traceback
 from typing import Optional, List
 import sys
 import importlib.util
@@ -34,12 +36,40 @@ from io import StringIO
 from fastapi.staticfiles import StaticFiles
 from typing import ForwardRef
 import base64
+import zipfile
+import html
+import math
+from urllib.parse import parse_qs, quote
+import unicodedata
+from fastapi.concurrency import run_in_threadpool
+import time
+import threading
+from collections import OrderedDict
+import fastjsonschema
 import pandas as pd
+import numpy as np
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formatdate
 from constants import DATABASE_URL
+DATABASE_URL = os.environ.get("DATABASE_URL") or DATABASE_URL  # lets benchmarks and scripts point at another database
+from logging_config import setup_logging, RequestIdMiddleware
+from form_schema import build_form_response_schema, iter_form_questions
+from serialization import (
+    fast_json,
+    PEOPLE_ADAPTER,
+    MESSAGES_ADAPTER,
+    GRADEABLE_SCORES_ADAPTER,
+    SUBMITTABLES_BY_STATUS_ADAPTER,
+    ANNOUNCEMENTS_ADAPTER,
+)
+
+# JSON logs through a background queue, see logging_config.py
+setup_logging()
+logger = logging.getLogger("sahara")
+csv_logger = logging.getLogger("sahara.csv")  # per-row messages of CSV imports
+chat_logger = logging.getLogger("sahara.chat")  # per-request messages of the discussion routes
 # Create uploads directory if it doesn't exist
 os.makedirs("uploads", exist_ok=True)
 
@@ -57,6 +87,67 @@ engine = create_engine(DATABASE_URL)
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class ISODateTime(TypeDecorator):
+    """
+    timestamptz column that still speaks ISO 8601 strings to Python
+
+    Accepts ISO strings (naive values are taken as UTC) or datetimes and returns
+    UTC ISO strings ("+00:00" offset, readable by datetime.fromisoformat), so the
+    API keeps its string contract while Postgres can index and compare the column.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or value == "":
+            return None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return value.astimezone(timezone.utc).isoformat()
+
+
+class AuthContext:
+    """
+    Who is making the current HTTP request
+
+    AuthContextMiddleware installs an empty one per request and the auth
+    dependencies fill it in, so ORM validators can check the acting user's
+    role without opening a session of their own.
+    """
+    __slots__ = ("user_id", "role")
+
+    def __init__(self):
+        self.user_id = None
+        self.role = None
+
+# Sync dependencies and routes run in a threadpool on a copy of the context,
+# so the dependencies mutate the shared AuthContext instead of calling set()
+auth_context: ContextVar[Optional["AuthContext"]] = ContextVar("auth_context", default=None)
+
+def record_auth_context(user_id: int, role):
+    """Attach the authenticated user to the current request, if there is one"""
+    context = auth_context.get()
+    if context is not None:
+        context.user_id = user_id
+        context.role = role
+
+def reject_student_creator(message: str):
+    """
+    Raise ValueError from a validator when the acting user is a student
+
+    Outside a request (startup seeding, scripts) there is no acting user and
+    the object is allowed, like before when the creator could not be found.
+    """
+    context = auth_context.get()
+    if context is not None and context.role == RoleType.STUDENT:
+        raise ValueError(message)
 
 ####
 # DEFINING ALL THE ORM CLASSES
@@ -90,14 +181,15 @@ team_skills = Table(
 team_members = Table(
     "team_members", Base.metadata,
     Column("team_id", Integer, ForeignKey("teams.id"), primary_key=True),
-    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True)
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Index("ix_team_members_user_id", "user_id"),
 ) 
 # Define the invites association table
 invites = Table(
     "invites", Base.metadata,
     Column("team_id", Integer, ForeignKey("teams.id"), primary_key=True),
     Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
-    Column("invited_at", String, default=datetime.now(timezone.utc).isoformat())
+    Column("invited_at", ISODateTime, server_default=func.now())
 )
 class Skill(Base):
     __tablename__ = "skills"
@@ -112,34 +204,39 @@ class Skill(Base):
     # Relationship with teams
     teams = relationship("Team", secondary=team_skills, back_populates="skills")
 
+# Advanced by invalidate_skills() after every skill write, lets each worker process tell whether its cached skills are current
+skills_version_seq = Sequence("skills_version_seq", metadata=Base.metadata)
+
 class Submittable(Base):
     __tablename__ = "submittables"
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)  # Adding title field
-    opens_at = Column(String, nullable=True)  # ISO 8601 format
-    deadline = Column(String, nullable=False)  # ISO 8601 format
+    opens_at = Column(ISODateTime, nullable=True)  # timestamptz, ISO 8601 in Python
+    deadline = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
     description = Column(String, nullable=False)
     file_url = Column(String, nullable=True)  # URL path to the reference file
     original_filename = Column(String, nullable=False)
     max_score = Column(Integer, nullable=False)  # Maximum possible score for this submittable
-    created_at = Column(String, default=datetime.now(timezone.utc).isoformat())
+    created_at = Column(ISODateTime, server_default=func.now())
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     creator = relationship("User", back_populates="submittables")
     submissions = relationship("Submission", back_populates="submittable")
 
+    __table_args__ = (
+        Index("ix_submittables_deadline", "deadline"),
+        Index("ix_submittables_opens_at", "opens_at"),
+    )
+
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as db:
-            user = db.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Only professors or TAs can create submittables.")
+        reject_student_creator("Only professors or TAs can create submittables.")
         return value
 
 class Submission(Base):
     __tablename__ = "submissions"
     id = Column(Integer, primary_key=True)
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
-    submitted_on = Column(String, default=datetime.now(timezone.utc).isoformat())
+    submitted_on = Column(ISODateTime, server_default=func.now())
     file_url = Column(String, nullable=False)  # URL path to the reference file
     original_filename = Column(String, nullable=False)
     submittable_id = Column(Integer, ForeignKey("submittables.id"), nullable=False)
@@ -148,34 +245,41 @@ class Submission(Base):
     team = relationship("Team", back_populates="submissions")
     submittable = relationship("Submittable", back_populates="submissions")
 
+    __table_args__ = (
+        Index("ux_submissions_submittable_team", "submittable_id", "team_id", unique=True),
+        Index("ix_submissions_team_id", "team_id"),
+    )
+
 class Assignable(Base):
     __tablename__ = "assignables"
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)  # Adding title field
-    opens_at = Column(String, nullable=True)  # ISO 8601 format
-    deadline = Column(String, nullable=False)  # ISO 8601 format
+    opens_at = Column(ISODateTime, nullable=True)  # timestamptz, ISO 8601 in Python
+    deadline = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
     description = Column(String, nullable=False)
     file_url = Column(String, nullable=False)  # URL path to the reference file
     original_filename = Column(String, nullable=False)
     max_score = Column(Integer, nullable=False)  # Maximum possible score for this submittable
-    created_at = Column(String, default=datetime.now(timezone.utc).isoformat())
+    created_at = Column(ISODateTime, server_default=func.now())
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     creator = relationship("User", back_populates="assignables")
     assignments = relationship("Assignment", back_populates="assignable")
 
+    __table_args__ = (
+        Index("ix_assignables_deadline", "deadline"),
+        Index("ix_assignables_opens_at", "opens_at"),
+    )
+
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as db:
-            user = db.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Only professors or TAs can create assignables.")
+        reject_student_creator("Only professors or TAs can create assignables.")
         return value
 
 class Assignment(Base):
     __tablename__ = "assignments"
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    submitted_on = Column(String, default=datetime.now(timezone.utc).isoformat())
+    submitted_on = Column(ISODateTime, server_default=func.now())
     file_url = Column(String, nullable=False)  # URL path to the reference file
     original_filename = Column(String, nullable=False)
     assignable_id = Column(Integer, ForeignKey("assignables.id"), nullable=False)
@@ -184,6 +288,11 @@ class Assignment(Base):
     user = relationship("User", back_populates="assignments")
     assignable = relationship("Assignable", back_populates="assignments")
 
+    __table_args__ = (
+        Index("ux_assignments_assignable_user", "assignable_id", "user_id", unique=True),
+        Index("ix_assignments_user_id", "user_id"),
+    )
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
@@ -210,6 +319,10 @@ class User(Base):
     feedback_details = relationship("FeedbackDetail", foreign_keys="FeedbackDetail.member_id", back_populates="member", lazy="joined")
     invites = relationship("Team", secondary="invites", back_populates="invites")
     user_calendar_events = relationship("NewUserCalendarEvent", back_populates="user", lazy="joined")
+
+    __table_args__ = (
+        Index("ix_users_team_id", "team_id"),
+    )
     
     # @validates('skills')
     # def validate_skills(self, key, skill):
@@ -237,9 +350,10 @@ class Form(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    created_at = Column(String, default=datetime.now(timezone.utc).isoformat())
-    deadline = Column(String, nullable=False)  # ISO 8601 format
+    created_at = Column(ISODateTime, server_default=func.now())
+    deadline = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
     form_json = Column(JSONB, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bump whenever form_json changes
 
     # target_type = Column(Enum(RoleType), nullable=False)  # Role or Team
     # target_id = Column(Integer, nullable=False)  # Role ID or Team ID
@@ -271,18 +385,19 @@ class Announcement(Base):
     __tablename__ = "announcements"
     id = Column(Integer, primary_key=True)
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(String, default=lambda: datetime.now(timezone.utc).isoformat())
+    created_at = Column(ISODateTime, server_default=func.now())
     title = Column(String, nullable=False)
     content = Column(String, nullable=False)  # Supports Markdown formatting for rich text
     url_name = Column(String, unique=True, nullable=True)
-    
+
+    __table_args__ = (
+        Index("ix_announcements_created_at", "created_at"),
+    )
+
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create announcements.")
-            return value
+        reject_student_creator("Students cannot create announcements.")
+        return value
 
 
 class FormResponse(Base):
@@ -291,12 +406,17 @@ class FormResponse(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     form_id = Column(Integer, ForeignKey("forms.id"), nullable=False)
-    submitted_at = Column(String, default=datetime.now(timezone.utc).isoformat())
+    submitted_at = Column(ISODateTime, server_default=func.now())
     response_data = Column(String, nullable=False)  # JSON or serialized response data
 
     user = relationship("User", back_populates="responses")
     form = relationship("Form", back_populates="responses")
 
+    __table_args__ = (
+        Index("ux_form_responses_form_user", "form_id", "user_id", unique=True),
+        Index("ix_form_responses_user_id", "user_id"),
+    )
+
 
 class Gradeable(Base):
     __tablename__ = "gradeables"
@@ -306,18 +426,15 @@ class Gradeable(Base):
     #due_date = Column(String, nullable=False)
     max_points = Column(Integer, nullable=False)
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(String, default=datetime.now(timezone.utc).isoformat())
+    created_at = Column(ISODateTime, server_default=func.now())
 
     creator = relationship("User", back_populates="gradeables")
     scores = relationship("GradeableScores", back_populates="gradeable")
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create gradeables.")
-            return value
+        reject_student_creator("Students cannot create gradeables.")
+        return value
     
 class GradeableScores(Base):
     __tablename__ = "gradeable_scores"
@@ -330,6 +447,25 @@ class GradeableScores(Base):
     gradeable = relationship("Gradeable", back_populates="scores")
     user = relationship("User", back_populates="gradeable_scores")
 
+    __table_args__ = (
+        Index("ux_gradeable_scores_gradeable_user", "gradeable_id", "user_id", unique=True),
+        Index("ix_gradeable_scores_user_id", "user_id"),
+    )
+
+# Per-student gradebook read model, one row per (student, graded item).
+# Written by the grading endpoints so reads never have to join the three sources.
+class GradebookEntry(Base):
+    __tablename__ = "gradebook_entries"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    item_type = Column(String, primary_key=True)  # "gradeable", "submittable" or "assignable"
+    item_id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
+    max_score = Column(Integer, nullable=False)
+    score = Column(Integer, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+# Legacy JSON-blob calendars, superseded by global_calendar / user_calendar / team_calendar.
+# Only read by migrate_calendar_blobs.py, nothing in the API writes to them anymore.
 class GlobalCalendarEvent(Base):
     __tablename__ = "global_calendar_events"
     id = Column(Integer, primary_key=True)
@@ -353,10 +489,7 @@ class UserCalendarEvent(Base):
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create calendar events.")
+        reject_student_creator("Students cannot create calendar events.")
         return value
 
 class TeamCalendarEvent(Base):
@@ -373,10 +506,7 @@ class TeamCalendarEvent(Base):
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create calendar events.")
+        reject_student_creator("Students cannot create calendar events.")
         return value
     
 class Team_TA(Base):
@@ -388,6 +518,11 @@ class Team_TA(Base):
     team = relationship("Team", backref="team_tas")
     ta = relationship("User", backref="ta_teams")
 
+    __table_args__ = (
+        Index("ux_team_tas_team_ta", "team_id", "ta_id", unique=True),
+        Index("ix_team_tas_ta_id", "ta_id"),
+    )
+
 # class TeamInvites(Base):
 #     __tablename__ = "team_invites"
 #     id = Column(Integer, primary_key=True)
@@ -408,29 +543,42 @@ class Channel(Base):
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
     messages = relationship("Message", back_populates="channel")
 
+    __table_args__ = (
+        Index("ix_channels_type_team", "type", "team_id"),
+    )
+
 class Message(Base):
     __tablename__ = "messages"
     id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"))
     channel_id = Column(Integer, ForeignKey("channels.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
     message_type = Column(String(10), default='text')
     file_name = Column(String(255))
 
     sender = relationship("User", back_populates="messages")
     channel = relationship("Channel", back_populates="messages")
 
+    __table_args__ = (
+        Index("ix_messages_channel_created", "channel_id", "created_at"),
+        Index("ix_messages_sender_id", "sender_id"),
+    )
+
 class FeedbackSubmission(Base):
     __tablename__ = "feedback_submissions"
     id = Column(Integer, primary_key=True)
     submitter_id = Column(Integer, ForeignKey("users.id"))
     team_id = Column(Integer, ForeignKey("teams.id"))
-    submitted_at = Column(DateTime, default=datetime.now(timezone.utc))
+    submitted_at = Column(DateTime(timezone=True), server_default=func.now())
     submitter = relationship("User", foreign_keys=[submitter_id])
     team = relationship("Team")
     details = relationship("FeedbackDetail", back_populates="submission")
 
+    __table_args__ = (
+        Index("ux_feedback_submissions_team_submitter", "team_id", "submitter_id", unique=True),
+    )
+
 class FeedbackDetail(Base):
     __tablename__ = "feedback_details"
     id = Column(Integer, primary_key=True)
@@ -441,6 +589,10 @@ class FeedbackDetail(Base):
     submission = relationship("FeedbackSubmission", back_populates="details")
     member = relationship("User", foreign_keys=[member_id])
 
+    __table_args__ = (
+        Index("ix_feedback_details_submission_id", "submission_id"),
+    )
+
 # Add these Pydantic models for request validation
 class FeedbackDetailRequest(BaseModel):
     member_id: int
@@ -479,16 +631,38 @@ class UserSkill(Base):
 #                 raise ValueError("Students cannot create calendar events.")
 #         return value
 
+# Every insert/update of a calendar row takes the next value, used as the iCalendar SEQUENCE and feed ETag
+calendar_change_seq = Sequence("calendar_change_seq", metadata=Base.metadata)
+
+def current_xact_id():
+    """
+    Id of the writing transaction, as a bigint, for the change_xid columns
+
+    Sequence values are handed out at write time, so a transaction can commit
+    after a higher value is already visible. Transaction ids can instead be
+    compared with a snapshot's xmin, below which every transaction has ended,
+    which makes them usable as a commit-ordered sync watermark.
+    """
+    return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+
 class NewTeamCalendarEvent(Base):
     __tablename__ = "team_calendar"
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     subtitle = Column(String, nullable=True)
-    start = Column(String, nullable=False)
-    end = Column(String, nullable=False)
+    start = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
+    end = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    change_seq = Column(BigInteger, server_default=calendar_change_seq.next_value(), onupdate=calendar_change_seq.next_value(), nullable=False)
+    change_xid = Column(BigInteger, server_default=current_xact_id(), onupdate=current_xact_id(), nullable=False)
 
     team = relationship("Team", back_populates="team_calendar_events", lazy="joined")
+
+    __table_args__ = (
+        Index("ix_team_calendar_team_id_start", "team_id", "start"),
+        Index("ix_team_calendar_change_seq", "change_seq"),
+        Index("ix_team_calendar_change_xid", "change_xid"),
+    )
 # class UserCalendarEvent(Base):
 #     __tablename__ = "user_calendar_events"
 #     id = Column(Integer, primary_key=True)
@@ -514,12 +688,20 @@ class NewUserCalendarEvent(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     subtitle = Column(String, nullable=True)
-    start = Column(String, nullable=False)
-    end = Column(String, nullable=False)
+    start = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
+    end = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    change_seq = Column(BigInteger, server_default=calendar_change_seq.next_value(), onupdate=calendar_change_seq.next_value(), nullable=False)
+    change_xid = Column(BigInteger, server_default=current_xact_id(), onupdate=current_xact_id(), nullable=False)
 
     user = relationship("User", back_populates="user_calendar_events", lazy="joined")
 
+    __table_args__ = (
+        Index("ix_user_calendar_user_id_start", "user_id", "start"),
+        Index("ix_user_calendar_change_seq", "change_seq"),
+        Index("ix_user_calendar_change_xid", "change_xid"),
+    )
+
     # @validates("user_id")
     # def validate_user(self, key, value):
     #     with SessionLocal() as session:
@@ -541,8 +723,38 @@ class NewGlobalCalendarEvent(Base):
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     subtitle = Column(String, nullable=True)
-    start = Column(String, nullable=False)
-    end = Column(String, nullable=False)
+    start = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
+    end = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
+    change_seq = Column(BigInteger, server_default=calendar_change_seq.next_value(), onupdate=calendar_change_seq.next_value(), nullable=False)
+    change_xid = Column(BigInteger, server_default=current_xact_id(), onupdate=current_xact_id(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_global_calendar_start", "start"),
+        Index("ix_global_calendar_change_seq", "change_seq"),
+        Index("ix_global_calendar_change_xid", "change_xid"),
+    )
+
+# Deleted calendar events, kept so incremental sync can report removals
+class CalendarEventTombstone(Base):
+    __tablename__ = "calendar_tombstones"
+    id = Column(Integer, primary_key=True)
+    event_id = Column(String, nullable=False)  # prefixed id, e.g. "g12", "p3", "t7"
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # set for personal events
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)  # set for team events
+    change_seq = Column(BigInteger, server_default=calendar_change_seq.next_value(), nullable=False, index=True)
+    change_xid = Column(BigInteger, server_default=current_xact_id(), nullable=False, index=True)
+    deleted_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+# Opaque per-user token used by calendar apps to subscribe to the .ics feed
+class CalendarFeedToken(Base):
+    __tablename__ = "calendar_feed_tokens"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    token = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    user = relationship("User", backref="calendar_feed_token")
+
 # Add these Pydantic models for request validation
 class FeedbackDetailRequest(BaseModel):
     member_id: int
@@ -560,11 +772,42 @@ class UserOTP(Base):
     
     user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
     hashed_otp = Column(String, nullable=False)
-    expires_at = Column(String, nullable=False)  # ISO 8601 format
+    expires_at = Column(ISODateTime, nullable=False)  # timestamptz, ISO 8601 in Python
     
     # Relationship with User
     user = relationship("User", backref="otp_record")
 
+# Outgoing mail, written by request handlers and delivered by MailSender
+class MailOutbox(Base):
+    __tablename__ = "mail_outbox"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False, default="notification")  # e.g. otp, credentials
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)  # recipient account, if any
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_content = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_mail_outbox_due", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+        Index("ix_mail_outbox_kind_user", "kind", "user_id"),
+    )
+
+# Shared token buckets for AuthRateLimitMiddleware when RATE_LIMIT_BACKEND=postgres
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    allowed = Column(Boolean, nullable=False)  # outcome of the last take
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
 # Course Config Table
 class CourseConfig(Base):
     __tablename__ = "course_config"
@@ -572,7 +815,7 @@ class CourseConfig(Base):
     team_phase_enabled = Column(Boolean, default=True, nullable=False)
     discussions_enabled = Column(Boolean, default=True, nullable=False)
     feedback_enabled = Column(Boolean, default=True, nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     updated_by = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Relationship with the user who last updated the config
@@ -589,109 +832,6 @@ def get_db():
 
 
 
-## Calendar functions - get
-def get_global_events(db:Session):
-    top_row = db.query(GlobalCalendarEvent).first()
-    if (top_row):
-        return top_row.events
-    return None
-
-def get_personal_events(user: User, db: Session):
-    row = db.query(UserCalendarEvent).filter_by(creator_id=user.id).first()
-    if row:
-        _events = row.events
-        for event in _events:
-            event["type"] = "personal"
-        return row.events
-    return None 
-
-def get_team_events(user: User, db: Session):
-    # if(user.role == RoleType.STUDENT):
-    assert(user.role == RoleType.STUDENT)
-    teams = user.teams
-    team_events = []
-    for team in teams:
-        row = db.query(TeamCalendarEvent).filter_by(creator_id=team.id).first()
-        if row:
-            _events = row.events
-            for event in _events:
-                event["type"] = "team"
-            team_events += _events
-    return team_events
-
-def get_events(user: User, db: Session):
-    '''
-    Get all events for a user
-
-    Assumes that global events, team events
-    and personal events are all lists
-    '''
-    global_events = get_global_events(db)
-    team_events = get_team_events(user, db)
-    personal_events = get_personal_events(user, db)
-    return global_events + team_events + personal_events
-
-
-def split_events(events):
-    global_events = []
-    personal_events = []
-    team_events = []
-    for event in events:
-        if "type" not in event:
-            continue
-        if event["type"] == "global":
-            global_events.append(event)
-        elif event["type"] == "personal":
-            personal_events.append(event)
-        elif event["type"] == "team":
-            team_events.append(event)
-        else:
-            continue # throw it
-    return global_events, personal_events, team_events
-
-## Calendar functions - overwriting
-def overwrite_global_events(events, db: Session):
-    '''
-    Overwrite the global events with the new events
-    '''
-    top_row = db.query(GlobalCalendarEvent).first()
-    if top_row:
-        print(events)
-        top_row.events = events
-    else:
-        top_row = GlobalCalendarEvent(events=events)
-        db.add(top_row)
-    db.commit()
-    db.refresh(top_row)
-
-def overwrite_personal_events(user: User, events, db: Session):
-    '''
-    Overwrite the personal events with the new events
-    '''
-    row = db.query(UserCalendarEvent).filter_by(creator_id=user.id).first()
-    if row:
-        row.events = events
-    else:
-        row = UserCalendarEvent(events=events, creator_id=user.id)
-        db.add(row)
-    db.commit()
-    db.refresh(row)
-
-def overwrite_team_events(user: User, events, db: Session):
-    '''
-    Overwrite the team events with the new events
-    '''
-    teams = user.teams
-    for team in teams:
-        row = db.query(TeamCalendarEvent).filter_by(creator_id=team.id).first()
-        if row:
-            row.events = events
-        else:
-            row = TeamCalendarEvent(events=events, creator_id=team.id)
-            db.add(row)
-    db.commit()
-    db.refresh(row)
-
 def reset_sequence(table_name: str, db: Session):
     """Reset the ID sequence for a table to start from MAX(id) + 1"""
     try:
@@ -705,7 +845,7 @@ def reset_sequence(table_name: str, db: Session):
         has_id = db.execute(check_id_query).scalar()
         
         if not has_id:
-            print(f"  - Skipping {table_name} - no 'id' column found")
+            logger.debug("Skipping sequence reset for %s, no 'id' column", table_name)
             return
             
         # Check if sequence exists for this table
@@ -715,7 +855,7 @@ def reset_sequence(table_name: str, db: Session):
         sequence_name = db.execute(sequence_query).scalar()
         
         if not sequence_name:
-            print(f"  - Skipping {table_name} - no sequence found")
+            logger.debug("Skipping sequence reset for %s, no sequence", table_name)
             return
             
         # Reset the sequence
@@ -726,10 +866,70 @@ def reset_sequence(table_name: str, db: Session):
         """)
         db.execute(reset_query)
         db.commit()
-        print(f"  ✓ Reset sequence for {table_name}")
+        logger.debug("Reset sequence for %s", table_name)
     except Exception as e:
         db.rollback()
-        print(f"  ✗ Error resetting sequence for {table_name}: {str(e)}")
+        logger.error("Error resetting sequence for %s: %s", table_name, e)
+
+# Session-local parser for the ISO-string to timestamptz migrations: NULL for
+# values Postgres cannot read instead of aborting the ALTER
+ISO_TO_TIMESTAMPTZ = """
+    CREATE OR REPLACE FUNCTION pg_temp.iso_to_timestamptz(value TEXT) RETURNS TIMESTAMPTZ AS $$
+    BEGIN
+        RETURN NULLIF(value, '')::timestamptz;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql;
+"""
+
+# Columns identifying a row in the migration logs, "id" where not listed
+ROW_KEY_COLUMNS = {"invites": ("team_id", "user_id"), "user_otps": ("user_id",)}
+
+def convert_to_timestamptz(connection, table_name: str, column_name: str, stamp: bool = False):
+    """
+    Change a text or naive timestamp column to timestamptz
+
+    The connection needs ISO_TO_TIMESTAMPTZ and a UTC time zone. Text values that
+    do not parse are reported with their row keys: a nullable column stores NULL
+    for them, a required column has no date to put there, so the migration stops
+    until they are fixed. stamp columns default to now() afterwards.
+    """
+    column = connection.execute(text("""
+        SELECT data_type, is_nullable FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = :table_name AND column_name = :column_name
+    """), {"table_name": table_name, "column_name": column_name}).first()
+    if column is None or column.data_type == "timestamp with time zone":
+        return
+    data_type, required = column.data_type, column.is_nullable == "NO"
+
+    if data_type == "timestamp without time zone":
+        converted = f'"{column_name}" AT TIME ZONE \'UTC\''
+    else:
+        converted = f'pg_temp.iso_to_timestamptz("{column_name}")'
+        key_columns = ROW_KEY_COLUMNS.get(table_name, ("id",))
+        bad_rows = connection.execute(text(f"""
+            SELECT {", ".join(f'"{key}"' for key in key_columns)}, "{column_name}" FROM "{table_name}"
+            WHERE NULLIF("{column_name}", '') IS NOT NULL AND {converted} IS NULL
+        """)).all()
+        if bad_rows:
+            rows = "; ".join(
+                f"{', '.join(f'{key}={value}' for key, value in zip(key_columns, row))} {column_name}={row[-1]!r}"
+                for row in bad_rows
+            )
+            if required:
+                raise RuntimeError(
+                    f"Cannot convert {table_name}.{column_name} to timestamptz, {len(bad_rows)} rows "
+                    f"have no readable timestamp, fix them and restart: {rows}"
+                )
+            logger.warning(
+                "Clearing %d unreadable timestamps while converting %s.%s: %s",
+                len(bad_rows), table_name, column_name, rows,
+            )
+
+    connection.execute(text(f'ALTER TABLE "{table_name}" ALTER COLUMN "{column_name}" DROP DEFAULT'))
+    connection.execute(text(f'ALTER TABLE "{table_name}" ALTER COLUMN "{column_name}" TYPE TIMESTAMPTZ USING {converted}'))
+    if stamp:
+        connection.execute(text(f'ALTER TABLE "{table_name}" ALTER COLUMN "{column_name}" SET DEFAULT now()'))
 
 class QueryBaseModel(BaseModel):
     token: str = Header(None)
@@ -844,6 +1044,14 @@ class TeamNameUpdateRequest(BaseModel):
         if len(v.strip()) > 100:
             raise ValueError("Team name cannot exceed 100 characters")
         return v.strip()
+def validate_calendar_time(v):
+    try:
+        # Validate ISO 8601 format, start/end are stored as timestamptz
+        datetime.fromisoformat(v.replace('Z', '+00:00'))
+        return v
+    except ValueError:
+        raise ValueError("Invalid time format. Use ISO 8601 (YYYY-MM-DDTHH:MM:SSZ)")
+
 class CalendarEvent(BaseModel):
     start: str
     end: str
@@ -853,17 +1061,212 @@ class CalendarEvent(BaseModel):
     # color: str = None
     # allDay: bool = False
 
+    @validator('start', 'end')
+    def validate_times(cls, v):
+        return validate_calendar_time(v)
+
 class CalendarUpdateEventModel(BaseModel):
     event_id: str
     start: str
     end: str
     title: str
     subtitle: str
+
+    @validator('start', 'end')
+    def validate_times(cls, v):
+        return validate_calendar_time(v)
 class CalendarUpdateModel(BaseModel):
     events: List[CalendarEvent]
     # token: str = Header(None)
 app = FastAPI()
 
+class TokenBucket:
+    """
+    Token bucket allowing `rate` events per second with bursts of up to `capacity`
+
+    Thread-safe. take() returns 0 when a token was taken, otherwise the number
+    of seconds until the next token is available.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+# Rate limiting of the anonymous, bcrypt-heavy auth endpoints. Every request
+# takes a token from the bucket of its client IP and, when the body names one,
+# of the targeted username/email, so neither a single client nor a spread-out
+# attack on one account can keep the workers busy hashing.
+AUTH_RATE_LIMITED_PATHS = {  # path -> body field identifying the target account
+    "/login": "username",
+    "/request-otp": "email",
+    "/verify-otp": "email",
+    "/reset-password-with-otp": "email",
+    "/reset-password": None,  # authenticated, keyed by IP and token instead
+}
+AUTH_RATE_PER_IP = (20, 20 / 60)  # (burst, tokens per second)
+AUTH_RATE_PER_ACCOUNT = (5, 5 / 60)
+AUTH_RATE_MAX_BODY = 64 * 1024
+RATE_LIMIT_MAX_KEYS = 100_000  # in-memory buckets kept, the least recently used are evicted beyond that
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")  # "postgres" to share buckets between workers
+# Reverse proxies in front of the app that append to X-Forwarded-For. The
+# client is the entry added by the outermost one, counted from the right;
+# anything left of it was sent by the client and can be forged. 0 ignores the header.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get("RATE_LIMIT_TRUSTED_PROXIES", 0))
+
+RATE_LIMIT_TAKE_SQL = text("""
+    INSERT INTO rate_limit_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (:key, :capacity - 1, TRUE, clock_timestamp())
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE
+            WHEN LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) >= 1
+            THEN LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) - 1
+            ELSE LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate)
+        END,
+        allowed = LEAST(:capacity, b.tokens + EXTRACT(EPOCH FROM clock_timestamp() - b.updated_at) * :rate) >= 1,
+        updated_at = clock_timestamp()
+    RETURNING tokens, allowed
+""")
+
+RATE_LIMIT_PRUNE_SQL = text("DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '1 hour'")
+
+class RateLimiter:
+    """Token buckets by key, in this process or shared through Postgres"""
+    def __init__(self, backend: str = "memory"):
+        self.backend = backend
+        self.buckets = OrderedDict()  # least recently used first
+        self.lock = threading.Lock()
+        self.takes = 0
+
+    def take(self, key: str, limit) -> float:
+        """Take a token for key, returns 0 or the seconds to wait"""
+        capacity, rate = limit
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= RATE_LIMIT_MAX_KEYS:
+                    self.buckets.popitem(last=False)
+                bucket = self.buckets[key] = TokenBucket(rate, capacity)
+            else:
+                self.buckets.move_to_end(key)
+        return bucket.take()
+
+    def take_shared(self, keys) -> float:
+        """take() for several (key, limit) pairs against rate_limit_buckets, in one transaction"""
+        with engine.connect() as connection:
+            wait = 0.0
+            for key, (capacity, rate) in keys:
+                tokens, allowed = connection.execute(RATE_LIMIT_TAKE_SQL, {"key": key, "capacity": capacity, "rate": rate}).one()
+                if not allowed:
+                    wait = max(wait, (1 - tokens) / rate)
+            self.takes += 1
+            if self.takes % 1000 == 0:
+                connection.execute(RATE_LIMIT_PRUNE_SQL)
+            connection.commit()
+        return wait
+
+    async def check(self, keys) -> float:
+        """Seconds the request has to wait (0 when allowed) for a list of (key, limit)"""
+        if self.backend == "postgres":
+            return await run_in_threadpool(self.take_shared, keys)
+        return max(self.take(key, limit) for key, limit in keys)
+
+auth_rate_limiter = RateLimiter(RATE_LIMIT_BACKEND)
+
+def rate_limit_identity(body: bytes, content_type: str, field: str) -> Optional[str]:
+    """Pull the targeted account out of a form or JSON auth request body"""
+    try:
+        if content_type.startswith("application/json"):
+            value = json.loads(body).get(field)
+        else:
+            value = parse_qs(body.decode("utf-8")).get(field, [None])[0]
+    except Exception:
+        return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip().lower()
+
+class AuthRateLimitMiddleware:
+    """
+    Answer 429 with Retry-After before the auth endpoints start hashing
+
+    Only the small bodies of AUTH_RATE_LIMITED_PATHS are buffered (and replayed
+    to the app), every other request passes straight through.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in AUTH_RATE_LIMITED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        forwarded = [
+            entry.strip()
+            for key, value in scope["headers"] if key == b"x-forwarded-for"
+            for entry in value.decode("latin-1").split(",")
+        ]
+        if RATE_LIMIT_TRUSTED_PROXIES and forwarded:
+            client_ip = forwarded[max(len(forwarded) - RATE_LIMIT_TRUSTED_PROXIES, 0)]
+        path = scope["path"]
+        keys = [(f"ip:{path}:{client_ip}", AUTH_RATE_PER_IP)]
+
+        # Buffer the body so the target account can be read, then replay it
+        body = b""
+        more_body = True
+        while more_body and len(body) <= AUTH_RATE_MAX_BODY:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        field = AUTH_RATE_LIMITED_PATHS[path]
+        if field is None:
+            identity = headers.get("authorization")
+        elif not more_body:
+            identity = rate_limit_identity(body, headers.get("content-type", ""), field)
+        else:
+            identity = None
+        if identity:
+            keys.append((f"account:{path}:{identity}", AUTH_RATE_PER_ACCOUNT))
+
+        wait = await auth_rate_limiter.check(keys)
+        if wait > 0:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many attempts, please try again later"},
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+            await response(scope, receive, send)
+            return
+
+        replayed = False
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": more_body}
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+# Innermost, so its 429s still get CORS headers
+app.add_middleware(AuthRateLimitMiddleware)
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -873,12 +1276,185 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-print("Creating tables...")
+class AuthContextMiddleware:
+    """Give every HTTP request its own, initially anonymous, AuthContext"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = auth_context.set(AuthContext())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            auth_context.reset(token)
+
+app.add_middleware(AuthContextMiddleware)
+
+# Request metrics, exposed in Prometheus text format on /metrics. They are kept
+# per process, so with several workers each one reports its own numbers.
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+METRICS_STATEMENT_WARNING = int(os.environ.get("METRICS_STATEMENT_WARNING", 0))  # 0 disables the warning
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # if set, /metrics requires "Authorization: Bearer <token>"
+
+class RequestStats:
+    """SQL work done on behalf of the current request, filled in by the engine hooks"""
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+# Mutated in place for the same reason as auth_context
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class MetricsRegistry:
+    """Counters and cumulative histograms keyed by label tuples"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}  # (method, route, status) -> count
+        self.latency = {}  # (method, route) -> histogram
+        self.statements = {}  # (method, route) -> histogram
+        self.db_seconds = {}  # (method, route) -> seconds
+        self.background = RequestStats()  # SQL issued outside any request
+
+    @staticmethod
+    def observe(histograms, key, buckets, value):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                histogram["buckets"][i] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+    def record_request(self, method, route, status_code, seconds, stats: RequestStats):
+        with self.lock:
+            key = (method, route, str(status_code))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.observe(self.latency, (method, route), METRICS_LATENCY_BUCKETS, seconds)
+            self.observe(self.statements, (method, route), METRICS_STATEMENT_BUCKETS, stats.statements)
+            self.db_seconds[(method, route)] = self.db_seconds.get((method, route), 0.0) + stats.db_seconds
+
+    def record_background_statement(self, seconds):
+        with self.lock:
+            self.background.statements += 1
+            self.background.db_seconds += seconds
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        def labels(names, values, le=None):
+            pairs = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in zip(names, values)]
+            if le is not None:
+                pairs.append(("le", le))
+            return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+        def histogram_lines(name, histograms, buckets):
+            lines = []
+            for key, histogram in sorted(histograms.items()):
+                for bound, count in zip(buckets, histogram["buckets"]):
+                    lines.append(f"{name}_bucket{labels(('method', 'route'), key, str(bound))} {count}")
+                lines.append(f"{name}_bucket{labels(('method', 'route'), key, '+Inf')} {histogram['count']}")
+                lines.append(f"{name}_sum{labels(('method', 'route'), key)} {histogram['sum']}")
+                lines.append(f"{name}_count{labels(('method', 'route'), key)} {histogram['count']}")
+            return lines
+
+        with self.lock:
+            lines = ["# HELP sahara_http_requests_total HTTP requests by route and status.", "# TYPE sahara_http_requests_total counter"]
+            for key, count in sorted(self.requests.items()):
+                lines.append(f"sahara_http_requests_total{labels(('method', 'route', 'status'), key)} {count}")
+            lines += ["# HELP sahara_http_request_duration_seconds Time to answer HTTP requests.", "# TYPE sahara_http_request_duration_seconds histogram"]
+            lines += histogram_lines("sahara_http_request_duration_seconds", self.latency, METRICS_LATENCY_BUCKETS)
+            lines += ["# HELP sahara_db_statements_per_request SQL statements executed per HTTP request.", "# TYPE sahara_db_statements_per_request histogram"]
+            lines += histogram_lines("sahara_db_statements_per_request", self.statements, METRICS_STATEMENT_BUCKETS)
+            lines += ["# HELP sahara_db_seconds_total Time spent executing SQL statements.", "# TYPE sahara_db_seconds_total counter"]
+            for key, seconds in sorted(self.db_seconds.items()):
+                lines.append(f"sahara_db_seconds_total{labels(('method', 'route'), key)} {seconds}")
+            lines.append(f'sahara_db_seconds_total{{method="",route="background"}} {self.background.db_seconds}')
+            lines += ["# HELP sahara_db_background_statements_total SQL statements executed outside HTTP requests.", "# TYPE sahara_db_background_statements_total counter"]
+            lines.append(f"sahara_db_background_statements_total {self.background.statements}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+@event.listens_for(engine, "before_cursor_execute")
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+@event.listens_for(engine, "after_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["statement_started"].pop()
+    stats = request_stats.get()
+    if stats is None:
+        metrics.record_background_statement(seconds)
+    else:
+        stats.statements += 1
+        stats.db_seconds += seconds
+
+@event.listens_for(engine, "handle_error")
+def drop_statement_timer(exception_context):
+    # after_cursor_execute does not run for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_started"):
+        connection.info["statement_started"].pop()
+
+class MetricsMiddleware:
+    """Time every HTTP request and attribute its SQL statements to the matched route"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_stats.reset(token)
+            seconds = time.perf_counter() - started
+            # The route template keeps the label set small, unmatched paths share one label
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            metrics.record_request(scope["method"], route_path, status_code, seconds, stats)
+            if METRICS_STATEMENT_WARNING and stats.statements > METRICS_STATEMENT_WARNING:
+                logger.warning(
+                    "%s %s issued %d SQL statements", scope["method"], route_path, stats.statements,
+                    extra={"route": route_path, "statements": stats.statements, "db_ms": round(stats.db_seconds * 1000, 1), "duration_ms": round(seconds * 1000, 1)}
+                )
+
+# Outermost, so rate-limited and CORS preflight requests are measured too
+app.add_middleware(MetricsMiddleware)
+# Around everything else, so every log record of a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
+# this is to let Prometheus scrape request and SQL metrics
+@app.get("/metrics", include_in_schema=False)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+logger.info("Creating tables")
 Base.metadata.create_all(bind=engine)
-print("Tables created!")
+logger.info("Tables created")
 
 # Reset sequences for all tables
-print("Resetting sequences...")
+logger.info("Resetting sequences")
 with engine.connect() as connection:
     # Get all table names from SQLAlchemy metadata
     table_names = Base.metadata.tables.keys()
@@ -889,7 +1465,7 @@ with engine.connect() as connection:
         with SessionLocal() as db:
             reset_sequence(table_name, db)
             
-print("Sequences reset!")
+logger.info("Sequences reset")
 
 # Add missing columns to submittables table if they don't exist
 with engine.connect() as connection:
@@ -926,6 +1502,207 @@ with engine.connect() as connection:
     """))
     connection.commit()
 
+    # Calendar window lookups filter on start and the owning user/team
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_global_calendar_start ON global_calendar (start);
+        CREATE INDEX IF NOT EXISTS ix_user_calendar_user_id_start ON user_calendar (user_id, start);
+        CREATE INDEX IF NOT EXISTS ix_team_calendar_team_id_start ON team_calendar (team_id, start);
+    """))
+    connection.commit()
+
+    # Modification sequence used by the calendar feed and incremental sync
+    connection.execute(text("""
+        CREATE SEQUENCE IF NOT EXISTS calendar_change_seq;
+        ALTER TABLE global_calendar ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('calendar_change_seq');
+        ALTER TABLE user_calendar ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('calendar_change_seq');
+        ALTER TABLE team_calendar ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('calendar_change_seq');
+        CREATE INDEX IF NOT EXISTS ix_global_calendar_change_seq ON global_calendar (change_seq);
+        CREATE INDEX IF NOT EXISTS ix_user_calendar_change_seq ON user_calendar (change_seq);
+        CREATE INDEX IF NOT EXISTS ix_team_calendar_change_seq ON team_calendar (change_seq);
+    """))
+    connection.commit()
+
+    # Writing transaction id, the commit-ordered watermark of incremental sync
+    connection.execute(text("""
+        ALTER TABLE global_calendar ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint);
+        ALTER TABLE user_calendar ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint);
+        ALTER TABLE team_calendar ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint);
+        ALTER TABLE calendar_tombstones ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text::bigint);
+        CREATE INDEX IF NOT EXISTS ix_global_calendar_change_xid ON global_calendar (change_xid);
+        CREATE INDEX IF NOT EXISTS ix_user_calendar_change_xid ON user_calendar (change_xid);
+        CREATE INDEX IF NOT EXISTS ix_team_calendar_change_xid ON team_calendar (change_xid);
+        CREATE INDEX IF NOT EXISTS ix_calendar_tombstones_change_xid ON calendar_tombstones (change_xid);
+    """))
+    connection.commit()
+
+    # Forms listing: timestamp deadline and one response per (form, user)
+    connection.execute(text("""
+        -- keep the latest response if a race ever stored two
+        DELETE FROM form_responses older
+        USING form_responses newer
+        WHERE older.form_id = newer.form_id AND older.user_id = newer.user_id AND older.id < newer.id;
+
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_form_responses_form_user ON form_responses (form_id, user_id);
+    """))
+    connection.commit()
+
+    # Form definitions used to be stored as a JSON string inside the JSONB column
+    connection.execute(text("""
+        ALTER TABLE forms ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+        UPDATE forms SET form_json = (form_json #>> '{}')::jsonb WHERE jsonb_typeof(form_json) = 'string';
+    """))
+    connection.commit()
+
+    # Responses stored before they were validated can be invalid JSON or not an
+    # object; form analytics reads them through this instead of ::jsonb
+    connection.execute(text("""
+        CREATE OR REPLACE FUNCTION jsonb_object_or_null(value TEXT) RETURNS JSONB AS $$
+        DECLARE
+            parsed JSONB;
+        BEGIN
+            parsed := value::jsonb;
+            RETURN CASE WHEN jsonb_typeof(parsed) = 'object' THEN parsed END;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql IMMUTABLE;
+    """))
+    connection.commit()
+
+    # opens_at / deadline of submittables and assignables move from ISO strings to timestamptz
+    connection.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    connection.execute(text(ISO_TO_TIMESTAMPTZ))
+    for table_name in ("submittables", "assignables"):
+        convert_to_timestamptz(connection, table_name, "opens_at")
+        convert_to_timestamptz(connection, table_name, "deadline")
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_submittables_deadline ON submittables (deadline);
+        CREATE INDEX IF NOT EXISTS ix_submittables_opens_at ON submittables (opens_at);
+        CREATE INDEX IF NOT EXISTS ix_assignables_deadline ON assignables (deadline);
+        CREATE INDEX IF NOT EXISTS ix_assignables_opens_at ON assignables (opens_at);
+    """))
+    connection.commit()
+
+# mail_outbox gained per-user tracking for credential emails
+with engine.connect() as connection:
+    connection.execute(text("""
+        ALTER TABLE mail_outbox ADD COLUMN IF NOT EXISTS kind VARCHAR NOT NULL DEFAULT 'notification';
+        ALTER TABLE mail_outbox ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id) ON DELETE SET NULL;
+        CREATE INDEX IF NOT EXISTS ix_mail_outbox_kind_user ON mail_outbox (kind, user_id);
+    """))
+    connection.commit()
+
+# Foreign keys on the hot paths only had their primary keys indexed. Pairs the
+# endpoints treat as one-per-owner become unique, but only where no owner has
+# two rows yet: which row to keep, and what to do with its files, is left to
+# an operator (dedupe_one_per_owner.py), so startup reports them and leaves
+# that index out until they are resolved.
+ONE_PER_OWNER_INDEXES = [  # (table, owner columns, unique index)
+    ("submissions", ("submittable_id", "team_id"), "ux_submissions_submittable_team"),
+    ("assignments", ("assignable_id", "user_id"), "ux_assignments_assignable_user"),
+    ("gradeable_scores", ("gradeable_id", "user_id"), "ux_gradeable_scores_gradeable_user"),
+    ("team_tas", ("team_id", "ta_id"), "ux_team_tas_team_ta"),
+    ("feedback_submissions", ("team_id", "submitter_id"), "ux_feedback_submissions_team_submitter"),
+]
+
+def duplicate_owner_rows(connection, table_name: str, owner_columns) -> list:
+    """Owners with more than one row: owner column values plus ids, the ids oldest first"""
+    columns = ", ".join(owner_columns)
+    return connection.execute(text(f"""
+        SELECT {columns}, array_agg(id ORDER BY id) AS ids FROM {table_name}
+        GROUP BY {columns} HAVING count(*) > 1
+        ORDER BY {columns}
+    """)).all()
+
+with engine.connect() as connection:
+    for table_name, owner_columns, index_name in ONE_PER_OWNER_INDEXES:
+        if connection.execute(text("SELECT to_regclass(:index_name)"), {"index_name": index_name}).scalar():
+            continue
+        duplicates = duplicate_owner_rows(connection, table_name, owner_columns)
+        if duplicates:
+            logger.error(
+                "Not creating unique index %s, %d owners have several %s rows (%s). "
+                "Run python dedupe_one_per_owner.py to review and remove them",
+                index_name, len(duplicates), table_name,
+                "; ".join(
+                    f"{', '.join(f'{column}={value}' for column, value in zip(owner_columns, row))} ids={row.ids}"
+                    for row in duplicates
+                ),
+            )
+            continue
+        connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(owner_columns)})"))
+
+    connection.execute(text("""
+        CREATE INDEX IF NOT EXISTS ix_submissions_team_id ON submissions (team_id);
+        CREATE INDEX IF NOT EXISTS ix_assignments_user_id ON assignments (user_id);
+        CREATE INDEX IF NOT EXISTS ix_gradeable_scores_user_id ON gradeable_scores (user_id);
+        CREATE INDEX IF NOT EXISTS ix_team_tas_ta_id ON team_tas (ta_id);
+        CREATE INDEX IF NOT EXISTS ix_feedback_details_submission_id ON feedback_details (submission_id);
+        CREATE INDEX IF NOT EXISTS ix_messages_channel_created ON messages (channel_id, created_at);
+        CREATE INDEX IF NOT EXISTS ix_messages_sender_id ON messages (sender_id);
+        CREATE INDEX IF NOT EXISTS ix_form_responses_user_id ON form_responses (user_id);
+        CREATE INDEX IF NOT EXISTS ix_channels_type_team ON channels (type, team_id);
+        CREATE INDEX IF NOT EXISTS ix_users_team_id ON users (team_id);
+        CREATE INDEX IF NOT EXISTS ix_team_members_user_id ON team_members (user_id);
+    """))
+    connection.commit()
+
+# The remaining ISO-string and naive timestamp columns become timestamptz. Their
+# defaults used to be evaluated once at import, so every row got the worker's
+# boot time; record stamps now default to now() in the database.
+with engine.connect() as connection:
+    connection.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    connection.execute(text(ISO_TO_TIMESTAMPTZ))
+    # forms.deadline_at held the parsed deadline while deadline was text
+    connection.execute(text("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'forms' AND column_name = 'deadline_at') THEN
+                IF EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'forms' AND column_name = 'deadline' AND data_type <> 'timestamp with time zone') THEN
+                    UPDATE forms SET deadline = deadline_at::text WHERE deadline_at IS NOT NULL;
+                END IF;
+                ALTER TABLE forms DROP COLUMN deadline_at;
+            END IF;
+        END $$;
+    """))
+
+    # (table, column, whether it is a record stamp defaulting to now())
+    for table_name, column_name, stamp in (
+        ("invites", "invited_at", True),
+        ("submittables", "created_at", True),
+        ("assignables", "created_at", True),
+        ("submissions", "submitted_on", True),
+        ("assignments", "submitted_on", True),
+        ("forms", "created_at", True),
+        ("forms", "deadline", False),
+        ("announcements", "created_at", True),
+        ("form_responses", "submitted_at", True),
+        ("gradeables", "created_at", True),
+        ("messages", "created_at", True),
+        ("feedback_submissions", "submitted_at", True),
+        ("team_calendar", "start", False),
+        ("team_calendar", "end", False),
+        ("user_calendar", "start", False),
+        ("user_calendar", "end", False),
+        ("global_calendar", "start", False),
+        ("global_calendar", "end", False),
+        ("user_otps", "expires_at", False),
+    ):
+        convert_to_timestamptz(connection, table_name, column_name, stamp=stamp)
+
+    connection.execute(text("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'course_config' AND column_name = 'updated_at' AND column_default IS NULL) THEN
+                ALTER TABLE course_config ALTER COLUMN updated_at SET DEFAULT now();
+            END IF;
+        END $$;
+
+        CREATE INDEX IF NOT EXISTS ix_announcements_created_at ON announcements (created_at);
+    """))
+    connection.commit()
+
 # Create default roles if they don't exist
 def create_default_roles():
     with SessionLocal() as db:
@@ -986,6 +1763,76 @@ def create_default_skills():
                 db.add(new_skill)
         
         db.commit()
+
+# Reference data: roles and skills change rarely (roles never after startup),
+# so each process keeps them in memory instead of querying them per request.
+# Skill writes go through invalidate_skills(), which advances skills_version_seq;
+# every worker compares that one-row sequence with the version of its cached
+# skills on read and reloads them when another process has changed them.
+ROLE_DISPLAY_NAMES = {RoleType.PROF: "Professor", RoleType.STUDENT: "Student", RoleType.TA: "TA"}
+reference_data = {"role_ids": {}, "roles_by_id": {}, "skills": None}
+
+def skill_to_json(skill) -> dict:
+    return {
+        "id": skill.id,
+        "name": skill.name,
+        "bgColor": skill.bgColor,
+        "color": skill.color,
+        "icon": skill.icon
+    }
+
+def load_roles(db: Session):
+    rows = db.query(Role.id, Role.role).all()
+    reference_data["roles_by_id"] = {role_id: role for role_id, role in rows}
+    reference_data["role_ids"] = {role: role_id for role_id, role in rows}
+
+def load_reference_data():
+    """Fill the role and skill caches, run once at startup after the defaults exist"""
+    with SessionLocal() as db:
+        load_roles(db)
+        get_all_skills(db)
+
+def role_id_for(role: RoleType, db: Session) -> Optional[int]:
+    """
+    Id of the Role row for a RoleType
+
+    Parameters:
+    - role: the RoleType to look up
+    - db: used only when the cache has not seen this role yet
+
+    Returns:
+    - the role id, or None if the role does not exist
+    """
+    if role not in reference_data["role_ids"]:
+        load_roles(db)
+    return reference_data["role_ids"].get(role)
+
+def role_for_id(role_id: int, db: Session) -> Optional[RoleType]:
+    """RoleType of a role id (e.g. User.role_id), None if there is no such role"""
+    if role_id not in reference_data["roles_by_id"]:
+        load_roles(db)
+    return reference_data["roles_by_id"].get(role_id)
+
+def get_all_skills(db: Session) -> List[dict]:
+    """
+    Every skill as JSON-ready dicts, ordered by id
+
+    The list is shared between requests, callers must not modify it.
+    """
+    # read before the skills, so a write committed in between leaves the cache stale rather than wrongly current
+    version = tuple(db.execute(text("SELECT last_value, is_called FROM skills_version_seq")).one())
+    cached = reference_data["skills"]
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    skills = [skill_to_json(skill) for skill in db.query(Skill).order_by(Skill.id).all()]
+    reference_data["skills"] = (version, skills)
+    return skills
+
+def invalidate_skills(db: Session):
+    """Mark every process's cached skills stale, call after committing a skill create/update/delete"""
+    db.execute(select(skills_version_seq.next_value()))
+    reference_data["skills"] = None
+
 ###
 # Authentication
 ###
@@ -1046,7 +1893,6 @@ def get_verified_user(token: str = Depends(oauth2_scheme)):
 
 
 def get_current_user_from_string(token: str, db: Session):
-    print("In here")
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -1064,7 +1910,7 @@ def get_current_user_from_string(token: str, db: Session):
     if user is None:
         raise credentials_exception
     
-    role = db.query(Role).filter(Role.id == user.role_id).first().role
+    role = role_for_id(user.role_id, db)
     
     return {"user": user, "role": role}
 
@@ -1086,7 +1932,8 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if user is None:
         raise credentials_exception
     
-    role = db.query(Role).filter(Role.id == user.role_id).first().role
+    role = role_for_id(user.role_id, db)
+    record_auth_context(user.id, role)
     
     return {"user": user, "role": role}
 
@@ -1102,9 +1949,10 @@ def prof_required(token: str = Depends(oauth2_scheme), db: Session = Depends(get
         if not user:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not found")
             
-        role = db.query(Role).filter(Role.id == user.role_id).first()
-        if role.role != RoleType.PROF:
+        role = role_for_id(user.role_id, db)
+        if role != RoleType.PROF:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized, professor access required")
+        record_auth_context(user.id, role)
             
         return payload
     except jwt.PyJWTError:
@@ -1122,12 +1970,13 @@ def prof_or_ta_required(token: str = Depends(oauth2_scheme), db: Session = Depen
         if not user:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User not found")
         # Check if user is a professor or TA
-        role = db.query(Role).filter(Role.id == user.role_id).first()
-        if role.role not in [RoleType.PROF, RoleType.TA]:
+        role = role_for_id(user.role_id, db)
+        if role not in [RoleType.PROF, RoleType.TA]:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, 
                 detail="Not authorized, professor or TA access required"
             )
+        record_auth_context(user.id, role)
         return payload
     except jwt.PyJWTError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
@@ -1136,6 +1985,7 @@ def prof_or_ta_required(token: str = Depends(oauth2_scheme), db: Session = Depen
 create_default_roles()
 create_default_prof()  # Create Indranil Saha
 create_default_skills()  
+load_reference_data()
 
 # Authentication endpoints
 @app.post("/login")
@@ -1151,7 +2001,7 @@ def login(request: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session
             )
 
         # Get the role
-        role = db.query(Role).filter(Role.id == user.role_id).first()
+        role = role_for_id(user.role_id, db)
         if not role:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
@@ -1167,12 +2017,12 @@ def login(request: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session
         return {
             "access_token": token,
             "token_type": "bearer",
-            "role": role.role.value
+            "role": role.value
         }
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.exception("Login error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1221,8 +2071,8 @@ def create_prof(
         )
     
     # Get prof role id
-    prof_role = db.query(Role).filter(Role.role == RoleType.PROF).first()
-    if not prof_role:
+    prof_role_id = role_id_for(RoleType.PROF, db)
+    if prof_role_id is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Professor role not found"
@@ -1238,7 +2088,7 @@ def create_prof(
         email=request.email, 
         username=username, 
         hashed_password=hashed_password,
-        role_id=prof_role.id
+        role_id=prof_role_id
     )
     
     db.add(new_prof)
@@ -1280,7 +2130,7 @@ def extract_students(content: str) -> List[dict]:
 
     for student in students:
         if not student['RollNo'] or not student['Name'] or not student['Email']:
-            print(student)
+            csv_logger.debug("Incomplete student row", extra={"row": student})
             raise CSVFormatError("All fields must be filled for each student.")
     
     return students
@@ -1308,6 +2158,7 @@ Notes:
 @app.post("/upload-students")
 async def upload_students(
     file: UploadFile = File(...),
+    email_credentials: bool = Query(False),
     token: str = Depends(prof_or_ta_required),
     db: Session = Depends(get_db)
 ):
@@ -1389,8 +2240,8 @@ async def upload_students(
             )
         
         # Get student role
-        student_role = db.query(Role).filter(Role.role == RoleType.STUDENT).first()
-        if not student_role:
+        student_role_id = role_id_for(RoleType.STUDENT, db)
+        if student_role_id is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Student role not found"
@@ -1501,12 +2352,16 @@ async def upload_students(
                     email=email,
                     username=username,
                     hashed_password=hashed_password,
-                    role_id=student_role.id
+                    role_id=student_role_id
                 )
                 
                 db.add(new_student)
                 db.flush()  # Get ID without committing
                 
+                # Queued in the same transaction, so only created accounts are emailed
+                if email_credentials:
+                    enqueue_credentials_email(db, new_student, temp_password, "student")
+                
                 # Add to successful creations
                 created_students.append({
                     "row": index + 2,
@@ -1535,7 +2390,8 @@ async def upload_students(
             content={
                 "message": f"Processed {len(created_students)} students successfully with {len(errors)} errors",
                 "created_students": created_students,
-                "errors": errors
+                "errors": errors,
+                "emails_queued": len(created_students) if email_credentials else 0
             }
         )
     
@@ -1552,6 +2408,7 @@ async def upload_students(
 @app.post("/upload-tas")
 async def upload_tas(
     file: UploadFile = File(...),
+    email_credentials: bool = Query(False),
     token: str = Depends(prof_required),
     db: Session = Depends(get_db)
 ):
@@ -1569,9 +2426,7 @@ async def upload_tas(
         content_str = content.decode('utf-8')
         if content_str.startswith('\ufeff'):
             content_str = content_str[1:]
-            print("BOM detected and removed from CSV")
-        # Print the first few lines for debugging
-        print(f"CSV Content (first 100 chars): {content_str[:100]}")
+            csv_logger.debug("BOM detected and removed from CSV")
         
         # Parse the CSV directly to get TAs
         reader = csv.DictReader(content_str.splitlines())
@@ -1579,7 +2434,7 @@ async def upload_tas(
         
         # Validate headers
         headers = reader.fieldnames
-        print(f"CSV Headers: {headers}")
+        csv_logger.debug("CSV headers", extra={"headers": headers})
         
         if not headers:
             raise HTTPException(
@@ -1602,14 +2457,14 @@ async def upload_tas(
                     'Email': row['Email']
                 })
         
-        print(f"Parsed {len(tas)} TAs from CSV")
+        logger.info("Parsed %d TAs from CSV", len(tas))
         
         created_tas = []
         errors = []
         
         # Get TA role
-        ta_role = db.query(Role).filter(Role.role == RoleType.TA).first()
-        if not ta_role:
+        ta_role_id = role_id_for(RoleType.TA, db)
+        if ta_role_id is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="TA role not found"
@@ -1620,7 +2475,7 @@ async def upload_tas(
             try:
                 # Extract username from email
                 username = ta['Email'].split('@')[0]
-                print(f"Processing TA: {ta['Name']}, username: {username}")
+                csv_logger.debug("Processing TA %s", username)
                 
                 # Check if username already exists
                 existing_user = db.query(User).filter(User.username == username).first()
@@ -1638,11 +2493,14 @@ async def upload_tas(
                     email=ta['Email'],
                     username=username,
                     hashed_password=hashed_password,
-                    role_id=ta_role.id
+                    role_id=ta_role_id
                 )
                 
                 # Add to database
                 db.add(new_ta)
+                if email_credentials:
+                    db.flush()
+                    enqueue_credentials_email(db, new_ta, temp_password, "TA")
                 db.commit()
                 db.refresh(new_ta)
                 
@@ -1656,22 +2514,20 @@ async def upload_tas(
                 
             except Exception as e:
                 db.rollback()  # Rollback on error
-                print(f"Error processing TA {ta['Name']}: {str(e)}")
+                logger.warning("Error processing TA %s: %s", ta['Name'], e)
                 errors.append(f"Error processing TA {ta['Name']}: {str(e)}")
         
         return {
             "message": f"Processed {len(created_tas)} TAs",
             "created_tas": created_tas,
-            "errors": errors
+            "errors": errors,
+            "emails_queued": len(created_tas) if email_credentials else 0
         }
     
     except HTTPException as he:
-        print(f"HTTP Exception: {he.detail}")
         raise he
     except Exception as e:
-        import traceback
-        print(f"Error in upload_tas: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error in upload_tas")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing CSV file: {str(e)}"
@@ -1708,8 +2564,8 @@ def register_temp(
         )
     
     # Get role ID
-    role = db.query(Role).filter(Role.role == request.role).first()
-    if not role:
+    role_id = role_id_for(request.role, db)
+    if role_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Role {request.role} does not exist"
@@ -1724,7 +2580,7 @@ def register_temp(
         email=request.email,
         username=username,
         hashed_password=hashed_password,
-        role_id=role.id
+        role_id=role_id
     )
     
     # Add user to database
@@ -1867,12 +2723,18 @@ async def download_announcement_file(
 @app.get('/announcements', response_model=List[Show])
 def all(db: Session = Depends(get_db)):
     try:
-        announcements = db.query(Announcement).order_by(Announcement.created_at.desc()).all()
-        # Instead of returning creator id return creator name
-        for announcement in announcements:
-            creator = db.query(User).filter(User.id == announcement.creator_id).first()
-            announcement.creator_name = creator.name if creator else f"User {announcement.creator_id}"
-        return announcements
+        # Creator names come from a join instead of one query per announcement;
+        # rows are dumped straight to JSON, response_model only documents them
+        announcements = db.query(
+            Announcement.id,
+            Announcement.creator_id,
+            Announcement.created_at,
+            Announcement.title,
+            Announcement.content,
+            Announcement.url_name,
+            func.coalesce(User.name, func.concat("User ", Announcement.creator_id)).label("creator_name")
+        ).outerjoin(User, User.id == Announcement.creator_id).order_by(Announcement.created_at.desc()).all()
+        return fast_json(ANNOUNCEMENTS_ADAPTER, [announcement._asdict() for announcement in announcements])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1929,7 +2791,6 @@ def destroy(
        
         if current_user["role"].value != "prof":
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only professors can delete announcements")
-        print("Here")
         announcement = db.query(Announcement).filter(Announcement.id == id).first()
         if not announcement:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f'Announcement with id: {id} not found')
@@ -1995,7 +2856,7 @@ class AllocationResponse(BaseModel):
 def get_allocation(n: int, db: Session):
     # Get all teams and TAs (make sure the TA filter is consistent with your schema)
     teams = db.query(Team).all()
-    tas = db.query(User).filter(User.role_id == 3).all()
+    tas = db.query(User).filter(User.role_id == role_id_for(RoleType.TA, db)).all()
     
     if not tas:
         raise HTTPException(status_code=400, detail="No TAs available")
@@ -2093,7 +2954,7 @@ async def create_match(n: int, db: Session = Depends(get_db)):
     
     try:
         # Get total number of TAs using a join (this ensures we compare the actual enum)
-        total_tas = db.query(User).join(Role).filter(Role.role == RoleType.TA).count()
+        total_tas = db.query(User).filter(User.role_id == role_id_for(RoleType.TA, db)).count()
         
         # Validate if n exceeds total TAs
         if n > total_tas:
@@ -2225,61 +3086,267 @@ async def get_match(db: Session = Depends(get_db)):
     
 #     pass
 
-@app.get("/calendar")
-def get_calendar(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    # user_id: int = Depends(resolve_token)
-):
-    user = current_user["user"]
-    role = current_user["role"]
-
-    events = []
-    # Get the global events
-    global_events_db = db.query(NewGlobalCalendarEvent).all()
-    global_events = []
-    for event in global_events_db:
-        global_events.append({
-            "event_id": f"g{event.id}",
-            "title": event.title,
-            "subtitle": event.subtitle,
-            "start": event.start,
-            "end": event.end,
-            "type": "global"
-        })
-        events += global_events
-    
-    user_events_db = db.query(NewUserCalendarEvent).filter_by(user_id=user.id).all()
-    user_events = []
-    for event in user_events_db:
-        user_events.append({
-            "event_id": f"p{event.id}",
-            "title": event.title,
-            "subtitle": event.subtitle,
-            "start": event.start,
-            "end": event.end,
-            "type": "personal"
-        })
-        events += user_events
+def to_calendar_bound(value: datetime) -> datetime:
+    """Normalize a window bound to an aware UTC datetime, naive values are taken as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def visible_calendar_sources(user: User):
+    """(model, event id prefix, event type, owner criteria) for every calendar a user can see"""
+    sources = [
+        (NewGlobalCalendarEvent, "g", "global", []),
+        (NewUserCalendarEvent, "p", "personal", [NewUserCalendarEvent.user_id == user.id]),
+    ]
     if user.team_id:
-        team_events_db = db.query(NewTeamCalendarEvent).filter_by(team_id=user.team_id).all()
-        team_events = []
-        for event in team_events_db:
-            team_events.append({
-                "event_id": f"t{event.id}",
-                "title": event.title,
-                "subtitle": event.subtitle,
-                "start": event.start,
-                "end": event.end,
-                "type": "team"
-            })
-        events += team_events
-    
-    
-    
+        sources.append((NewTeamCalendarEvent, "t", "team", [NewTeamCalendarEvent.team_id == user.team_id]))
+    return sources
+
+def select_visible_calendar_events(user: User, criteria=lambda model: []):
+    """
+    Build one UNION ALL over the global, personal and team calendars of a user
+
+    Parameters:
+    - user: User whose calendars are read
+    - criteria: callable returning extra WHERE clauses for a calendar model
+    """
+    return union_all(*[
+        select(
+            literal(prefix).label("prefix"),
+            model.id,
+            model.title,
+            model.subtitle,
+            model.start,
+            model.end,
+            model.change_seq,
+            literal(event_type).label("type")
+        ).where(*owner_criteria, *criteria(model))
+        for model, prefix, event_type, owner_criteria in visible_calendar_sources(user)
+    ])
+
+def calendar_row_to_json(row) -> Dict[str, Any]:
+    return {
+        "event_id": f"{row.prefix}{row.id}",
+        "title": row.title,
+        "subtitle": row.subtitle,
+        "start": row.start,
+        "end": row.end,
+        "type": row.type
+    }
+
+def get_calendar_events_in_window(user: User, window_start: datetime, window_end: datetime, db: Session) -> List[Dict[str, Any]]:
+    """
+    Get every calendar event visible to a user that overlaps [window_start, window_end)
+
+    Global, personal and team events are read with a single UNION ALL so the
+    whole month view costs one round trip, and the window is applied in SQL.
+    """
+    window_from = to_calendar_bound(window_start)
+    window_to = to_calendar_bound(window_end)
+    statement = select_visible_calendar_events(
+        user,
+        lambda model: [model.start < window_to, model.end >= window_from]
+    ).order_by(text("start"))
+    return [calendar_row_to_json(row) for row in db.execute(statement)]
+
+def visible_calendar_tombstones(user: User):
+    """Criteria matching the deletions a user is allowed to learn about"""
+    scopes = [
+        and_(CalendarEventTombstone.user_id.is_(None), CalendarEventTombstone.team_id.is_(None)),
+        CalendarEventTombstone.user_id == user.id,
+    ]
+    if user.team_id:
+        scopes.append(CalendarEventTombstone.team_id == user.team_id)
+    return or_(*scopes)
+
+def get_calendar_sync_token(db: Session) -> int:
+    """
+    Commit-ordered watermark for incremental sync
+
+    The xmin of the current snapshot: every transaction with a lower id has
+    committed or aborted, so no change with change_xid below the token can
+    still appear. Changes at or above it are sent again on the next sync.
+    """
+    return db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+
+def get_calendar_etag(user: User, db: Session) -> str:
+    """
+    Fingerprint of the events and deletions visible to a user
+
+    Every insert, update and deletion brings a new, higher change_seq, so
+    their sum moves on each change whatever order transactions commit in,
+    which the maximum alone does not.
+    """
+    changes = union_all(
+        select(CalendarEventTombstone.change_seq).where(visible_calendar_tombstones(user)),
+        *[
+            select(model.change_seq).where(*owner_criteria)
+            for model, _, _, owner_criteria in visible_calendar_sources(user)
+        ]
+    ).subquery()
+    count, total = db.execute(select(func.count(), func.coalesce(func.sum(changes.c.change_seq), 0))).one()
+    return f'"{user.id}-{count}-{total}"'
+
+def record_calendar_deletion(event_id: str, db: Session, user_id: Optional[int] = None, team_id: Optional[int] = None):
+    """Leave a tombstone for a deleted event; committed together with the delete"""
+    db.add(CalendarEventTombstone(event_id=event_id, user_id=user_id, team_id=team_id))
+
+def parse_calendar_time(value: str) -> datetime:
+    """Parse a stored ISO 8601 start/end string, treating naive values as UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def ics_escape(value: str) -> str:
+    return (value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+def ics_fold(line: str) -> str:
+    """Fold a content line at 75 octets as required by RFC 5545"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Do not split a multi-byte UTF-8 character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    return "\r\n ".join(parts)
+
+def build_calendar_ics(user: User, rows) -> str:
+    """Render calendar rows as an iCalendar (RFC 5545) document"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Sahara//Course Calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{ics_escape(f'Sahara - {user.name}')}",
+    ]
+    for row in rows:
+        try:
+            start = parse_calendar_time(row.start)
+            end = parse_calendar_time(row.end)
+        except ValueError:
+            continue  # skip events with unparseable times rather than breaking the feed
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{row.prefix}{row.id}@sahara",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}",
+            f"DTEND:{end.strftime('%Y%m%dT%H%M%SZ')}",
+            f"SEQUENCE:{row.change_seq}",
+            f"SUMMARY:{ics_escape(row.title)}",
+            f"DESCRIPTION:{ics_escape(row.subtitle)}",
+            f"CATEGORIES:{row.type.upper()}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(ics_fold(line) for line in lines) + "\r\n"
+
+@app.get("/calendar")
+def get_calendar(
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    # user_id: int = Depends(resolve_token)
+):
+    user = current_user["user"]
+
+    if to_calendar_bound(window_end) <= to_calendar_bound(window_start):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+
+    events = get_calendar_events_in_window(user, window_start, window_end, db)
     return JSONResponse(status_code=201, content=events)
     # return {"message": "Calendar retrieved", "events": global_events}
 
+# this is to issue (or rotate) the secret link used to subscribe to the calendar from external apps
+@app.post("/calendar/feed-token")
+def create_calendar_feed_token(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    user = current_user["user"]
+    feed_token = db.query(CalendarFeedToken).filter_by(user_id=user.id).first()
+    if feed_token:
+        # Rotating invalidates any previously shared link
+        feed_token.token = secrets.token_urlsafe(32)
+        feed_token.created_at = datetime.now(timezone.utc)
+    else:
+        feed_token = CalendarFeedToken(user_id=user.id, token=secrets.token_urlsafe(32))
+        db.add(feed_token)
+    db.commit()
+    return JSONResponse(status_code=201, content={
+        "token": feed_token.token,
+        "feed_url": f"/calendar/feed/{feed_token.token}.ics"
+    })
+
+# this is the subscribable iCalendar feed, authenticated by the feed token in the URL
+@app.get("/calendar/feed/{feed_token}.ics")
+def get_calendar_feed(
+    feed_token: str,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    token = db.query(CalendarFeedToken).filter_by(token=feed_token).first()
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found")
+    user = token.user
+
+    # The feed only changes when the modification sequences move, so clients
+    # polling with If-None-Match get a 304 without the events being read
+    etag = get_calendar_etag(user, db)
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    rows = db.execute(select_visible_calendar_events(user).order_by(text("start"))).all()
+    return Response(
+        content=build_calendar_ics(user, rows),
+        media_type="text/calendar; charset=utf-8",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    )
+
+# this is for incremental sync, returns only what changed after the given sync token
+@app.get("/calendar/changes")
+def get_calendar_changes(
+    since: Optional[int] = Query(None, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    user = current_user["user"]
+    # Read the watermark before the changes, anything still in flight is at or above it
+    sync_token = get_calendar_sync_token(db)
+
+    if since is None:
+        rows = db.execute(select_visible_calendar_events(user).order_by(text("start"))).all()
+        return JSONResponse(status_code=200, content={
+            "full_sync": True,
+            "changed": [calendar_row_to_json(row) for row in rows],
+            "deleted": [],
+            "sync_token": sync_token
+        })
+
+    rows = db.execute(select_visible_calendar_events(
+        user,
+        lambda model: [model.change_xid >= since]
+    ).order_by(text("change_seq"))).all()
+    deleted = db.query(CalendarEventTombstone.event_id).filter(
+        visible_calendar_tombstones(user),
+        CalendarEventTombstone.change_xid >= since
+    ).order_by(CalendarEventTombstone.change_seq).all()
+    return JSONResponse(status_code=200, content={
+        "full_sync": False,
+        "changed": [calendar_row_to_json(row) for row in rows],
+        "deleted": [event_id for (event_id,) in deleted],
+        "sync_token": sync_token
+    })
+
 @app.post("/calendar/create")
 def create_calendar(
     calendar_event: CalendarEvent,
@@ -2430,6 +3497,7 @@ def delete_calendar_event(
         
         # Delete the event
         db.delete(event)
+        record_calendar_deletion(f"g{event_id}", db)
         db.commit()
         return JSONResponse(status_code=200, content={"message": "Event deleted"})
     elif event_id[0] == "p":
@@ -2444,6 +3512,7 @@ def delete_calendar_event(
         
         # Delete the event
         db.delete(event)
+        record_calendar_deletion(f"p{event_id}", db, user_id=event.user_id)
         db.commit()
         return JSONResponse(status_code=200, content={"message": "Event deleted"})
 
@@ -2470,6 +3539,7 @@ def delete_calendar_event(
         
 
         db.delete(event)
+        record_calendar_deletion(f"t{event_id}", db, team_id=event.team_id)
         db.commit()
         return JSONResponse(status_code=200, content={"message": "Event deleted"})
     else:
@@ -2550,17 +3620,18 @@ def update_calendar_event(
 
 @app.get("/people/")
 def get_people(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return_data = []
-    role_id_to_role = { 1 : "Professor", 2 : "Student", 3 : "TA"}
-    for user in users:
-        user_data = {}
-        user_data["id"] = user.id
-        user_data["name"] = user.name
-        user_data["email"] = user.email
-        user_data["role"] = role_id_to_role[user.role_id]
-        return_data.append(user_data)
-    return return_data
+    # Only the listed columns, loading User would also join every relationship
+    users = db.query(User.id, User.name, User.email, User.role_id).order_by(User.id).all()
+    return_data = [
+        {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "role": ROLE_DISPLAY_NAMES[role_for_id(user.role_id, db)],
+        }
+        for user in users
+    ]
+    return fast_json(PEOPLE_ADAPTER, return_data)
     # return {"access_token": token, "token_type": "bearer", "role": role}
 
 
@@ -2578,6 +3649,33 @@ def get_team(db: Session = Depends(get_db)):
     return return_data
 
 
+# Form response validation
+# form_json is a SurveyJS definition; each form is turned into a JSON schema for
+# its answers (form_schema.py) and compiled once, keyed by (form id, version) so an edited form
+# never reuses a stale validator.
+FORM_VALIDATOR_CACHE_SIZE = 256
+form_validator_cache: Dict[tuple, Any] = {}
+
+def get_form_response_validator(form: "Form"):
+    """
+    Get the compiled response validator for a form, compiling it on first use
+
+    Parameters:
+    - form: Form row, its id and version form the cache key
+
+    Returns:
+    - Callable raising fastjsonschema.JsonSchemaException on invalid data
+    """
+    key = (form.id, form.version)
+    validator_fn = form_validator_cache.get(key)
+    if validator_fn is None:
+        validator_fn = fastjsonschema.compile(build_form_response_schema(form.form_json))
+        if len(form_validator_cache) >= FORM_VALIDATOR_CACHE_SIZE:
+            # Drop the oldest entry, dicts keep insertion order
+            form_validator_cache.pop(next(iter(form_validator_cache)))
+        form_validator_cache[key] = validator_fn
+    return validator_fn
+
 # Form-related helper functions
 def create_form_db(form_data: FormCreateRequest, db: Session) -> Dict[str, Any]:
     """
@@ -2599,8 +3697,7 @@ def create_form_db(form_data: FormCreateRequest, db: Session) -> Dict[str, Any]:
             # target_type=form_data.target_type,
             # target_id=form_data.target_id,
             # target_type= RoleType.STUDENT,
-            created_at=datetime.now(timezone.utc).isoformat(),
-            form_json=json.dumps(form_data.form_json),
+            form_json=form_data.form_json,
             deadline=form_data.deadline
         )
         
@@ -2617,7 +3714,7 @@ def create_form_db(form_data: FormCreateRequest, db: Session) -> Dict[str, Any]:
         }
     except Exception as e:
         db.rollback()
-        print(f"error creating form: {str(e)}")
+        logger.exception("Error creating form")
         raise HTTPException(status_code=500, detail=f"Error creating form: {str(e)}")
 
 def store_form_response_db(response_data: FormResponseSubmit, 
@@ -2635,15 +3732,26 @@ def store_form_response_db(response_data: FormResponseSubmit,
     - Dictionary with operation result
     """
     try:
-        # Check if form exists
-        form = db.query(Form).filter(Form.id == response_data.form_id).first()
+        # Check if form exists, the deadline is compared by the database clock
+        row = db.query(Form, (Form.deadline <= func.now()).label("deadline_passed")).filter(Form.id == response_data.form_id).first()
         
-        if not form:
+        if not row:
             raise HTTPException(status_code=404, detail="Form not found")
+        form = row.Form
         
         # Check deadline
-        if is_deadline_passed(form.deadline):
+        if row.deadline_passed:
             raise HTTPException(status_code=400, detail="Form submission deadline has passed")
+
+        # Validate the answers against the form's questions
+        try:
+            answers = json.loads(response_data.response_data)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Response data is not valid JSON")
+        try:
+            get_form_response_validator(form)(answers)
+        except fastjsonschema.JsonSchemaException as e:
+            raise HTTPException(status_code=422, detail=f"Invalid form response: {e.message}")
         
         # Check if user has already responded
         existing_response = db.query(FormResponse).filter(
@@ -2654,15 +3762,14 @@ def store_form_response_db(response_data: FormResponseSubmit,
         if existing_response:
             # Update existing response
             existing_response.response_data = response_data.response_data
-            existing_response.submitted_at = datetime.now(timezone.utc).isoformat()
+            existing_response.submitted_at = func.now()
             message = "Response updated successfully"
         else:
             # Add new response
             new_response = FormResponse(
                 form_id=response_data.form_id,
                 user_id=user_id,
-                response_data=response_data.response_data,
-                submitted_at=datetime.now(timezone.utc).isoformat()
+                response_data=response_data.response_data
             )
             db.add(new_response)
             message = "Response submitted successfully"
@@ -2692,9 +3799,10 @@ def get_form_by_id_db(form_id: int, db: Session) -> Dict[str, Any]:
     - Dictionary with form details
     """
     try:
-        form = db.query(Form).filter(Form.id == form_id).first()
-        if not form:
+        row = db.query(Form, (Form.deadline <= func.now()).label("deadline_passed")).filter(Form.id == form_id).first()
+        if not row:
             raise HTTPException(status_code=404, detail="Form not found")
+        form = row.Form
         
         # Return form data
         return {
@@ -2703,7 +3811,8 @@ def get_form_by_id_db(form_id: int, db: Session) -> Dict[str, Any]:
             "description": form.description,
             "created_at": form.created_at,
             "deadline": form.deadline,
-            "form_json": json.loads(form.form_json) if hasattr(form, "form_json") else None,
+            "deadline_passed": row.deadline_passed,
+            "form_json": form.form_json,
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving form: {str(e)}")
@@ -2740,67 +3849,52 @@ def get_user_response_db(form_id: int, user_id: int, db: Session) -> Dict[str, A
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving user response: {str(e)}")
 
-def is_deadline_passed(deadline: str) -> bool:
-    """
-    Check if a form's deadline has passed
-    
-    Parameters:
-    - deadline: ISO 8601 formatted deadline string
-    
-    Returns:
-    - True if deadline has passed, False otherwise
-    """
-    try:
-        # Parse deadline into datetime object
-        deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
-        # Compare with current time
-        return datetime.now(deadline_dt.tzinfo) > deadline_dt
-    except Exception as e:
-        # If there's any error parsing, default to assuming deadline has passed
-        raise ValueError(f"Invalid deadline format: {str(e)}")
-
-def get_all_forms_db(user_id: Optional[int] = None, db: Session = None) -> List[Dict[str, Any]]:
+def get_all_forms_db(user_id: Optional[int] = None, db: Session = None, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Get all forms in the database
     
     Parameters:
     - user_id: Optional user ID to check if the user has submitted the form
     - db: Database session
+    - limit, offset: Optional pagination over forms ordered by ID
     
     Returns:
     - List of form documents with data relevant for listing
     """
     try:
-        # Get all forms
-        forms = db.query(Form).all()
-        result = []
-        
-        for form in forms:
-            form_data = {
+        # One query: the deadline is compared in SQL and the user's response
+        # comes from a LEFT JOIN on the unique (form_id, user_id) index
+        query = db.query(
+            Form.id,
+            Form.title,
+            Form.description,
+            Form.created_at,
+            Form.deadline,
+            (Form.deadline <= func.now()).label("deadline_passed"),
+            (FormResponse.id.is_not(None) if user_id else literal(True)).label("responded")
+        )
+        if user_id:
+            query = query.outerjoin(
+                FormResponse,
+                and_(FormResponse.form_id == Form.id, FormResponse.user_id == user_id)
+            )
+        query = query.order_by(Form.id).offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [
+            {
                 "id": form.id,
                 "title": form.title,
                 "description": form.description,
                 "created_at": form.created_at,
                 "deadline": form.deadline,
-                # "target_type": form.target_type.value,
-                # "target_id": form.target_id,
                 "score": "-/-",  # Placeholder for score
-                "deadline_passed": is_deadline_passed(form.deadline)
+                "deadline_passed": form.deadline_passed,
+                "attempt": not form.responded
             }
-            
-            if user_id:
-                # Check if user has submitted a response
-                response = db.query(FormResponse).filter(
-                    FormResponse.form_id == form.id,
-                    FormResponse.user_id == user_id
-                ).first()
-                form_data["attempt"] = response is None
-            else:
-                form_data["attempt"] = False
-            
-            result.append(form_data)
-        
-        return result
+            for form in query.all()
+        ]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving forms: {str(e)}")
 
@@ -2827,7 +3921,7 @@ async def api_get_form(form_id: int, db: Session = Depends(get_db)):
 async def api_check_deadline(form_id: int, db: Session = Depends(get_db)):
     """Check if a form's deadline has passed"""
     form = get_form_by_id_db(form_id, db)
-    deadline_passed = is_deadline_passed(form.get("deadline", ""))
+    deadline_passed = form["deadline_passed"]
     return JSONResponse(
         status_code=200, 
         content={
@@ -2839,9 +3933,14 @@ async def api_check_deadline(form_id: int, db: Session = Depends(get_db)):
     )
 
 @app.post("/api/get_forms")
-async def api_get_forms(user: UserIdRequest, db: Session = Depends(get_db)):
+async def api_get_forms(
+    user: UserIdRequest,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
     """Get all forms with info about whether the user has submitted a response"""
-    forms = get_all_forms_db(user.user_id, db)
+    forms = get_all_forms_db(user.user_id, db, limit=limit, offset=offset)
     return JSONResponse(status_code=200, content=forms)
 
 @app.get("/api/forms/{form_id}/user/{user_id}")
@@ -2850,6 +3949,127 @@ async def api_get_user_response(form_id: int, user_id: int, db: Session = Depend
     response = get_user_response_db(form_id, user_id, db)
     return JSONResponse(status_code=200, content=response)
 
+# Form analytics, cached per form and recomputed once a response is added or edited
+form_analytics_cache: Dict[int, tuple] = {}
+
+FORM_ANSWER_TALLIES_SQL = text("""
+    SELECT answer.key AS question, COALESCE(element.value, answer.value) #>> '{}' AS answer, COUNT(*) AS count
+    FROM form_responses fr
+    CROSS JOIN LATERAL jsonb_each(jsonb_object_or_null(fr.response_data)) AS answer
+    LEFT JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(answer.value) = 'array' THEN answer.value END
+    ) AS element ON TRUE
+    WHERE fr.form_id = :form_id
+      AND jsonb_typeof(COALESCE(element.value, answer.value)) IN ('string', 'number', 'boolean')
+    GROUP BY 1, 2
+""")
+
+FORM_NUMERIC_SUMMARY_SQL = text("""
+    SELECT answer.key AS question,
+           COUNT(*) AS count,
+           AVG((answer.value #>> '{}')::numeric) AS mean,
+           MIN((answer.value #>> '{}')::numeric) AS min,
+           MAX((answer.value #>> '{}')::numeric) AS max,
+           STDDEV_SAMP((answer.value #>> '{}')::numeric) AS stddev,
+           PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY (answer.value #>> '{}')::numeric) AS median
+    FROM form_responses fr
+    CROSS JOIN LATERAL jsonb_each(jsonb_object_or_null(fr.response_data)) AS answer
+    WHERE fr.form_id = :form_id AND jsonb_typeof(answer.value) = 'number'
+    GROUP BY 1
+""")
+
+FORM_ANSWERED_SQL = text("""
+    SELECT answer.key AS question, COUNT(*) AS answered
+    FROM form_responses fr
+    CROSS JOIN LATERAL jsonb_each(jsonb_object_or_null(fr.response_data)) AS answer
+    WHERE fr.form_id = :form_id AND answer.value <> 'null'::jsonb
+    GROUP BY 1
+""")
+
+def compute_form_analytics(form: Form, response_count: int, db: Session) -> Dict[str, Any]:
+    """
+    Aggregate all responses to a form in Postgres
+
+    Parameters:
+    - form: Form whose responses are aggregated
+    - response_count: Number of responses, already known from the cache check
+    - db: Database session
+
+    Returns:
+    - Dictionary with completion rate and per-question tallies / numeric summaries
+    """
+    params = {"form_id": form.id}
+    tallies: Dict[str, Dict[str, int]] = {}
+    for row in db.execute(FORM_ANSWER_TALLIES_SQL, params):
+        tallies.setdefault(row.question, {})[row.answer] = row.count
+    numeric = {
+        row.question: {
+            "count": row.count,
+            "mean": float(row.mean),
+            "min": float(row.min),
+            "max": float(row.max),
+            "median": float(row.median),
+            "stddev": float(row.stddev) if row.stddev is not None else None,
+        }
+        for row in db.execute(FORM_NUMERIC_SUMMARY_SQL, params)
+    }
+    answered = {row.question: row.answered for row in db.execute(FORM_ANSWERED_SQL, params)}
+
+    eligible = db.query(func.count(User.id)).filter(User.role_id == role_id_for(RoleType.STUDENT, db)).scalar()
+
+    questions = []
+    for question in iter_form_questions(form.form_json):
+        name = question["name"]
+        question_type = question.get("type")
+        summary = {
+            "name": name,
+            "title": question.get("title", name),
+            "type": question_type,
+            "answered": answered.get(name, 0),
+        }
+        if question_type in ("radiogroup", "dropdown", "checkbox", "tagbox", "boolean", "rating"):
+            summary["tallies"] = tallies.get(name, {})
+        if name in numeric:
+            summary["numeric"] = numeric[name]
+        questions.append(summary)
+
+    return {
+        "form_id": form.id,
+        "title": form.title,
+        "responses": response_count,
+        "eligible": eligible,
+        "completion_rate": round(response_count / eligible, 4) if eligible else None,
+        "questions": questions,
+    }
+
+# this is to get aggregated answers of a form, done by profs and TAs
+@app.get("/api/forms/{form_id}/analytics")
+async def api_get_form_analytics(form_id: int, db: Session = Depends(get_db), token: str = Depends(prof_or_ta_required)):
+    """Get per-question tallies, numeric summaries and the completion rate of a form"""
+    try:
+        form = db.query(Form).filter(Form.id == form_id).first()
+        if not form:
+            raise HTTPException(status_code=404, detail="Form not found")
+
+        # Responses are only ever added or overwritten (which bumps submitted_at),
+        # so count + latest submission identify the state the analytics describe
+        response_count, last_submitted = db.query(
+            func.count(FormResponse.id), func.max(FormResponse.submitted_at)
+        ).filter(FormResponse.form_id == form_id).one()
+        fingerprint = (form.version, response_count, last_submitted)
+
+        cached = form_analytics_cache.get(form_id)
+        if cached and cached[0] == fingerprint:
+            return JSONResponse(status_code=200, content=cached[1])
+
+        analytics = compute_form_analytics(form, response_count, db)
+        form_analytics_cache[form_id] = (fingerprint, analytics)
+        return JSONResponse(status_code=200, content=analytics)
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing form analytics: {str(e)}")
+
 # @app.get("/api/skills/")
 # async def get_all_skills(db: Session = Depends(get_db)):
 #     """Get all skills from the database"""
@@ -2885,14 +4105,9 @@ async def create_skill(skill: SkillCreate, db: Session = Depends(get_db), token:
         db.add(new_skill)
         db.commit()
         db.refresh(new_skill)
+        invalidate_skills(db)
         
-        return JSONResponse(status_code=201, content={
-            "id": new_skill.id,
-            "name": new_skill.name,
-            "bgColor": new_skill.bgColor,
-            "color": new_skill.color,
-            "icon": new_skill.icon
-        })
+        return JSONResponse(status_code=201, content=skill_to_json(new_skill))
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -2907,8 +4122,7 @@ async def get_user_skills(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if user is a TA
-    role = db.query(Role).filter(Role.id == user.role_id).first()
-    if role.role != RoleType.TA:
+    if role_for_id(user.role_id, db) != RoleType.TA:
         raise HTTPException(status_code=400, detail="Skills can only be assigned to TAs")
     
     skills = user.skills
@@ -2933,8 +4147,7 @@ async def assign_skills_to_user(request: AssignSkillsRequest, db: Session = Depe
             raise HTTPException(status_code=404, detail="User not found")
         
         # Check if user is a TA
-        role = db.query(Role).filter(Role.id == user.role_id).first()
-        if role.role != RoleType.TA:
+        if role_for_id(user.role_id, db) != RoleType.TA:
             raise HTTPException(status_code=400, detail="Skills can only be assigned to TAs")
         
         # Get all skills by IDs
@@ -2972,6 +4185,7 @@ async def delete_skill(skill_id: int, db: Session = Depends(get_db), token: str
         # Delete the skill
         db.delete(skill)
         db.commit()
+        invalidate_skills(db)
         
         return JSONResponse(status_code=200, content={
             "message": "Skill deleted successfully",
@@ -3078,16 +4292,7 @@ async def get_student_team(
                     "color": skill.color,
                     "icon": skill.icon
                 })
-            all_skills = db.query(Skill).all()
-            all_skills_data = []
-            for skill in all_skills:
-                all_skills_data.append({
-                    "id": skill.id,
-                    "name": skill.name,
-                    "bgColor": skill.bgColor,
-                    "color": skill.color,
-                    "icon": skill.icon
-                })
+            all_skills = get_all_skills(db)
             return {
                 "has_team": True,
                 "team_id": team.id,
@@ -3320,10 +4525,10 @@ def parse_scores_from_csv(csv_content: str, gradeable_id: int, max_points: int,
                 if not user:
                     unadded_users.append((RollNo, "No user found"))
                     continue
-                if user.role != RoleType.STUDENT:
+                if role_for_id(user.role_id, db) != RoleType.STUDENT:
                     unadded_users.append((RollNo, "User is not a student"))
                     continue
-                print("Added user id:", user.id)
+                csv_logger.debug("Added score row for user %s", user.id)
                 scores.append({
                     'user_id': user.id,
                     'gradeable_id': gradeable_id,
@@ -3332,16 +4537,16 @@ def parse_scores_from_csv(csv_content: str, gradeable_id: int, max_points: int,
                 processed_user_ids.add(user.id)
                 
             except ValueError as e:
-                print(f"Warning: Skipping row {row_num}: {str(e)}")
+                csv_logger.info("Skipping row %s: %s", row_num, e)
                 continue
         
         # Get student role ID
-        student_role = db.query(Role).filter(Role.role == RoleType.STUDENT).first()
-        if not student_role:
+        student_role_id = role_id_for(RoleType.STUDENT, db)
+        if student_role_id is None:
             raise ValueError("Student role not found in database")
         zero_added = [] 
         # Add default score of 0 for students not in CSV
-        students = db.query(User).filter(User.role == RoleType.STUDENT).all()
+        students = db.query(User).filter(User.role_id == student_role_id).all()
         for student in students:
             if student.id not in processed_user_ids:
                 zero_added.append(student.id)
@@ -3366,18 +4571,249 @@ async def get_gradeable_submissions(
     """
     Get all submissions for a specific gradeable
     """
-    submissions = db.query(GradeableScores).filter(GradeableScores.gradeable_id == gradeable_id).all()
-    results = []
-    for submission in submissions:
-        results.append({
+    submissions = (
+        db.query(GradeableScores.id, GradeableScores.gradeable_id, GradeableScores.user_id, User.name, GradeableScores.score)
+        .join(User, User.id == GradeableScores.user_id)
+        .filter(GradeableScores.gradeable_id == gradeable_id)
+        .order_by(GradeableScores.id)
+        .all()
+    )
+    results = [
+        {
             "id": submission.id,
             "gradeable_id": submission.gradeable_id,
-            "user_id": submission.user_id, 
-            "name": submission.user.name,
+            "user_id": submission.user_id,
+            "name": submission.name,
             #"submitted_at": submission.submitted_at,
             "score": submission.score
+        }
+        for submission in submissions
+    ]
+    return fast_json(GRADEABLE_SCORES_ADAPTER, results)
+
+# Gradebook
+# Each source is flattened to (user_id, item_type, item_id, title, max_score, score);
+# team submissions give every member of the team the team's score.
+GRADEBOOK_SOURCES = {
+    "gradeable": """
+        SELECT DISTINCT ON (gs.user_id, g.id) gs.user_id, 'gradeable', g.id, g.title, g.max_points, gs.score, now()
+        FROM gradeable_scores gs JOIN gradeables g ON g.id = gs.gradeable_id
+        WHERE {filter}
+        ORDER BY gs.user_id, g.id, gs.id DESC
+    """,
+    "submittable": """
+        SELECT DISTINCT ON (tm.user_id, s.id) tm.user_id, 'submittable', s.id, s.title, s.max_score, sub.score, now()
+        FROM submissions sub
+        JOIN submittables s ON s.id = sub.submittable_id
+        JOIN team_members tm ON tm.team_id = sub.team_id
+        WHERE sub.score IS NOT NULL AND {filter}
+        ORDER BY tm.user_id, s.id, sub.id DESC
+    """,
+    "assignable": """
+        SELECT DISTINCT ON (a.user_id, ab.id) a.user_id, 'assignable', ab.id, ab.title, ab.max_score, a.score, now()
+        FROM assignments a JOIN assignables ab ON ab.id = a.assignable_id
+        WHERE a.score IS NOT NULL AND {filter}
+        ORDER BY a.user_id, ab.id, a.id DESC
+    """,
+}
+
+GRADEBOOK_UPSERT = """
+    INSERT INTO gradebook_entries (user_id, item_type, item_id, title, max_score, score, updated_at)
+    {source}
+    ON CONFLICT (user_id, item_type, item_id) DO UPDATE
+    SET title = EXCLUDED.title, max_score = EXCLUDED.max_score, score = EXCLUDED.score, updated_at = EXCLUDED.updated_at
+"""
+
+# Rows of one item type that its source no longer produces
+GRADEBOOK_DELETE_ORPHANS = """
+    DELETE FROM gradebook_entries e
+    WHERE e.item_type = :item_type AND NOT EXISTS (
+        SELECT 1 FROM ({source}) AS src (user_id, item_type, item_id)
+        WHERE src.user_id = e.user_id AND src.item_id = e.item_id
+    )
+"""
+
+# Item id column of each source, to restrict it to one item
+GRADEBOOK_ITEM_ID = {"gradeable": "g.id", "submittable": "s.id", "assignable": "ab.id"}
+
+def refresh_gradebook(db: Session, item_type: str, filter_sql: str = "TRUE", **params):
+    """
+    Upsert gradebook rows from one grade source, within the caller's transaction
+
+    Parameters:
+    - item_type: key of GRADEBOOK_SOURCES
+    - filter_sql: SQL restricting the source rows, e.g. "sub.id = :submission_id"
+    - params: bind parameters used by filter_sql
+    """
+    source = GRADEBOOK_SOURCES[item_type].format(filter=filter_sql)
+    db.execute(text(GRADEBOOK_UPSERT.format(source=source)), params)
+
+def sync_gradebook_item(db: Session, item_type: str, item_id: int):
+    """
+    Rewrite the gradebook rows of one item, within the caller's transaction
+
+    Used after the item was edited or deleted, or lost a grade, so that no
+    stale title, max score or score is left behind.
+    """
+    db.execute(
+        text("DELETE FROM gradebook_entries WHERE item_type = :item_type AND item_id = :item_id"),
+        {"item_type": item_type, "item_id": item_id}
+    )
+    refresh_gradebook(db, item_type, f"{GRADEBOOK_ITEM_ID[item_type]} = :item_id", item_id=item_id)
+
+def sync_gradebook_members(db: Session, user_ids):
+    """
+    Rewrite the team-submission gradebook rows of some students, within the caller's transaction
+
+    Students get their team's submission scores through team_members, so this
+    runs after every membership change: grades of a team they left go away,
+    grades of a team they joined appear.
+    """
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return
+    db.execute(
+        text("DELETE FROM gradebook_entries WHERE item_type = 'submittable' AND user_id = ANY(:user_ids)"),
+        {"user_ids": user_ids}
+    )
+    refresh_gradebook(db, "submittable", "tm.user_id = ANY(:user_ids)", user_ids=user_ids)
+
+def rebuild_gradebook(db: Session):
+    """Recompute every gradebook row from the grade tables, dropping rows whose grade is gone"""
+    for item_type, source in GRADEBOOK_SOURCES.items():
+        db.execute(
+            text(GRADEBOOK_DELETE_ORPHANS.format(source=source.format(filter="TRUE"))),
+            {"item_type": item_type}
+        )
+        refresh_gradebook(db, item_type)
+
+# Backfill the gradebook from grades written before it existed. This only runs
+# while the table is empty, later changes go through the write paths; call
+# rebuild_gradebook to repair it by hand. The lock keeps workers from racing.
+with SessionLocal() as db:
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('gradebook_entries'))"))
+    if not db.execute(text("SELECT EXISTS (SELECT 1 FROM gradebook_entries)")).scalar():
+        rebuild_gradebook(db)
+    db.commit()
+
+def query_gradebook(db: Session, user_id: Optional[int] = None):
+    """
+    Students joined to their gradebook rows, ordered for a student-by-item matrix
+
+    Students without any grade still get one row with NULL item columns.
+    """
+    query = (
+        db.query(
+            User.id.label("user_id"),
+            User.name,
+            User.email,
+            GradebookEntry.item_type,
+            GradebookEntry.item_id,
+            GradebookEntry.title,
+            GradebookEntry.max_score,
+            GradebookEntry.score
+        )
+        .join(Role, Role.id == User.role_id)
+        .outerjoin(GradebookEntry, GradebookEntry.user_id == User.id)
+        .filter(Role.role == RoleType.STUDENT)
+    )
+    if user_id is not None:
+        query = query.filter(User.id == user_id)
+    return query.order_by(User.id, GradebookEntry.item_type, GradebookEntry.item_id)
+
+def gradebook_matrix(rows) -> Dict[str, Any]:
+    items: Dict[str, Dict[str, Any]] = {}
+    students: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        student = students.setdefault(row.user_id, {
+            "user_id": row.user_id,
+            "name": row.name,
+            "email": row.email,
+            "grades": {}
         })
-    return JSONResponse(status_code=200, content=results)
+        if row.item_type is None:
+            continue
+        key = f"{row.item_type}:{row.item_id}"
+        items.setdefault(key, {
+            "key": key,
+            "item_type": row.item_type,
+            "item_id": row.item_id,
+            "title": row.title,
+            "max_score": row.max_score
+        })
+        student["grades"][key] = row.score
+    return {
+        "items": sorted(items.values(), key=lambda item: (item["item_type"], item["item_id"])),
+        "students": list(students.values())
+    }
+
+# this is to get the student-by-item gradebook, done by profs and TAs
+@app.get("/gradebook")
+async def get_gradebook(
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Get every student's scores across gradeables, team submissions and assignments"""
+    try:
+        return JSONResponse(status_code=200, content=gradebook_matrix(query_gradebook(db).all()))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving gradebook: {str(e)}")
+
+# this is for students to see their own grades
+@app.get("/gradebook/me")
+async def get_my_grades(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the current student's scores"""
+    if current_user["role"] != RoleType.STUDENT:
+        raise HTTPException(status_code=403, detail="Only students have grades")
+    try:
+        rows = query_gradebook(db, current_user["user"].id).all()
+        return JSONResponse(status_code=200, content=[
+            {
+                "item_type": row.item_type,
+                "item_id": row.item_id,
+                "title": row.title,
+                "max_score": row.max_score,
+                "score": row.score
+            }
+            for row in rows if row.item_type is not None
+        ])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving grades: {str(e)}")
+
+# this is to download the gradebook as CSV, done by profs and TAs
+@app.get("/gradebook/export")
+async def export_gradebook(
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Download the gradebook as CSV, one row per student and one column per item"""
+    matrix = gradebook_matrix(query_gradebook(db).all())
+
+    def generate_rows():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["user_id", "name", "email"] + [
+            f"{item['title']} ({item['item_type']}, /{item['max_score']})" for item in matrix["items"]
+        ])
+        for index, student in enumerate(matrix["students"], start=1):
+            writer.writerow([student["user_id"], student["name"], student["email"]] + [
+                "" if student["grades"].get(item["key"]) is None else student["grades"][item["key"]]
+                for item in matrix["items"]
+            ])
+            if index % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        generate_rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="gradebook.csv"'}
+    )
 
 # @app.post("/gradeables/create")
 # async def create_gradeable(
@@ -3469,7 +4905,6 @@ async def create_gradeable(
     username = user_data.get('sub')
     user = db.query(User).filter(User.username == username).first()
     try:
-        print("Title is", title, "Max points is", max_points, "Creator ID is", user.id)
         new_gradeable = Gradeable(
             title=title,
             max_points=int(max_points),
@@ -3505,9 +4940,11 @@ async def create_gradeable(
                     score=score_data["score"]
                 )
                 db.add(new_submission)
+        db.flush()
+        refresh_gradebook(db, "gradeable", "g.id = :gradeable_id", gradeable_id=gradeable_id)
         
         db.commit()
-        print(zero_added)
+        logger.info("Gradeable %s created, %d students defaulted to 0", new_gradeable.id, len(zero_added))
         return JSONResponse(status_code=201, content={
             "id": new_gradeable.id,
             "title": new_gradeable.title,
@@ -3612,10 +5049,11 @@ async def submit_file(
     Submit a file for a submittable.
     Only one submission per submittable per team is allowed.
     """
-    # Get the submittable
-    submittable = db.query(Submittable).filter(Submittable.id == submittable_id).first()
-    if not submittable:
+    # Get the submittable, placed in its window by the database clock
+    row = db.query(Submittable, time_window_status(Submittable)).filter(Submittable.id == submittable_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Submittable not found")
+    submittable, window_status = row
 
     # Get the user's team
     user = db.query(User).filter(User.id == current_user["user"].id).first()
@@ -3636,13 +5074,9 @@ async def submit_file(
         )
 
     # Check if submission is allowed based on opens_at and deadline
-    now = datetime.now(timezone.utc)
-    opens_at = datetime.fromisoformat(submittable.opens_at) if submittable.opens_at else None
-    deadline = datetime.fromisoformat(submittable.deadline)
-
-    if opens_at and now < opens_at:
+    if window_status == "upcoming":
         raise HTTPException(status_code=400, detail="Submission period has not started yet")
-    if now > deadline:
+    if window_status == "closed":
         raise HTTPException(status_code=400, detail="Submission deadline has passed")
 
     # Generate a unique filename
@@ -3728,6 +5162,160 @@ async def download_submission(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading submission: {str(e)}")
 
+# Helpers for streaming bulk submission archives
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+# Formats that are already compressed are stored as-is to save CPU
+ARCHIVE_STORED_EXTENSIONS = {'.pdf', '.zip', '.docx', '.xlsx', '.pptx', '.png', '.jpg', '.jpeg', '.gz', '.7z', '.rar'}
+
+class ArchiveStreamBuffer:
+    """Write-only file object that collects zipfile output until the generator drains it"""
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def archive_safe_name(name: str) -> str:
+    """Strip path separators and control characters from a name used inside a ZIP"""
+    cleaned = "".join(c for c in str(name) if c.isprintable() and c not in '/\\:*?"<>|')
+    return cleaned.strip(" .") or "unnamed"
+
+def attachment_disposition(filename: str) -> str:
+    """
+    Content-Disposition for a download whose name may hold any Unicode
+
+    Header values go out as Latin-1, so the plain filename is an ASCII
+    fallback (accents stripped, anything else replaced) and the real name is
+    sent percent-encoded in filename* (RFC 6266).
+    """
+    decomposed = unicodedata.normalize("NFKD", filename)
+    fallback = "".join(
+        c if c.isascii() and c.isprintable() and c not in '"\\' else "_"
+        for c in decomposed if not unicodedata.combining(c)
+    ).strip() or "download"
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+def stream_submission_archive(entries: List[Dict[str, Any]], manifest_headers: List[str]):
+    """
+    Build a ZIP archive on the fly and yield it chunk by chunk.
+
+    Parameters:
+    - entries: dicts with "local_path" and "archive_path" plus the manifest columns
+    - manifest_headers: columns written to manifest.csv at the end of the archive
+
+    Only one read buffer per file is held in memory, so the archive size is not
+    bounded by RAM and no temporary file is written.
+    """
+    buffer = ArchiveStreamBuffer()
+    manifest = StringIO()
+    writer = csv.DictWriter(manifest, fieldnames=manifest_headers + ["archive_path", "status"], extrasaction="ignore")
+    writer.writeheader()
+
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            local_path = entry["local_path"]
+            if not local_path or not os.path.isfile(local_path):
+                writer.writerow({**entry, "archive_path": "", "status": "missing"})
+                continue
+
+            info = zipfile.ZipInfo.from_file(local_path, entry["archive_path"])
+            if os.path.splitext(local_path)[1].lower() in ARCHIVE_STORED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(local_path, "rb") as source, archive.open(info, "w") as target:
+                while True:
+                    chunk = source.read(ARCHIVE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            writer.writerow({**entry, "status": "included"})
+
+        archive.writestr("manifest.csv", manifest.getvalue())
+    yield buffer.drain()
+
+# this is to download every submission of a submittable as one ZIP, done by profs and TAs
+@app.get("/submittables/{submittable_id}/submissions/archive")
+async def download_submittable_archive(
+    submittable_id: int,
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Stream all submissions for a submittable as a ZIP, one folder per team, with a manifest"""
+    try:
+        submittable = db.query(Submittable).filter(Submittable.id == submittable_id).first()
+        if not submittable:
+            raise HTTPException(status_code=404, detail="Submittable not found")
+
+        rows = (
+            db.query(
+                Submission.id,
+                Submission.team_id,
+                Team.name,
+                Submission.submitted_on,
+                Submission.score,
+                Submission.file_url,
+                Submission.original_filename
+            )
+            .join(Team, Team.id == Submission.team_id)
+            .filter(Submission.submittable_id == submittable_id)
+            .order_by(Submission.team_id)
+            .all()
+        )
+
+        entries = []
+        for submission_id, team_id, team_name, submitted_on, score, file_url, original_filename in rows:
+            folder = archive_safe_name(f"team_{team_id}_{team_name}")
+            entries.append({
+                "submission_id": submission_id,
+                "team_id": team_id,
+                "team_name": team_name,
+                "submitted_on": submitted_on,
+                "score": score,
+                "max_score": submittable.max_score,
+                "original_filename": original_filename,
+                "local_path": file_url.lstrip('/') if file_url else None,
+                "archive_path": f"{folder}/{archive_safe_name(original_filename)}"
+            })
+
+        manifest_headers = ["submission_id", "team_id", "team_name", "submitted_on", "score", "max_score", "original_filename"]
+        archive_name = archive_safe_name(f"{submittable.title}_submissions") + ".zip"
+        return StreamingResponse(
+            stream_submission_archive(entries, manifest_headers),
+            media_type="application/zip",
+            headers={"Content-Disposition": attachment_disposition(archive_name)}
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building submissions archive: {str(e)}")
+
+def time_window_status(model):
+    """CASE expression placing a submittable or assignable in upcoming / open / closed by the database clock"""
+    return case(
+        (and_(model.opens_at.is_not(None), model.opens_at > func.now()), "upcoming"),
+        (model.deadline < func.now(), "closed"),
+        else_="open"
+    ).label("window_status")
+
 # this is to get all submittables categorized by status, done by students and profs
 @app.get("/submittables/")
 async def get_submittables(
@@ -3736,9 +5324,6 @@ async def get_submittables(
 ):
     """Get all submittables categorized by status"""
     try:
-        # Get all submittables
-        submittables = db.query(Submittable).all()
-        
         # Get user's team submissions
         user = current_user["user"]
         team = user.teams[0] if user.teams else None
@@ -3749,14 +5334,9 @@ async def get_submittables(
                 "open": [],
                 "closed": []
             }
-        team_submissions = {}
-        if team.id:
-            submissions = db.query(Submission).filter(Submission.team_id == team.id).all()
-            team_submissions = {s.submittable_id: s for s in submissions}
-        
+
         # Helper function to format submittable
-        def format_submittable(s):
-            submission = team_submissions.get(s.id)
+        def format_submittable(s, submission):
             return {
                 "id": s.id,
                 "title": s.title,
@@ -3777,29 +5357,22 @@ async def get_submittables(
                 }
             }
 
-        # Categorize submittables
-        now = datetime.now(timezone.utc)
-        upcoming = []
-        open_submittables = []
-        closed = []
-
-        for s in submittables:
-            formatted = format_submittable(s)
-            opens_at = datetime.fromisoformat(s.opens_at) if s.opens_at else None
-            deadline = datetime.fromisoformat(s.deadline)
-
-            if opens_at and now < opens_at:
-                upcoming.append(formatted)
-            elif now > deadline:
-                closed.append(formatted)
-            else:
-                open_submittables.append(formatted)
+        # Categorize submittables in SQL, with the team's submission joined in
+        categorized = {"upcoming": [], "open": [], "closed": []}
+        rows = (
+            db.query(Submittable, Submission, time_window_status(Submittable))
+            .outerjoin(Submission, and_(Submission.submittable_id == Submittable.id, Submission.team_id == team.id))
+            .order_by(Submittable.id)
+            .all()
+        )
+        for s, submission, window_status in rows:
+            categorized[window_status].append(format_submittable(s, submission))
 
         return {
             "team_id": team.id,
-            "upcoming": upcoming,
-            "open": open_submittables,
-            "closed": closed
+            "upcoming": categorized["upcoming"],
+            "open": categorized["open"],
+            "closed": categorized["closed"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching submittables: {str(e)}")
@@ -3818,19 +5391,11 @@ async def get_all_submittables(
                 detail="Only professors or TAs can access this endpoint"
             )
 
-        # Fetch all submittables
-        submittables = db.query(Submittable).all()
-
-        # Categorize submittables
-        now = datetime.now(timezone.utc)
-        upcoming = []
-        open_submittables = []
-        closed = []
-
-        for submittable in submittables:
-            opens_at = datetime.fromisoformat(submittable.opens_at) if submittable.opens_at else None
-            deadline = datetime.fromisoformat(submittable.deadline)
+        # Fetch all submittables, categorized in SQL
+        submittables = db.query(Submittable, time_window_status(Submittable)).order_by(Submittable.id).all()
+        categorized = {"upcoming": [], "open": [], "closed": []}
 
+        for submittable, window_status in submittables:
             formatted_submittable = {
                 "id": submittable.id,
                 "title": submittable.title,
@@ -3845,19 +5410,10 @@ async def get_all_submittables(
                 }] if submittable.file_url else []
             }
 
-            if opens_at and now < opens_at:
-                upcoming.append(formatted_submittable)
-            elif now > deadline:
-                closed.append(formatted_submittable)
-            else:
-                open_submittables.append(formatted_submittable)
+            categorized[window_status].append(formatted_submittable)
 
         # Return categorized submittables
-        return {
-            "upcoming": upcoming,
-            "open": open_submittables,
-            "closed": closed
-        }
+        return fast_json(SUBMITTABLES_BY_STATUS_ADAPTER, categorized)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -4000,6 +5556,87 @@ async def create_submittable(
             os.remove(file_path)  # Clean up file if something went wrong
         raise HTTPException(status_code=500, detail=f"Error creating submittable: {str(e)}")
 
+# Progress summaries for staff, cached briefly so deadline-time polling hits Postgres at most every few seconds
+PROGRESS_SUMMARY_TTL_SECONDS = 5
+progress_summary_cache: Dict[str, tuple] = {}
+
+SUBMITTABLES_SUMMARY_SQL = text("""
+    SELECT s.id, s.title, s.deadline, s.max_score,
+           COUNT(DISTINCT sub.team_id) AS submitted,
+           COUNT(DISTINCT sub.team_id) FILTER (WHERE sub.score IS NOT NULL) AS graded,
+           AVG(sub.score) AS average_score,
+           ARRAY(
+               SELECT t.id FROM teams t
+               WHERE NOT EXISTS (SELECT 1 FROM submissions x WHERE x.team_id = t.id AND x.submittable_id = s.id)
+               ORDER BY t.id
+           ) AS missing
+    FROM submittables s
+    LEFT JOIN submissions sub ON sub.submittable_id = s.id
+    GROUP BY s.id
+    ORDER BY s.id
+""")
+
+ASSIGNABLES_SUMMARY_SQL = text("""
+    SELECT ab.id, ab.title, ab.deadline, ab.max_score,
+           COUNT(DISTINCT a.user_id) AS submitted,
+           COUNT(DISTINCT a.user_id) FILTER (WHERE a.score IS NOT NULL) AS graded,
+           AVG(a.score) AS average_score,
+           ARRAY(
+               SELECT u.id FROM users u JOIN roles r ON r.id = u.role_id
+               WHERE r.role = 'STUDENT'
+                 AND NOT EXISTS (SELECT 1 FROM assignments x WHERE x.user_id = u.id AND x.assignable_id = ab.id)
+               ORDER BY u.id
+           ) AS missing
+    FROM assignables ab
+    LEFT JOIN assignments a ON a.assignable_id = ab.id
+    GROUP BY ab.id
+    ORDER BY ab.id
+""")
+
+def get_progress_summary(kind: str, statement, missing_key: str, db: Session) -> List[Dict[str, Any]]:
+    """
+    Submitted / graded counts, average score and who is missing, for every item of a kind
+
+    Parameters:
+    - kind: cache key, "submittables" or "assignables"
+    - statement: the aggregate query for that kind
+    - missing_key: name of the missing ids field in the response
+    - db: Database session
+    """
+    cached = progress_summary_cache.get(kind)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    summary = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "deadline": row.deadline.astimezone(timezone.utc).isoformat() if row.deadline else None,
+            "max_score": row.max_score,
+            "submitted": row.submitted,
+            "graded": row.graded,
+            "average_score": round(float(row.average_score), 2) if row.average_score is not None else None,
+            "missing": len(row.missing),
+            missing_key: row.missing
+        }
+        for row in db.execute(statement)
+    ]
+    progress_summary_cache[kind] = (time.monotonic() + PROGRESS_SUMMARY_TTL_SECONDS, summary)
+    return summary
+
+# this is to see how many teams submitted / were graded for each submittable, done by profs and TAs
+@app.get("/submittables/summary")
+async def get_submittables_summary(
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Get submission progress for every submittable"""
+    try:
+        summary = get_progress_summary("submittables", SUBMITTABLES_SUMMARY_SQL, "missing_team_ids", db)
+        return JSONResponse(status_code=200, content=summary)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching submittables summary: {str(e)}")
+
 # this is to get details of a specific submittable, done by students and profs
 @app.get("/submittables/{submittable_id}")
 async def get_submittable(
@@ -4102,6 +5739,8 @@ async def delete_submittable(
         
         # Delete the submittable
         db.delete(submittable)
+        db.flush()
+        sync_gradebook_item(db, "submittable", submittable_id)
         db.commit()
         
         return JSONResponse(status_code=200, content={"message": "Submittable deleted successfully"})
@@ -4169,6 +5808,8 @@ async def update_submittable(
             existing_submittable.file_url = f"uploads/{file_name}"
             existing_submittable.original_filename = file.filename
         
+        db.flush()
+        sync_gradebook_item(db, "submittable", submittable_id)
         db.commit()
         db.refresh(existing_submittable)
         
@@ -4206,9 +5847,8 @@ async def delete_submission(
                 raise HTTPException(status_code=403, detail="You can only delete your own submissions")
             
             # Check is submission deadline has passed
-            now = datetime.now(timezone.utc)
-            deadline = datetime.fromisoformat(submission.submittable.deadline)
-            if now > deadline:
+            deadline_passed = db.query(Submittable.deadline < func.now()).filter(Submittable.id == submission.submittable_id).scalar()
+            if deadline_passed:
                 raise HTTPException(status_code=403, detail="Cannot delete submission after deadline")
         
         # Delete the submission file if it exists
@@ -4219,6 +5859,8 @@ async def delete_submission(
         
         # Delete the submission record
         db.delete(submission)
+        db.flush()
+        sync_gradebook_item(db, "submittable", submission.submittable_id)
         db.commit()
         
         return JSONResponse(status_code=200, content={"message": "Submission deleted successfully"})
@@ -4419,36 +6061,38 @@ async def get_admin_feedback(
                 detail="Only teaching assistants and professors can access this endpoint"
             )
 
-        # Get all teams that have feedback submissions
+        member_counts = (
+            select(team_members.c.team_id, func.count().label("member_count"))
+            .group_by(team_members.c.team_id)
+            .subquery()
+        )
+
+        # Submission count, last submission and member count for every team in one statement
         teams_with_feedback = (
-            db.query(Team)
+            db.query(
+                Team.id,
+                Team.name,
+                func.count(FeedbackSubmission.id).label("submission_count"),
+                func.max(FeedbackSubmission.submitted_at).label("last_submission"),
+                func.coalesce(member_counts.c.member_count, 0).label("member_count")
+            )
             .join(FeedbackSubmission, Team.id == FeedbackSubmission.team_id)
-            .distinct()
+            .outerjoin(member_counts, member_counts.c.team_id == Team.id)
+            .group_by(Team.id, Team.name, member_counts.c.member_count)
+            .order_by(Team.id)
             .all()
         )
 
-        result = []
-        for team in teams_with_feedback:
-            # Get submission count for this team
-            submission_count = (
-                db.query(FeedbackSubmission)
-                .filter(FeedbackSubmission.team_id == team.id)
-                .count()
-            )
-
-            result.append({
+        return [
+            {
                 "team_id": team.id,
                 "team_name": team.name,
-                "member_count": len(team.members),
-                "submission_count": submission_count,
-                "last_submission": db.query(FeedbackSubmission)
-                    .filter(FeedbackSubmission.team_id == team.id)
-                    .order_by(FeedbackSubmission.submitted_at.desc())
-                    .first()
-                    .submitted_at.isoformat()
-            })
-
-        return result
+                "member_count": team.member_count,
+                "submission_count": team.submission_count,
+                "last_submission": team.last_submission.isoformat()
+            }
+            for team in teams_with_feedback
+        ]
         
     except HTTPException as he:
         raise he
@@ -4471,58 +6115,70 @@ async def get_team_feedback_details(
             )
 
         # Check if team exists
-        team = db.query(Team).filter(Team.id == team_id).first()
+        team = db.query(Team.id, Team.name).filter(Team.id == team_id).first()
         if not team:
             raise HTTPException(status_code=404, detail="Team not found")
 
-        # Get all feedback submissions for this team
+        # Get all team members for reference
+        team_members_by_id = dict(
+            db.query(User.id, User.name)
+            .join(team_members, team_members.c.user_id == User.id)
+            .filter(team_members.c.team_id == team_id)
+            .all()
+        )
+
+        # Submissions with their submitter's name, then every detail of the team at once
         submissions = (
-            db.query(FeedbackSubmission)
+            db.query(
+                FeedbackSubmission.id,
+                FeedbackSubmission.submitter_id,
+                FeedbackSubmission.submitted_at,
+                User.name.label("submitter_name")
+            )
+            .outerjoin(User, User.id == FeedbackSubmission.submitter_id)
             .filter(FeedbackSubmission.team_id == team_id)
+            .order_by(FeedbackSubmission.id)
             .all()
         )
-
-        # Get all team members for reference
-        team_members = {
-            member.id: member.name 
-            for member in team.members
-        }
-
-        # Format the submissions with detailed information
-        formatted_submissions = []
-        for submission in submissions:
-            # Get details for this submission
-            feedback_details = (
-                db.query(FeedbackDetail)
-                .filter(FeedbackDetail.submission_id == submission.id)
-                .all()
+        feedback_by_submission: Dict[int, List[Dict[str, Any]]] = {}
+        feedback_details = (
+            db.query(
+                FeedbackDetail.submission_id,
+                FeedbackDetail.member_id,
+                FeedbackDetail.contribution,
+                FeedbackDetail.remarks
             )
+            .join(FeedbackSubmission, FeedbackSubmission.id == FeedbackDetail.submission_id)
+            .filter(FeedbackSubmission.team_id == team_id)
+            .order_by(FeedbackDetail.id)
+            .all()
+        )
+        for detail in feedback_details:
+            feedback_by_submission.setdefault(detail.submission_id, []).append({
+                "member_id": detail.member_id,
+                "member_name": team_members_by_id.get(detail.member_id, "Unknown"),
+                "contribution": detail.contribution,
+                "remarks": detail.remarks
+            })
 
-            # Get submitter info
-            submitter = db.query(User).filter(User.id == submission.submitter_id).first()
-
-            formatted_submissions.append({
+        # Format the submissions with detailed information
+        formatted_submissions = [
+            {
                 "submission_id": submission.id,
                 "submitter": {
-                    "id": submitter.id,
-                    "name": submitter.name
+                    "id": submission.submitter_id,
+                    "name": submission.submitter_name
                 },
                 "submitted_at": submission.submitted_at.isoformat(),
-                "feedback": [
-                    {
-                        "member_id": detail.member_id,
-                        "member_name": team_members.get(detail.member_id, "Unknown"),
-                        "contribution": detail.contribution,
-                        "remarks": detail.remarks
-                    }
-                    for detail in feedback_details
-                ]
-            })
+                "feedback": feedback_by_submission.get(submission.id, [])
+            }
+            for submission in submissions
+        ]
 
         return {
             "team_id": team.id,
             "team_name": team.name,
-            "members": team_members,
+            "members": team_members_by_id,
             "submissions": formatted_submissions
         }
 
@@ -4531,6 +6187,167 @@ async def get_team_feedback_details(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Peer-contribution scoring
+# A member's peer score is the mean share of the team's work their teammates
+# gave them; 1.0 on the normalized scale is an exactly fair share.
+CONTRIBUTION_LOW_THRESHOLD = 0.5      # below half a fair share
+CONTRIBUTION_HIGH_THRESHOLD = 1.5     # above one and a half fair shares
+SELF_INFLATION_THRESHOLD = 0.5        # self rating exceeds peer rating by half a fair share
+contribution_scores_cache: Dict[str, Any] = {}
+
+CONTRIBUTION_SCORE_COLUMNS = [
+    "team_id", "team_name", "member_id", "member_name", "ratings", "fair_share",
+    "peer_score", "peer_score_std", "self_score", "self_peer_delta", "normalized_score", "flags"
+]
+
+def compute_contribution_scores(db: Session) -> pd.DataFrame:
+    """
+    Score every rated member of every team from all feedback details at once
+
+    Returns:
+    - DataFrame with one row per (team, member) and the columns in CONTRIBUTION_SCORE_COLUMNS
+    """
+    rows = (
+        db.query(
+            FeedbackDetail.submission_id,
+            FeedbackSubmission.team_id,
+            Team.name.label("team_name"),
+            FeedbackSubmission.submitter_id,
+            FeedbackDetail.member_id,
+            User.name.label("member_name"),
+            FeedbackDetail.contribution
+        )
+        .join(FeedbackSubmission, FeedbackSubmission.id == FeedbackDetail.submission_id)
+        .join(Team, Team.id == FeedbackSubmission.team_id)
+        .outerjoin(User, User.id == FeedbackDetail.member_id)
+        .all()
+    )
+    df = pd.DataFrame(rows, columns=[
+        "submission_id", "team_id", "team_name", "submitter_id", "member_id", "member_name", "contribution"
+    ])
+    if df.empty:
+        return pd.DataFrame(columns=CONTRIBUTION_SCORE_COLUMNS)
+
+    # Normalize each submission to 100 so slightly off totals do not skew the means
+    by_submission = df.groupby("submission_id")
+    totals = by_submission["contribution"].transform("sum").replace(0, np.nan)
+    df["share"] = df["contribution"] * 100.0 / totals
+    df["fair_share"] = 100.0 / by_submission["member_id"].transform("count")
+    is_self = df["submitter_id"].to_numpy() == df["member_id"].to_numpy()
+
+    keys = ["team_id", "member_id"]
+    scores = (
+        df[keys + ["team_name", "member_name"]].drop_duplicates(keys).set_index(keys)
+        .join(df[~is_self].groupby(keys).agg(
+            ratings=("share", "size"),
+            peer_score=("share", "mean"),
+            peer_score_std=("share", "std"),
+        ))
+        .join(df.groupby(keys)["fair_share"].mean())
+        .join(df[is_self].groupby(keys)["share"].mean().rename("self_score"))
+        .reset_index()
+    )
+    scores["ratings"] = scores["ratings"].fillna(0).astype(int)
+    scores["self_peer_delta"] = scores["self_score"] - scores["peer_score"]
+    scores["normalized_score"] = scores["peer_score"] / scores["fair_share"]
+
+    normalized = scores["normalized_score"].to_numpy(dtype=float)
+    inflation = (scores["self_peer_delta"] / scores["fair_share"]).to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        low = normalized < CONTRIBUTION_LOW_THRESHOLD
+        high = normalized > CONTRIBUTION_HIGH_THRESHOLD
+        inflated = inflation > SELF_INFLATION_THRESHOLD
+    scores["flags"] = [
+        [flag for flag, hit in (("low_contribution", l), ("high_contribution", h), ("self_inflated", i)) if hit]
+        for l, h, i in zip(low, high, inflated)
+    ]
+    return scores[CONTRIBUTION_SCORE_COLUMNS].sort_values(keys, ignore_index=True)
+
+def get_contribution_scores(db: Session) -> pd.DataFrame:
+    """Cached contribution scores, recomputed once a new feedback submission lands"""
+    # Feedback submissions are never edited, so count + latest id identify the data
+    fingerprint = tuple(db.query(func.count(FeedbackSubmission.id), func.max(FeedbackSubmission.id)).one())
+    if contribution_scores_cache.get("fingerprint") != fingerprint:
+        contribution_scores_cache["scores"] = compute_contribution_scores(db)
+        contribution_scores_cache["fingerprint"] = fingerprint
+    return contribution_scores_cache["scores"]
+
+def contribution_value(value):
+    """Convert NumPy / NaN values into plain JSON values"""
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else round(float(value), 4)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+@app.get("/feedback/admin/scores")
+async def get_contribution_scores_report(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get normalized peer-contribution scores, self-vs-peer deltas and outlier flags per team"""
+    try:
+        if current_user["role"] not in [RoleType.TA, RoleType.PROF]:
+            raise HTTPException(
+                status_code=403,
+                detail="Only teaching assistants and professors can access this endpoint"
+            )
+
+        scores = get_contribution_scores(db)
+        teams = []
+        for (team_id, team_name), members in scores.groupby(["team_id", "team_name"], sort=True):
+            teams.append({
+                "team_id": int(team_id),
+                "team_name": team_name,
+                # Spread of peer scores inside the team, 0 when everyone pulled equal weight
+                "peer_score_variance": contribution_value(members["peer_score"].var(ddof=0)),
+                "members": [
+                    {column: contribution_value(value) for column, value in member.items() if column not in ("team_id", "team_name")}
+                    for member in members.to_dict(orient="records")
+                ]
+            })
+        return {"teams": teams}
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/feedback/admin/scores.csv")
+async def export_contribution_scores(
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Download the contribution scores as CSV, one row per team member"""
+    if current_user["role"] not in [RoleType.TA, RoleType.PROF]:
+        raise HTTPException(
+            status_code=403,
+            detail="Only teaching assistants and professors can access this endpoint"
+        )
+
+    scores = get_contribution_scores(db)
+
+    def generate_rows():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CONTRIBUTION_SCORE_COLUMNS)
+        for index, member in enumerate(scores.itertuples(index=False), start=1):
+            writer.writerow([
+                ";".join(value) if isinstance(value, list) else ("" if contribution_value(value) is None else contribution_value(value))
+                for value in member
+            ])
+            if index % 500 == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        generate_rows(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="contribution_scores.csv"'}
+    )
+
 # this is to grade a submission, done by profs
 @app.put("/submissions/{submission_id}/grade")
 async def grade_submission(
@@ -4562,6 +6379,8 @@ async def grade_submission(
         
         # Update the submission score
         submission.score = score
+        db.flush()
+        refresh_gradebook(db, "submittable", "sub.id = :submission_id", submission_id=submission.id)
         db.commit()
         
         return JSONResponse(status_code=200, content={
@@ -4576,50 +6395,147 @@ async def grade_submission(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error grading submission: {str(e)}")
 
-# this is to grade a submission, done by profs
-@app.put("/submissions/{submission_id}/grade")
-async def grade_submission(
-    submission_id: int,
-    score: int = FastAPIForm(...),
+# Batch grading
+# A batch is a JSON list or a CSV upload of (key, score) rows; every row is validated
+# in one vectorized pass and all valid rows are written with a single UPDATE.
+async def read_batch_grades(request: Request, json_key: str, csv_key: str) -> pd.DataFrame:
+    """
+    Read the rows of a batch grading request
+
+    Parameters:
+    - request: JSON body ([{json_key: ..., "score": ...}]) or multipart form with a CSV "file"
+    - json_key / csv_key: name of the key field in JSON items / CSV header
+
+    Returns:
+    - DataFrame with columns row (line number for CSV, 1-based index for JSON), key and score
+    """
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = await request.form()
+        file = form.get("file")
+        if file is None or isinstance(file, str):
+            raise HTTPException(status_code=400, detail="Upload a CSV file in the 'file' field")
+        content = (await file.read()).decode("utf-8-sig")
+        df = pd.read_csv(StringIO(content), dtype=str, skipinitialspace=True)
+        if csv_key not in df.columns or "score" not in df.columns:
+            raise HTTPException(status_code=400, detail=f"CSV must contain headers: {csv_key}, score")
+        return pd.DataFrame({"row": df.index + 2, "key": df[csv_key], "score": df["score"]})
+
+    try:
+        items = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON list or a CSV upload")
+    shape_error = f"Body must be a list of {{\"{json_key}\": ..., \"score\": ...}} objects"
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail=shape_error)
+    for row, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            raise HTTPException(status_code=400, detail=shape_error)
+        # JSON true would coerce to 1 and lists/objects break the vectorized checks
+        for field in (json_key, "score"):
+            value = item.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, float, str, type(None))):
+                raise HTTPException(status_code=400, detail=f"Row {row}: {field} must be a number or a string")
+    return pd.DataFrame({
+        "row": range(1, len(items) + 1),
+        "key": [item.get(json_key) for item in items],
+        "score": [item.get("score") for item in items],
+    })
+
+def validate_batch_grades(df: pd.DataFrame, max_score: int, targets: Dict[int, int], key_label: str):
+    """
+    Check every row at once against max_score and the rows that can be graded
+
+    Parameters:
+    - df: rows from read_batch_grades
+    - max_score: maximum score of the submittable / assignable
+    - targets: key (team id / roll number) -> id of the row to update
+    - key_label: human name of the key for error messages
+
+    Returns:
+    - (updates, errors): list of (target id, score) and list of per-row errors
+    """
+    keys = pd.to_numeric(df["key"], errors="coerce")
+    scores = pd.to_numeric(df["score"], errors="coerce")
+    bad_key = keys.isna() | (keys % 1 != 0)
+    bad_score = scores.isna() | (scores % 1 != 0)
+    out_of_range = (scores < 0) | (scores > max_score)
+    duplicate = keys.duplicated(keep=False) & ~bad_key
+    target_ids = keys.map(lambda key: targets.get(int(key)) if pd.notna(key) and key % 1 == 0 else None)
+    no_target = target_ids.isna()
+
+    messages = np.select(
+        [bad_key, bad_score, out_of_range, duplicate, no_target],
+        [
+            f"Invalid {key_label}",
+            "Invalid score",
+            f"Score must be between 0 and {max_score}",
+            f"{key_label.capitalize()} appears more than once",
+            f"No submission found for this {key_label}",
+        ],
+        default=""
+    )
+    failed = messages != ""
+    errors = [
+        {"row": int(row), key_label.replace(" ", "_"): None if pd.isna(key) else key, "error": message}
+        for row, key, message in zip(df["row"][failed], df["key"][failed], messages[failed])
+    ]
+    updates = list(zip(target_ids[~failed].astype(int).tolist(), scores[~failed].astype(int).tolist()))
+    return updates, errors
+
+def apply_batch_grades(db: Session, table_name: str, updates: List[tuple]):
+    """Write all scores with one UPDATE ... FROM (VALUES ...), inside the caller's transaction"""
+    if not updates:
+        return
+    values = ", ".join(f"(:id_{i}, :score_{i})" for i in range(len(updates)))
+    params = {}
+    for i, (target_id, score) in enumerate(updates):
+        params[f"id_{i}"] = target_id
+        params[f"score_{i}"] = score
+    db.execute(text(f"""
+        UPDATE {table_name} AS t SET score = v.score
+        FROM (VALUES {values}) AS v(id, score)
+        WHERE t.id = v.id
+    """), params)
+
+# this is to grade many team submissions at once, done by profs and TAs
+@app.post("/submittables/{submittable_id}/grades/batch")
+async def batch_grade_submissions(
+    submittable_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     token: str = Depends(prof_or_ta_required)
 ):
-    """Grade a submission (professors only)"""
+    """Grade submissions from a JSON list of {team_id, score} or a CSV with TeamID,score columns"""
     try:
-        # Get the submission
-        submission = db.query(Submission).filter(Submission.id == submission_id).first()
-        if not submission:
-            raise HTTPException(status_code=404, detail="Submission not found")
-        
-        # Get the submittable to check max score
-        submittable = db.query(Submittable).filter(Submittable.id == submission.submittable_id).first()
+        submittable = db.query(Submittable).filter(Submittable.id == submittable_id).first()
         if not submittable:
             raise HTTPException(status_code=404, detail="Submittable not found")
-        
-        # Validate score
-        if score < 0:
-            raise HTTPException(status_code=400, detail="Score cannot be negative")
-        if score > submittable.max_score:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Score cannot exceed maximum score of {submittable.max_score}"
-            )
-        
-        # Update the submission score
-        submission.score = score
+
+        df = await read_batch_grades(request, "team_id", "TeamID")
+        targets = dict(
+            db.query(Submission.team_id, Submission.id)
+            .filter(Submission.submittable_id == submittable_id)
+            .order_by(Submission.id)
+            .all()
+        )
+        updates, errors = validate_batch_grades(df, submittable.max_score, targets, "team id")
+
+        apply_batch_grades(db, "submissions", updates)
+        refresh_gradebook(db, "submittable", "s.id = :submittable_id", submittable_id=submittable_id)
         db.commit()
-        
+
         return JSONResponse(status_code=200, content={
-            "message": "Submission graded successfully",
-            "submission_id": submission.id,
-            "score": submission.score,
-            "max_score": submittable.max_score
+            "message": f"Graded {len(updates)} submissions",
+            "graded": len(updates),
+            "max_score": submittable.max_score,
+            "errors": errors
         })
     except HTTPException as he:
+        db.rollback()
         raise he
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error grading submission: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error grading submissions: {str(e)}")
 
 ##Chatting Routes
 
@@ -4690,6 +6606,7 @@ async def get_discussions_page(
         raise HTTPException(status_code=404, detail=f"User not found: {user.name}")
 
     channels = []
+    role = role_for_id(user.role_id, db)
     
     # Add global channel for all users
     global_channel = db.query(Channel).filter(Channel.type == 'global').first()
@@ -4705,12 +6622,12 @@ async def get_discussions_page(
     channels.append(global_channel)
 
     # For professors: add only ta-team channels
-    if user.role.role == RoleType.PROF:
+    if role == RoleType.PROF:
         ta_team_channels = db.query(Channel).filter(Channel.type == 'ta-team').all()
         channels.extend(ta_team_channels)
     
     # For students: add their team channel and team-TA channel if they exist
-    elif user.role.role == RoleType.STUDENT and user.teams:
+    elif role == RoleType.STUDENT and user.teams:
         team = user.teams[0]  # Get the student's team
         
         # Get or create team channel
@@ -4750,7 +6667,7 @@ async def get_discussions_page(
             channels.append(ta_channel)
     
     # For TAs and Profs: add all their team-TA channels
-    elif user.role.role == RoleType.TA:
+    elif role == RoleType.TA:
         # Get all teams this TA/Prof is assigned to
         team_tas = db.query(Team_TA).filter(Team_TA.ta_id == user.id).all()
         for team_ta in team_tas:
@@ -4777,9 +6694,9 @@ async def get_discussions_page(
         "username": user.username,
         "team_id": user.team_id,
         "team_name": user.teams[0].name if user.teams else 'No Team',
-        "is_ta": user.role.role in [RoleType.TA, RoleType.PROF],
+        "is_ta": role in [RoleType.TA, RoleType.PROF],
         "channels": channels,
-        "role": user.role.role.value
+        "role": role.value
     }
 
 def validate_channel_access(user: User, channel_id: int, db: Session) -> bool:
@@ -4799,6 +6716,8 @@ def validate_channel_access(user: User, channel_id: int, db: Session) -> bool:
     if not channel:
         return False
         
+    role = role_for_id(user.role_id, db)
+
     # Global channel is accessible to all
     if channel.type == 'global':
         return True
@@ -4811,17 +6730,17 @@ def validate_channel_access(user: User, channel_id: int, db: Session) -> bool:
     # For TA-team channels:
     if channel.type == 'ta-team':
         # Professors can access all TA-team channels
-        if user.role.role == RoleType.PROF:
+        if role == RoleType.PROF:
             return True
         # If user is a TA, check if they're assigned to the team
-        if user.role.role == RoleType.TA:
+        if role == RoleType.TA:
             ta_assignment = db.query(Team_TA).filter(
                 Team_TA.team_id == channel.team_id,
                 Team_TA.ta_id == user.id
             ).first()
             return ta_assignment is not None
         # If user is a student, check if they're in the team
-        if user.role.role == RoleType.STUDENT:
+        if role == RoleType.STUDENT:
             #return any(team.id == channel.team_id for team in user.teams)
             return user.team_id == channel.team_id  
             
@@ -4850,23 +6769,34 @@ async def get_messages(
             detail="You do not have access to this channel"
         )
     
-    messages = db.query(Message).filter(
+    # Columns only, with the sender's name joined in; loading Message would
+    # pull each sender through User's joined relationships
+    messages = db.query(
+        Message.id,
+        Message.content,
+        Message.sender_id,
+        User.name.label("sender_name"),
+        Message.channel_id,
+        Message.created_at,
+        Message.message_type,
+        Message.file_name
+    ).outerjoin(User, User.id == Message.sender_id).filter(
         Message.channel_id == channel_id
     ).order_by(Message.created_at).all()
     
     # Convert messages to dictionary with sender information
-    return [
+    return fast_json(MESSAGES_ADAPTER, [
         {
             "id": message.id,
             "content": message.content,
             "sender_id": message.sender_id,
-            "sender_name": message.sender.name,
+            "sender_name": message.sender_name,
             "channel_id": message.channel_id,
-            "created_at": message.created_at.isoformat(),
+            "created_at": message.created_at.isoformat() if message.created_at else None,
             "message_type": message.message_type,
             "file_name": message.file_name
         } for message in messages
-    ]
+    ])
 
 @app.post("/discussions/messages")
 async def send_message(
@@ -4963,7 +6893,7 @@ async def websocket_endpoint(
     user = current_user_data["user"]
     
     # Validate user's access to the channel
-    print(f"User: {user.username}, Channel ID: {channel_id}")
+    chat_logger.debug("User %s opened channel %s", user.username, channel_id)
     if not validate_channel_access(user, channel_id, db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -5237,6 +7167,8 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
                     })
                 created_teams.append(team_id)
         
+        db.flush()
+        sync_gradebook_members(db, [user.id for users in team_to_users.values() for user in users])
         db.commit()
         
         # Ensure all response data is serializable
@@ -5254,7 +7186,7 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
         
     except Exception as e:
         db.rollback()
-        print(f"Error processing CSV: {str(e)}")
+        logger.exception("Error processing CSV")
         return JSONResponse(
             status_code=500,
             content={
@@ -5353,7 +7285,6 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
 
         # Validate the CSV format
         required_columns = ['team_name', 'member1', 'member2', 'member3', 'member4', 'member5', 'member6', 'member7', 'member8', 'member9', 'member10']
-        print(df.columns)
         for _column_name in required_columns:
             if _column_name not in df.columns:
                 raise HTTPException(status_code=400, detail=f"Invalid CSV format. Missing column: {_column_name}")
@@ -5389,8 +7320,8 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
 
 
         team_names = list(team_names)
-        print("Team names: ", team_names)
-        print("Members set:", members_set)
+        csv_logger.debug("Creating %d teams", len(team_names))
+        member_ids = []
         for i in range(len(team_names)):
             team_name = team_names[i]
             members = members_set[i]
@@ -5398,10 +7329,12 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
             db.add(team)
             for member in members:
                 user = db.query(User).filter_by(username=member).first()
-                print("Over here")
                 if user:
                     team.members.append(user)
                     user.team_id = team.id
+                    member_ids.append(user.id)
+        db.flush()
+        sync_gradebook_members(db, member_ids)
         db.commit()
 
         
@@ -5504,7 +7437,7 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         if not user:
             # For security, we return a similar message but with a special status code
             # that the frontend can use to show a helpful message
-            print(f"OTP request for non-existent email: {request.email}")
+            logger.info("OTP requested for unknown email")
             return {
                 "message": "If the email exists in our system, a verification code has been sent. Please check your spam folder if you don't see it in your inbox.",
                 "status": "user_not_found"  # Changed this to be more semantic
@@ -5512,13 +7445,13 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         
         # Generate secure OTP
         plain_otp = generate_secure_otp(6)
-        print(f"Generated OTP for {user.email}: {plain_otp}")  # Only log during development
+        logger.debug("Generated OTP for %s", user.email)
         
         # Hash the OTP for secure storage
         hashed_otp = hash_otp(plain_otp)
         
-        # Set expiration time (10 minutes from now)
-        expiration_time = datetime.now(timezone.utc) + timedelta(minutes=10)
+        # Set expiration time (10 minutes from now by the database clock, which also checks it)
+        expiration_time = func.now() + timedelta(minutes=10)
         
         # Check if an OTP entry already exists for this user
         existing_otp = db.query(UserOTP).filter(UserOTP.user_id == user.id).first()
@@ -5526,51 +7459,34 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         if existing_otp:
             # Update existing OTP record
             existing_otp.hashed_otp = hashed_otp
-            existing_otp.expires_at = expiration_time.isoformat()
+            existing_otp.expires_at = expiration_time
         else:
             # Create new OTP record
             new_otp_record = UserOTP(
                 user_id=user.id,
                 hashed_otp=hashed_otp,
-                expires_at=expiration_time.isoformat()
+                expires_at=expiration_time
             )
             db.add(new_otp_record)
         
+        # Queue the email in the same transaction as the OTP, the mail sender
+        # delivers it in the background so the request never waits on SMTP
+        enqueue_email(db, user.email, "Your Password Reset Code - Sahara", create_otp_email(plain_otp), kind="otp", user_id=user.id)
+        
         # Commit the changes
         db.commit()
         
-        # Create email content
-        email_subject = "Your Password Reset Code - Sahara"
-        email_html = create_otp_email(plain_otp)
-        
-        # Send email with OTP
-        try:
-            print(f"Attempting to send email to {user.email} with OTP: {plain_otp}")
-            email_sent = send_email(user.email, email_subject, email_html)
-        except Exception as e:
-            print(f"Exception during email sending: {str(e)}")
-            print(traceback.format_exc())
-            email_sent = False
-        
-        if not email_sent:
-            print(f"Failed to send OTP email to {user.email}")
-            return {
-                "message": "If the email exists in our system, a verification code has been sent. Please check your spam folder if you don't see it in your inbox.",
-                "status": "email_attempted" # For debugging purposes
-            }
-        
         # For security reasons, always return the same message whether email exists or not
         return {
             "message": "If the email exists in our system, a verification code has been sent. Please check your spam folder if you don't see it in your inbox.",
-            "status": "email_sent" # For debugging purposes
+            "status": "email_queued" # For debugging purposes
         }
     
     except HTTPException as he:
         raise he
     except Exception as e:
         db.rollback()
-        print(f"Error in request_otp: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error in request_otp")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process your request. Please try again."
@@ -5592,19 +7508,19 @@ async def verify_otp_endpoint(request: VerifyOTPModel, db: Session = Depends(get
                 detail="User not found"
             )
         
-        # Get OTP record for user
-        otp_record = db.query(UserOTP).filter(UserOTP.user_id == user.id).first()
+        # Get OTP record for user, with its expiry checked by the database clock
+        row = db.query(UserOTP, (UserOTP.expires_at < func.now()).label("expired")).filter(UserOTP.user_id == user.id).first()
         
         # Check if OTP record exists
-        if not otp_record:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No active OTP request found for this email"
             )
+        otp_record = row.UserOTP
         
         # Check if OTP has expired
-        expiration_time = datetime.fromisoformat(otp_record.expires_at)
-        if datetime.now(timezone.utc) > expiration_time:
+        if row.expired:
             # Delete expired OTP
             db.delete(otp_record)
             db.commit()
@@ -5627,7 +7543,7 @@ async def verify_otp_endpoint(request: VerifyOTPModel, db: Session = Depends(get
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Error in verify_otp: {e}")
+        logger.exception("Error in verify_otp")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to verify OTP. Please try again."
@@ -5649,19 +7565,19 @@ async def reset_password_with_otp(request: ResetPasswordWithOTPModel, db: Sessio
                 detail="User not found"
             )
         
-        # Get OTP record for user
-        otp_record = db.query(UserOTP).filter(UserOTP.user_id == user.id).first()
+        # Get OTP record for user, with its expiry checked by the database clock
+        row = db.query(UserOTP, (UserOTP.expires_at < func.now()).label("expired")).filter(UserOTP.user_id == user.id).first()
         
         # Check if OTP record exists
-        if not otp_record:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No active OTP request found for this email"
             )
+        otp_record = row.UserOTP
         
         # Check if OTP has expired
-        expiration_time = datetime.fromisoformat(otp_record.expires_at)
-        if datetime.now(timezone.utc) > expiration_time:
+        if row.expired:
             # Delete expired OTP
             db.delete(otp_record)
             db.commit()
@@ -5703,89 +7619,246 @@ async def reset_password_with_otp(request: ResetPasswordWithOTPModel, db: Sessio
         raise he
     except Exception as e:
         db.rollback()
-        print(f"Error in reset_password_with_otp: {e}")
+        logger.exception("Error in reset_password_with_otp")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to reset password. Please try again."
         )
 
 # Email configuration - you should store these in environment variables in production
-EMAIL_HOST = "smtp.gmail.com"
-EMAIL_PORT = 587
-EMAIL_HOST_USER = "saharaai.noreply@gmail.com"  # Replace with your email
-EMAIL_HOST_PASSWORD = "zfrr wwru xeru rbhf"  # Replace with your app password
-EMAIL_USE_TLS = True
+# (they can be, e.g. EMAIL_HOST=localhost EMAIL_PORT=1025 EMAIL_USE_TLS=0 EMAIL_HOST_PASSWORD= for a local SMTP stub)
+EMAIL_HOST = os.environ.get("EMAIL_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.environ.get("EMAIL_PORT", 587))
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER", "saharaai.noreply@gmail.com")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD", "zfrr wwru xeru rbhf")  # empty skips login
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "1") == "1"
 DEFAULT_FROM_EMAIL = "Sahara Team <saharaai.noreply@gmail.com>"  # Fixed to use the actual email account
 
-# Function to send emails
-def send_email(to_email, subject, html_content):
+# Mail outbox tuning. Gmail accounts are limited to a few hundred messages a
+# day and throttle bursts, so the sender stays well below that by default.
+# The limit is per process, run the app with one worker or divide it.
+EMAIL_RATE_PER_MINUTE = int(os.environ.get("EMAIL_RATE_PER_MINUTE", 20))  # same setting as app/core/config/settings.py
+MAIL_SENDER_ENABLED = os.environ.get("MAIL_SENDER_ENABLED", "1") == "1"  # 0 leaves mail queued, e.g. under load tests
+MAIL_MAX_ATTEMPTS = 5
+MAIL_BACKOFF_SECONDS = 30  # doubled after every failed attempt
+MAIL_BACKOFF_MAX_SECONDS = 3600
+MAIL_BATCH_SIZE = 20
+MAIL_POLL_SECONDS = 5  # also picks up mail queued by other processes
+MAIL_IDLE_SECONDS = 60  # close the pooled SMTP session after this long without mail
+MAIL_SMTP_TIMEOUT = 30
+MAIL_STALE_SENDING_SECONDS = 600  # a claimed message older than this was lost by a crashed sender
+MAIL_SECRET_KINDS = ("otp", "credentials")  # bodies hold a code or temporary password, cleared once settled
+
+MAIL_CLAIM_SQL = text("""
+    UPDATE mail_outbox
+    SET status = 'sending', attempts = attempts + 1, next_attempt_at = now()
+    WHERE id IN (
+        SELECT id FROM mail_outbox
+        WHERE status = 'pending' AND next_attempt_at <= now()
+        ORDER BY next_attempt_at, id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, kind, to_email, subject, html_content, attempts
+""")
+
+MAIL_RELEASE_STALE_SQL = text("""
+    UPDATE mail_outbox SET status = 'pending'
+    WHERE status = 'sending' AND next_attempt_at < now() - make_interval(secs => :stale)
+""")
+
+def build_email_message(to_email, subject, html_content):
+    msg = MIMEMultipart()
+    msg['From'] = DEFAULT_FROM_EMAIL
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg['Date'] = formatdate(localtime=True)
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+def enqueue_email(db: Session, to_email: str, subject: str, html_content: str, kind: str = "notification", user_id: Optional[int] = None) -> MailOutbox:
     """
-    Send an HTML email using SMTP
-    
-    Args:
-        to_email: Recipient email address
-        subject: Email subject
-        html_content: HTML body of the email
+    Queue an HTML email in the outbox
+
+    The message is part of the caller's transaction: it is only delivered once
+    the caller commits, and disappears with a rollback.
+
+    Parameters:
+    - db: session of the current request
+    - to_email: recipient address
+    - subject: email subject
+    - html_content: HTML body
+    - kind: category used to track the message, e.g. "credentials"
+    - user_id: account the message is about, if any
+
+    Returns:
+    - the pending MailOutbox row
     """
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = DEFAULT_FROM_EMAIL
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg['Date'] = formatdate(localtime=True)
-        
-        # Attach HTML content
-        msg.attach(MIMEText(html_content, 'html'))
-        
-        print(f"Attempting to send email to {to_email}")
-        
-        # Connect to SMTP server with more detailed error handling
+    mail = MailOutbox(kind=kind, user_id=user_id, to_email=to_email, subject=subject, html_content=html_content)
+    db.add(mail)
+    db.info["mail_enqueued"] = True
+    return mail
+
+class MailSender:
+    """
+    Background thread delivering the mail outbox
+
+    It keeps one authenticated SMTP session open while there is mail (closing
+    it after MAIL_IDLE_SECONDS idle), spends a token per message to stay under
+    the provider's quota and retries transient failures with exponential
+    backoff. Rows are claimed with SKIP LOCKED, so several processes can run a
+    sender against the same outbox.
+    """
+    def __init__(self):
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.smtp = None
+        self.smtp_used_at = 0.0
+        self.bucket = TokenBucket(EMAIL_RATE_PER_MINUTE / 60, EMAIL_RATE_PER_MINUTE)
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self.run, name="mail-sender", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = 10):
+        self.stopping.set()
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def wake(self):
+        self.wakeup.set()
+
+    def run(self):
+        while not self.stopping.is_set():
+            self.wakeup.clear()
+            try:
+                sent_any = self.send_due()
+            except Exception as e:
+                logger.exception("Mail sender error")
+                sent_any = False
+            if sent_any:
+                continue
+            if self.smtp is not None and time.monotonic() - self.smtp_used_at > MAIL_IDLE_SECONDS:
+                self.close_smtp()
+            self.wakeup.wait(MAIL_POLL_SECONDS)
+        self.close_smtp()
+
+    def send_due(self) -> bool:
+        """Claim and deliver one batch of due messages, returns whether there was any"""
+        with SessionLocal() as db:
+            db.execute(MAIL_RELEASE_STALE_SQL, {"stale": MAIL_STALE_SENDING_SECONDS})
+            claimed = db.execute(MAIL_CLAIM_SQL, {"limit": MAIL_BATCH_SIZE}).all()
+            db.commit()
+
+            for mail in claimed:
+                # Claimed rows are delivered even while stopping, so they are not left in 'sending'
+                while (wait := self.bucket.take()) > 0:
+                    time.sleep(wait)
+                error, permanent = self.deliver(mail)
+                if error is None:
+                    changes = {"status": "sent", "sent_at": func.now(), "last_error": None}
+                elif permanent or mail.attempts >= MAIL_MAX_ATTEMPTS:
+                    logger.warning("Giving up on email %s to %s: %s", mail.id, mail.to_email, error)
+                    changes = {"status": "failed", "last_error": error}
+                else:
+                    backoff = min(MAIL_BACKOFF_SECONDS * 2 ** (mail.attempts - 1), MAIL_BACKOFF_MAX_SECONDS)
+                    changes = {
+                        "status": "pending",
+                        "last_error": error,
+                        "next_attempt_at": func.now() + timedelta(seconds=backoff),
+                    }
+                if changes["status"] != "pending" and mail.kind in MAIL_SECRET_KINDS:
+                    # Do not keep the plaintext code or password once it will not be sent again
+                    changes["html_content"] = ""
+                db.query(MailOutbox).filter(MailOutbox.id == mail.id).update(changes, synchronize_session=False)
+                db.commit()
+            return bool(claimed)
+
+    def connect(self):
+        if self.smtp is None:
+            smtp = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT, timeout=MAIL_SMTP_TIMEOUT)
+            try:
+                if EMAIL_USE_TLS:
+                    smtp.starttls()
+                if EMAIL_HOST_PASSWORD:
+                    smtp.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
+            except Exception:
+                smtp.close()
+                raise
+            self.smtp = smtp
+        return self.smtp
+
+    def close_smtp(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except Exception:
+                self.smtp.close()
+            self.smtp = None
+
+    def deliver(self, mail):
+        """
+        Send one outbox row over the pooled session
+
+        Returns:
+        - (None, False) when sent, otherwise (error message, whether retrying is pointless)
+        """
+        if not mail.html_content:
+            # e.g. a secret that was already cleared, sending it would only deliver a blank email
+            return "Empty message body", True
+        message = build_email_message(mail.to_email, mail.subject, mail.html_content).as_string()
+        # A pooled session may have been dropped by the server, reconnect once
+        for reconnect in (False, True):
+            try:
+                self.connect().sendmail(EMAIL_HOST_USER, [mail.to_email], message)
+                self.smtp_used_at = time.monotonic()
+                return None, False
+            except smtplib.SMTPServerDisconnected as e:
+                self.close_smtp()
+                if reconnect:
+                    return f"Disconnected: {str(e)}", False
+            except smtplib.SMTPRecipientsRefused as e:
+                self.reset_smtp()
+                return f"Recipient refused: {e.recipients}", True
+            except smtplib.SMTPResponseException as e:
+                # 5xx replies to the message itself are permanent, anything else
+                # (including authentication) may succeed later
+                self.close_smtp()
+                permanent = e.smtp_code >= 500 and isinstance(e, smtplib.SMTPDataError)
+                return f"SMTP {e.smtp_code}: {e.smtp_error!r}", permanent
+            except (smtplib.SMTPException, OSError) as e:
+                self.close_smtp()
+                return f"{type(e).__name__}: {str(e)}", False
+
+    def reset_smtp(self):
         try:
-            # Enable debug output
-            server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
-            server.set_debuglevel(1)  # Add this line to enable verbose debug output
-            print(f"Connected to SMTP server: {EMAIL_HOST}:{EMAIL_PORT}")
-            
-            if EMAIL_USE_TLS:
-                server.starttls()
-                print("TLS encryption enabled")
-            
-            print(f"Logging in with user: {EMAIL_HOST_USER}")
-            server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
-            print("Login successful")
-            
-            # Send email - more detailed debugging
-            print(f"Sending mail from {EMAIL_HOST_USER} to {to_email}")
-            result = server.sendmail(EMAIL_HOST_USER, to_email, msg.as_string())
-            print(f"Email sent successfully to {to_email}")
-            print(f"Server response: {result if result else 'No response (success)'}")
-            server.quit()
-            
-            return True
-        except smtplib.SMTPAuthenticationError as auth_err:
-            print(f"SMTP Authentication Error: {str(auth_err)}")
-            return False
-        except smtplib.SMTPRecipientsRefused as ref_err:
-            print(f"Recipients refused: {str(ref_err)}")
-            return False
-        except smtplib.SMTPSenderRefused as send_err:
-            print(f"Sender refused: {str(send_err)}")
-            return False
-        except smtplib.SMTPDataError as data_err:
-            print(f"SMTP data error: {str(data_err)}")
-            return False
-        except smtplib.SMTPException as smtp_e:
-            print(f"SMTP Error: {str(smtp_e)}")
-            return False
-        except Exception as conn_e:
-            print(f"Connection error: {str(conn_e)}")
-            print(f"Error type: {type(conn_e).__name__}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return False
-    except Exception as e:
-        print(f"Failed to prepare email: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
-        return False
+            self.smtp.rset()
+        except Exception:
+            self.close_smtp()
+
+mail_sender = MailSender()
+
+@event.listens_for(SessionLocal, "after_commit")
+def wake_mail_sender(session):
+    # enqueue_email marks the session, the sender only sees the rows after the commit
+    if session.info.pop("mail_enqueued", False):
+        mail_sender.wake()
+
+@app.on_event("startup")
+def start_mail_sender():
+    if MAIL_SENDER_ENABLED:
+        mail_sender.start()
+    else:
+        logger.warning("Mail sender disabled, outgoing mail stays in the outbox")
+
+@app.on_event("shutdown")
+def stop_mail_sender():
+    mail_sender.stop()
 
 # Create HTML email template for OTP
 def create_otp_email(otp, expiry_minutes=10):
@@ -5839,6 +7912,146 @@ def create_otp_email(otp, expiry_minutes=10):
     </html>
     """
 
+# Compiled once, rendered per account when a roster is imported with email_credentials
+CREDENTIALS_EMAIL_TEMPLATE = string.Template("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>Your Sahara Account</title>
+        <style>
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+            .header { background-color: #4CAF50; color: white; padding: 10px; text-align: center; }
+            .content { padding: 20px; background-color: #f9f9f9; }
+            .code { font-size: 20px; font-weight: bold; padding: 15px; background-color: #e9e9e9; margin: 20px 0; }
+            .footer { font-size: 12px; text-align: center; margin-top: 20px; color: #1f2e6a; }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h2>Welcome to Sahara</h2>
+            </div>
+            <div class="content">
+                <p>Hello $name,</p>
+                <p>A $role account has been created for you on Sahara.</p>
+                <div class="code">
+                    Username: $username<br>
+                    Temporary password: $password
+                </div>
+                <p>Please log in and change your password right away.</p>
+            </div>
+            <div class="footer">
+                <p>This is an automated message, please do not reply directly to this email.</p>
+                <p>&copy; $year Sahara Team</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """)
+
+CREDENTIALS_ROLE_LABELS = {RoleType.STUDENT: "student", RoleType.TA: "TA"}
+
+def enqueue_credentials_email(db: Session, user: User, temp_password: str, role_label: str) -> MailOutbox:
+    """
+    Render and queue the welcome email carrying a new account's credentials
+
+    Parameters:
+    - db: session the account was created in, the email commits with it
+    - user: the new account (flushed, so it has an id)
+    - temp_password: the plain temporary password
+    - role_label: how the role is named in the email, e.g. "student"
+    """
+    html_content = CREDENTIALS_EMAIL_TEMPLATE.substitute(
+        name=html.escape(user.name),
+        role=role_label,
+        username=html.escape(user.username),
+        password=html.escape(temp_password),
+        year=datetime.now().year,
+    )
+    return enqueue_email(db, user.email, "Welcome to Sahara - Your Account Details", html_content, kind="credentials", user_id=user.id)
+
+def latest_credential_emails(db: Session):
+    """Subquery of the latest credentials email of every user"""
+    return (
+        db.query(MailOutbox)
+        .filter(MailOutbox.kind == "credentials", MailOutbox.user_id.isnot(None))
+        .distinct(MailOutbox.user_id)
+        .order_by(MailOutbox.user_id, MailOutbox.id.desc())
+        .subquery()
+    )
+
+# this is to check which imported accounts got their credentials email, done by profs and TAs
+@app.get("/credential-emails")
+def get_credential_emails(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    try:
+        latest = latest_credential_emails(db)
+        # Counts cover every account, whatever the ?status= filter
+        counts = dict(
+            db.query(latest.c.status, func.count())
+            .join(User, User.id == latest.c.user_id)
+            .group_by(latest.c.status)
+            .all()
+        )
+        query = db.query(latest, User.username).join(User, User.id == latest.c.user_id)
+        if status_filter:
+            query = query.filter(latest.c.status == status_filter)
+        rows = query.order_by(latest.c.user_id).all()
+
+        return JSONResponse(status_code=200, content={
+            "counts": counts,
+            "emails": [
+                {
+                    "user_id": row.user_id,
+                    "username": row.username,
+                    "email": row.to_email,
+                    "status": row.status,
+                    "attempts": row.attempts,
+                    "last_error": row.last_error,
+                    "sent_at": row.sent_at.isoformat() if row.sent_at else None,
+                }
+                for row in rows
+            ]
+        })
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching credential emails: {str(e)}")
+
+# this is to resend credentials emails that ran out of retries, done by profs and TAs
+@app.post("/credential-emails/retry")
+def retry_credential_emails(
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    try:
+        latest = latest_credential_emails(db)
+        users = (
+            db.query(User)
+            .join(latest, latest.c.user_id == User.id)
+            .filter(latest.c.status == "failed")
+            .all()
+        )
+        # A failed email's body was cleared along with its password, so each
+        # account gets a new temporary password in a new email
+        for user in users:
+            temp_password = generate_random_string(10)
+            user.hashed_password = create_hashed_password(temp_password)
+            role_label = CREDENTIALS_ROLE_LABELS.get(role_for_id(user.role_id, db), "user")
+            enqueue_credentials_email(db, user, temp_password, role_label)
+        db.commit()
+        return JSONResponse(status_code=200, content={"message": f"Requeued {len(users)} credential emails", "requeued": len(users)})
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error retrying credential emails: {str(e)}")
+
 @app.get("/feedback/students")
 async def get_student_feedback_info(
     current_user: dict = Depends(get_current_user),
@@ -6016,132 +8229,6 @@ async def submit_student_feedback(
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/feedback/admin")
-async def get_admin_feedback(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get all teams that have at least one feedback submission"""
-    try:
-        # Check if user is an admin (TA or professor)
-        if current_user["role"] not in [RoleType.TA, RoleType.PROF]:
-            raise HTTPException(
-                status_code=403,
-                detail="Only teaching assistants and professors can access this endpoint"
-            )
-
-        # Get all teams that have feedback submissions
-        teams_with_feedback = (
-            db.query(Team)
-            .join(FeedbackSubmission, Team.id == FeedbackSubmission.team_id)
-            .distinct()
-            .all()
-        )
-
-        result = []
-        for team in teams_with_feedback:
-            # Get submission count for this team
-            submission_count = (
-                db.query(FeedbackSubmission)
-                .filter(FeedbackSubmission.team_id == team.id)
-                .count()
-            )
-
-            result.append({
-                "team_id": team.id,
-                "team_name": team.name,
-                "member_count": len(team.members),
-                "submission_count": submission_count,
-                "last_submission": db.query(FeedbackSubmission)
-                    .filter(FeedbackSubmission.team_id == team.id)
-                    .order_by(FeedbackSubmission.submitted_at.desc())
-                    .first()
-                    .submitted_at.isoformat()
-            })
-
-        return result
-        
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/feedback/admin/view/{team_id}")
-async def get_team_feedback_details(
-    team_id: int,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get detailed feedback submissions for a specific team"""
-    try:
-        # Check if user is an admin (TA or professor)
-        if current_user["role"] not in [RoleType.TA, RoleType.PROF]:
-            raise HTTPException(
-                status_code=403,
-                detail="Only teaching assistants and professors can access this endpoint"
-            )
-
-        # Check if team exists
-        team = db.query(Team).filter(Team.id == team_id).first()
-        if not team:
-            raise HTTPException(status_code=404, detail="Team not found")
-
-        # Get all feedback submissions for this team
-        submissions = (
-            db.query(FeedbackSubmission)
-            .filter(FeedbackSubmission.team_id == team_id)
-            .all()
-        )
-
-        # Get all team members for reference
-        team_members = {
-            member.id: member.name 
-            for member in team.members
-        }
-
-        # Format the submissions with detailed information
-        formatted_submissions = []
-        for submission in submissions:
-            # Get details for this submission
-            feedback_details = (
-                db.query(FeedbackDetail)
-                .filter(FeedbackDetail.submission_id == submission.id)
-                .all()
-            )
-
-            # Get submitter info
-            submitter = db.query(User).filter(User.id == submission.submitter_id).first()
-
-            formatted_submissions.append({
-                "submission_id": submission.id,
-                "submitter": {
-                    "id": submitter.id,
-                    "name": submitter.name
-                },
-                "submitted_at": submission.submitted_at.isoformat(),
-                "feedback": [
-                    {
-                        "member_id": detail.member_id,
-                        "member_name": team_members.get(detail.member_id, "Unknown"),
-                        "contribution": detail.contribution,
-                        "remarks": detail.remarks
-                    }
-                    for detail in feedback_details
-                ]
-            })
-
-        return {
-            "team_id": team.id,
-            "team_name": team.name,
-            "members": team_members,
-            "submissions": formatted_submissions
-        }
-
-    except HTTPException as he:
-        raise he
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
 # assignables start here
 # this is to submit file for an assignable, done by students
 @app.post("/assignables/{assignable_id}/submit")
@@ -6155,10 +8242,11 @@ async def submit_file(
     Submit a file for an assignable.
     Only one assignment per submittable per user is allowed.
     """
-    # Get the submittable
-    assignable = db.query(Assignable).filter(Assignable.id == assignable_id).first()
-    if not assignable:
+    # Get the submittable, placed in its window by the database clock
+    row = db.query(Assignable, time_window_status(Assignable)).filter(Assignable.id == assignable_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Assignable not found")
+    assignable, window_status = row
 
     # Check if user already has a submission
     user = db.query(User).filter(User.id == current_user["user"].id).first()
@@ -6174,13 +8262,9 @@ async def submit_file(
         )
 
     # Check if submission is allowed based on opens_at and deadline
-    now = datetime.now(timezone.utc)
-    opens_at = datetime.fromisoformat(assignable.opens_at) if assignable.opens_at else None
-    deadline = datetime.fromisoformat(assignable.deadline)
-
-    if opens_at and now < opens_at:
+    if window_status == "upcoming":
         raise HTTPException(status_code=400, detail="Submission period has not started yet")
-    if now > deadline:
+    if window_status == "closed":
         raise HTTPException(status_code=400, detail="Submission deadline has passed")
 
     # Generate a unique filename
@@ -6265,6 +8349,61 @@ async def download_assignment(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error downloading submission: {str(e)}")
     
+# this is to download every assignment of an assignable as one ZIP, done by profs and TAs
+@app.get("/assignables/{assignable_id}/assignments/archive")
+async def download_assignable_archive(
+    assignable_id: int,
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Stream all assignments for an assignable as a ZIP, one folder per roll number, with a manifest"""
+    try:
+        assignable = db.query(Assignable).filter(Assignable.id == assignable_id).first()
+        if not assignable:
+            raise HTTPException(status_code=404, detail="Assignable not found")
+
+        rows = (
+            db.query(
+                Assignment.id,
+                Assignment.user_id,
+                User.name,
+                Assignment.submitted_on,
+                Assignment.score,
+                Assignment.file_url,
+                Assignment.original_filename
+            )
+            .join(User, User.id == Assignment.user_id)
+            .filter(Assignment.assignable_id == assignable_id)
+            .order_by(Assignment.user_id)
+            .all()
+        )
+
+        entries = []
+        for assignment_id, roll_no, name, submitted_on, score, file_url, original_filename in rows:
+            entries.append({
+                "assignment_id": assignment_id,
+                "roll_no": roll_no,
+                "name": name,
+                "submitted_on": submitted_on,
+                "score": score,
+                "max_score": assignable.max_score,
+                "original_filename": original_filename,
+                "local_path": file_url.lstrip('/') if file_url else None,
+                "archive_path": f"{roll_no}/{archive_safe_name(original_filename)}"
+            })
+
+        manifest_headers = ["assignment_id", "roll_no", "name", "submitted_on", "score", "max_score", "original_filename"]
+        archive_name = archive_safe_name(f"{assignable.title}_assignments") + ".zip"
+        return StreamingResponse(
+            stream_submission_archive(entries, manifest_headers),
+            media_type="application/zip",
+            headers={"Content-Disposition": attachment_disposition(archive_name)}
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building assignments archive: {str(e)}")
+
 # this is to get all submittables categorized by status, done by students and profs
 @app.get("/assignables/")
 async def get_assignables(
@@ -6273,26 +8412,10 @@ async def get_assignables(
 ):
     """Get all assignables categorized by status"""
     try:
-        print("started fetching data")
-        print(datetime.now(timezone.utc))
-        # Get all submittables
-        assignables = db.query(Assignable).all() 
-        print(datetime.now(timezone.utc))
-        assignables = db.query(Assignable).all() 
-        print(datetime.now(timezone.utc))
-        # Get user's team submissions
         user = current_user["user"]
-        print(datetime.now(timezone.utc))
-        user_assignments = {}
-        print(datetime.now(timezone.utc))
-        if user.id:
-            assignments = db.query(Assignment).filter(Assignment.user_id == user.id).all()
-            user_assignments = {s.assignable_id: s for s in assignments}
-        print(datetime.now(timezone.utc))
-        print("fetched data")
+
         # Helper function to format submittable
-        def format_assignable(s):
-            assignment = user_assignments.get(s.id)
+        def format_assignable(s, assignment):
             return {
                 "id": s.id,
                 "title": s.title,
@@ -6312,29 +8435,18 @@ async def get_assignables(
                 }
             }
 
-        # Categorize submittables
-        now = datetime.now(timezone.utc)
-        upcoming = []
-        open_assignables = []
-        closed = []
-
-        for s in assignables:
-            formatted = format_assignable(s)
-            opens_at = datetime.fromisoformat(s.opens_at) if s.opens_at else None
-            deadline = datetime.fromisoformat(s.deadline)
-
-            if opens_at and now < opens_at:
-                upcoming.append(formatted)
-            elif now > deadline:
-                closed.append(formatted)
-            else:
-                open_assignables.append(formatted)
+        # Categorize assignables in SQL, with the user's assignment joined in
+        categorized = {"upcoming": [], "open": [], "closed": []}
+        rows = (
+            db.query(Assignable, Assignment, time_window_status(Assignable))
+            .outerjoin(Assignment, and_(Assignment.assignable_id == Assignable.id, Assignment.user_id == user.id))
+            .order_by(Assignable.id)
+            .all()
+        )
+        for s, assignment, window_status in rows:
+            categorized[window_status].append(format_assignable(s, assignment))
 
-        return {
-            "upcoming": upcoming,
-            "open": open_assignables,
-            "closed": closed
-        }
+        return categorized
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching assignables: {str(e)}")
     
@@ -6482,6 +8594,19 @@ async def create_assignable(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating assignable: {str(e)}")
 
+# this is to see how many students submitted / were graded for each assignable, done by profs and TAs
+@app.get("/assignables/summary")
+async def get_assignables_summary(
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Get submission progress for every assignable"""
+    try:
+        summary = get_progress_summary("assignables", ASSIGNABLES_SUMMARY_SQL, "missing_student_ids", db)
+        return JSONResponse(status_code=200, content=summary)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching assignables summary: {str(e)}")
+
 # this is to get details of a specific assignable, done by students and profs
 @app.get("/assignables/{assignable_id}")
 async def get_assignable(
@@ -6590,6 +8715,8 @@ async def delete_assignable(
         
         # Delete the submittable
         db.delete(assignable)
+        db.flush()
+        sync_gradebook_item(db, "assignable", assignable_id)
         db.commit()
         
         return JSONResponse(status_code=200, content={"message": "Assignable deleted successfully"})
@@ -6657,6 +8784,8 @@ async def update_assignable(
             existing_assignable.file_url = f"uploads/{file_name}"
             existing_assignable.original_filename = file.filename
         
+        db.flush()
+        sync_gradebook_item(db, "assignable", assignable_id)
         db.commit()
         db.refresh(existing_assignable)
         
@@ -6689,13 +8818,11 @@ async def delete_assignment(
         user = current_user["user"]
         if current_user["role"] == RoleType.STUDENT:
             #Check if assignment end time has passed for student
-            assignable = db.query(Assignable).filter(Assignable.id == assignment.assignable_id).first()
-            if not assignable:
+            deadline_passed = db.query(Assignable.deadline < func.now()).filter(Assignable.id == assignment.assignable_id).scalar()
+            if deadline_passed is None:
                 raise HTTPException(status_code=404, detail="Assignable not found")
             
-            now = datetime.now(timezone.utc)
-            deadline = datetime.fromisoformat(assignable.deadline)
-            if now > deadline:
+            if deadline_passed:
                 raise HTTPException(status_code=400, detail="Cannot delete assignment after deadline")
             
             # For students, check if they belong to the team that submitted
@@ -6710,6 +8837,8 @@ async def delete_assignment(
         
         # Delete the submission record
         db.delete(assignment)
+        db.flush()
+        sync_gradebook_item(db, "assignable", assignment.assignable_id)
         db.commit()
         
         return JSONResponse(status_code=200, content={"message": "Assignment deleted successfully"})
@@ -6750,6 +8879,8 @@ async def grade_assignment(
         
         # Update the submission score
         assignment.score = score
+        db.flush()
+        refresh_gradebook(db, "assignable", "a.id = :assignment_id", assignment_id=assignment.id)
         db.commit()
         
         return JSONResponse(status_code=200, content={
@@ -6764,6 +8895,46 @@ async def grade_assignment(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error grading assignment: {str(e)}")
 
+# this is to grade many assignments at once, done by profs and TAs
+@app.post("/assignables/{assignable_id}/grades/batch")
+async def batch_grade_assignments(
+    assignable_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str = Depends(prof_or_ta_required)
+):
+    """Grade assignments from a JSON list of {roll_no, score} or a CSV with RollNo,score columns"""
+    try:
+        assignable = db.query(Assignable).filter(Assignable.id == assignable_id).first()
+        if not assignable:
+            raise HTTPException(status_code=404, detail="Assignable not found")
+
+        df = await read_batch_grades(request, "roll_no", "RollNo")
+        targets = dict(
+            db.query(Assignment.user_id, Assignment.id)
+            .filter(Assignment.assignable_id == assignable_id)
+            .order_by(Assignment.id)
+            .all()
+        )
+        updates, errors = validate_batch_grades(df, assignable.max_score, targets, "roll number")
+
+        apply_batch_grades(db, "assignments", updates)
+        refresh_gradebook(db, "assignable", "ab.id = :assignable_id", assignable_id=assignable_id)
+        db.commit()
+
+        return JSONResponse(status_code=200, content={
+            "message": f"Graded {len(updates)} assignments",
+            "graded": len(updates),
+            "max_score": assignable.max_score,
+            "errors": errors
+        })
+    except HTTPException as he:
+        db.rollback()
+        raise he
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error grading assignments: {str(e)}")
+
 class UpdateTAsRequest(BaseModel):
     ta_ids: List[int]
 
@@ -6784,7 +8955,7 @@ async def update_team_tas(
         # Verify all TAs exist and are actually TAs
         tas = db.query(User).filter(
             User.id.in_(request.ta_ids),
-            User.role_id == 3  # role_id 3 is for TAs
+            User.role_id == role_id_for(RoleType.TA, db)
         ).all()
 
         if len(tas) != len(request.ta_ids):
@@ -6830,7 +9001,6 @@ async def get_user_data(
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
 
-        print("Decoded payload:", payload)  # Debugging line
         if not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -6846,7 +9016,7 @@ async def get_user_data(
             )
         
         # Fetch the user's role
-        role = db.query(Role).filter(Role.id == user.role_id).first()
+        role = role_for_id(user.role_id, db)
         
         # Fetch the user's team name
         team_name = None
@@ -6860,7 +9030,7 @@ async def get_user_data(
             "name": user.name,
             "email": user.email,
             "username": user.username,
-            "role": role.role.value,
+            "role": role.value,
             "team_name": team_name  # Send team name instead of team ID
         }
     except jwt.ExpiredSignatureError:
@@ -7031,6 +9201,8 @@ async def join_team(
 
     user.team_id = team.id
     team.members.append(user)
+    db.flush()
+    sync_gradebook_members(db, [user.id])
     db.commit()
     db.refresh(team)
 
@@ -7075,6 +9247,8 @@ async def create_team(
     # Add user to the team
     user.team_id = new_team.id
     new_team.members.append(user)
+    db.flush()
+    sync_gradebook_members(db, [user.id])
 
     db.commit()
     db.refresh(new_team)
@@ -7162,21 +9336,8 @@ async def get_all_available_skills(
         #         detail="Only TAs can view and manage skills"
         #     )
 
-        # Query all skills from the database
-        skills = db.query(Skill).all()
-        
-        # Format the response
-        formatted_skills = []
-        for skill in skills:
-            formatted_skills.append({
-                "id": skill.id,
-                "name": skill.name,
-                "bgColor": skill.bgColor,
-                "color": skill.color,
-                "icon": skill.icon
-            })
-
-        return JSONResponse(status_code=200, content=formatted_skills)
+        # Served from the reference-data cache
+        return JSONResponse(status_code=200, content=get_all_skills(db))
 
     except HTTPException as he:
         raise he
@@ -7237,8 +9398,8 @@ async def get_all_tas(db: Session = Depends(get_db)):
     Get all TAs with their skills from the database
     """
     try:
-        # Get all users with role_id = 3 (TAs)
-        ta_role_id = 3  # Assuming 3 is the role_id for TAs
+        # Get all TAs
+        ta_role_id = role_id_for(RoleType.TA, db)
         tas = db.query(User).filter(User.role_id == ta_role_id).all()
         
         result = []
@@ -7387,8 +9548,7 @@ async def get_active_teams(db: Session = Depends(get_db)):
 async def get_number_of_students(db: Session = Depends(get_db)):
     """Get the total number of students."""
     try:
-        # Assuming the role_id for students is 2
-        student_role_id = db.query(Role).filter(Role.role == RoleType.STUDENT).first().id
+        student_role_id = role_id_for(RoleType.STUDENT, db)
         number_of_students = db.query(User).filter(User.role_id == student_role_id).count()
         return {"numberOfStudents": number_of_students}
     except Exception as e:
@@ -0,0 +1,202 @@
+"""
+One-shot migration of the legacy JSON-blob calendars into the row-based tables
+
+global_calendar_events / user_calendar_events / team_calendar_events hold a whole
+calendar as one JSON array. This explodes every blob into one row per event in
+global_calendar / user_calendar / team_calendar.
+
+The tool works in batches of blob rows. Every batch is committed together with
+its progress records, so an interrupted run can simply be restarted and will
+pick up after the last committed batch without duplicating events.
+
+Usage:
+    python migrate_calendar_blobs.py                 # migrate and verify
+    python migrate_calendar_blobs.py --batch-size 50
+    python migrate_calendar_blobs.py --verify-only
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from main import (
+    SessionLocal,
+    GlobalCalendarEvent,
+    UserCalendarEvent,
+    TeamCalendarEvent,
+    NewGlobalCalendarEvent,
+    NewUserCalendarEvent,
+    NewTeamCalendarEvent,
+    Team,
+    User,
+)
+
+# source blob model, target row model, owner column on the target (None for global)
+SOURCES = [
+    (GlobalCalendarEvent, NewGlobalCalendarEvent, None),
+    (UserCalendarEvent, NewUserCalendarEvent, "user_id"),
+    (TeamCalendarEvent, NewTeamCalendarEvent, "team_id"),
+]
+
+PROGRESS_TABLE = "calendar_blob_migration"
+
+
+def ensure_progress_table(db: Session):
+    db.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+            source_table VARCHAR NOT NULL,
+            source_id INTEGER NOT NULL,
+            event_count INTEGER NOT NULL,
+            inserted_count INTEGER NOT NULL,
+            skipped_count INTEGER NOT NULL,
+            migrated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            PRIMARY KEY (source_table, source_id)
+        )
+    """))
+    db.commit()
+
+
+def is_iso_time(value) -> bool:
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except (AttributeError, ValueError):
+        return False
+
+
+def explode_blob(events, owner_column, owner_id):
+    """
+    Turn one JSON blob into insertable rows
+
+    Returns:
+    - (rows, total, skipped): events without a parseable ISO 8601 start and end
+      cannot be stored in the timestamptz columns and are counted as skipped
+    """
+    if not isinstance(events, list):
+        return [], 0, 0
+    rows = []
+    skipped = 0
+    for event in events:
+        if not isinstance(event, dict) or not is_iso_time(event.get("start")) or not is_iso_time(event.get("end")):
+            skipped += 1
+            continue
+        row = {
+            "title": event.get("title") or "Untitled",
+            "subtitle": event.get("subtitle"),
+            "start": event["start"],
+            "end": event["end"],
+        }
+        if owner_column:
+            row[owner_column] = owner_id
+        rows.append(row)
+    return rows, len(events), skipped
+
+
+def owner_exists(db: Session, owner_column, owner_id) -> bool:
+    if owner_column is None:
+        return True
+    owner_model = User if owner_column == "user_id" else Team
+    return db.query(owner_model.id).filter_by(id=owner_id).first() is not None
+
+
+def migrate_source(db: Session, source, target, owner_column, batch_size: int):
+    """Migrate every not-yet-migrated blob row of one source table, batch by batch"""
+    source_table = source.__tablename__
+    last_id = 0
+    totals = {"blobs": 0, "inserted": 0, "skipped": 0}
+    while True:
+        # Keyset pagination over the blob rows that have no progress record yet
+        batch = db.query(source).filter(
+            source.id > last_id,
+            text(f"NOT EXISTS (SELECT 1 FROM {PROGRESS_TABLE} p WHERE p.source_table = :source_table AND p.source_id = {source_table}.id)").bindparams(source_table=source_table)
+        ).order_by(source.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        for blob in batch:
+            owner_id = getattr(blob, "creator_id", None)
+            rows, total, skipped = explode_blob(blob.events, owner_column, owner_id)
+            if rows and not owner_exists(db, owner_column, owner_id):
+                # The owner is gone, the events have nowhere to live
+                skipped, rows = total, []
+            if rows:
+                db.execute(insert(target), rows)
+            db.execute(text(f"""
+                INSERT INTO {PROGRESS_TABLE} (source_table, source_id, event_count, inserted_count, skipped_count)
+                VALUES (:source_table, :source_id, :event_count, :inserted_count, :skipped_count)
+            """), {
+                "source_table": source_table,
+                "source_id": blob.id,
+                "event_count": total,
+                "inserted_count": len(rows),
+                "skipped_count": skipped,
+            })
+            totals["blobs"] += 1
+            totals["inserted"] += len(rows)
+            totals["skipped"] += skipped
+
+        # Rows and progress records of a batch become visible together
+        db.commit()
+        last_id = batch[-1].id
+        print(f"  {source_table}: migrated up to id {last_id}")
+    return totals
+
+
+def verify(db: Session) -> bool:
+    """
+    Check that every event in every blob has been accounted for
+
+    For each source table the number of array elements in the blobs must equal
+    inserted + skipped in the progress records, and the target table must hold
+    at least the inserted rows.
+    """
+    ok = True
+    for source, target, _ in SOURCES:
+        source_table = source.__tablename__
+        expected = db.execute(text(f"""
+            SELECT COUNT(*), COALESCE(SUM(CASE WHEN json_typeof(events) = 'array' THEN json_array_length(events) ELSE 0 END), 0)
+            FROM {source_table}
+        """)).one()
+        recorded = db.execute(text(f"""
+            SELECT COUNT(*), COALESCE(SUM(inserted_count), 0), COALESCE(SUM(skipped_count), 0)
+            FROM {PROGRESS_TABLE} WHERE source_table = :source_table
+        """), {"source_table": source_table}).one()
+        target_rows = db.query(target).count()
+
+        blobs, events = expected
+        migrated_blobs, inserted, skipped = recorded
+        source_ok = blobs == migrated_blobs and events == inserted + skipped and target_rows >= inserted
+        ok = ok and source_ok
+        print(
+            f"{'OK  ' if source_ok else 'FAIL'} {source_table}: {migrated_blobs}/{blobs} blobs, "
+            f"{events} events -> {inserted} inserted + {skipped} skipped, "
+            f"{target.__tablename__} has {target_rows} rows"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate legacy JSON-blob calendars into row tables")
+    parser.add_argument("--batch-size", type=int, default=100, help="blob rows per transaction")
+    parser.add_argument("--verify-only", action="store_true", help="only compare counts, do not migrate")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ensure_progress_table(db)
+        if not args.verify_only:
+            for source, target, owner_column in SOURCES:
+                totals = migrate_source(db, source, target, owner_column, args.batch_size)
+                print(f"{source.__tablename__}: {totals['blobs']} blobs, {totals['inserted']} events inserted, {totals['skipped']} skipped")
+        if not verify(db):
+            print("Verification failed, keep the legacy tables until the mismatch is resolved")
+            sys.exit(1)
+        print("Verification passed, the legacy calendar tables can be dropped")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
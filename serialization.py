@@ -0,0 +1,93 @@
+"""
+Fast JSON for the large list endpoints of main.py
+
+FastAPI runs whatever a route returns through jsonable_encoder, and through
+response_model validation when one is declared, before json.dumps renders it.
+That is a Python-level walk over every row and field. The hot list endpoints
+instead build plain row dicts from column queries and dump them with a
+TypeAdapter compiled once at import, so serialization happens in pydantic-core.
+
+FastJSONResponse renders arbitrary content with pydantic-core as well, and
+passes through bytes already produced by an adapter.
+
+The row types mirror the existing payloads field for field, so clients see the
+same JSON. Timestamps stay the ISO strings the endpoints already returned.
+"""
+from typing import Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from typing_extensions import TypedDict
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by pydantic-core instead of json.dumps"""
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content  # already dumped by a TypeAdapter
+        return to_json(content)
+
+
+class PersonRow(TypedDict):
+    id: int
+    name: str
+    email: str
+    role: str
+
+
+class MessageRow(TypedDict):
+    id: int
+    content: str
+    sender_id: Optional[int]
+    sender_name: Optional[str]
+    channel_id: Optional[int]
+    created_at: Optional[str]
+    message_type: Optional[str]
+    file_name: Optional[str]
+
+
+class GradeableScoreRow(TypedDict):
+    id: int
+    gradeable_id: int
+    user_id: int
+    name: Optional[str]
+    score: int
+
+
+class ReferenceFile(TypedDict):
+    file_url: str
+    original_filename: str
+
+
+class SubmittableRow(TypedDict):
+    id: int
+    title: str
+    description: str
+    opens_at: Optional[str]
+    deadline: str
+    max_score: int
+    created_at: Optional[str]
+    reference_files: List[ReferenceFile]
+
+
+class AnnouncementRow(TypedDict):
+    id: int
+    creator_id: int
+    created_at: Optional[str]
+    title: str
+    content: str
+    url_name: Optional[str]
+    creator_name: Optional[str]
+
+
+PEOPLE_ADAPTER = TypeAdapter(List[PersonRow])
+MESSAGES_ADAPTER = TypeAdapter(List[MessageRow])
+GRADEABLE_SCORES_ADAPTER = TypeAdapter(List[GradeableScoreRow])
+SUBMITTABLES_BY_STATUS_ADAPTER = TypeAdapter(Dict[str, List[SubmittableRow]])
+ANNOUNCEMENTS_ADAPTER = TypeAdapter(List[AnnouncementRow])
+
+
+def fast_json(adapter: TypeAdapter, rows, status_code: int = 200) -> FastJSONResponse:
+    """Dump rows with a precompiled adapter into a response, skipping jsonable_encoder"""
+    return FastJSONResponse(adapter.dump_json(rows), status_code=status_code)
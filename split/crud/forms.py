@@ -6,8 +6,11 @@ from ..schemas.form_schemas import FormCreateRequest, FormResponseSubmit
 from fastapi import HTTPException, Depends
 from datetime import datetime, timezone
 import json
+import logging
 from ..database.db   import get_db
 
+logger = logging.getLogger("sahara.forms")
+
 def create_form_db(form_data: FormCreateRequest, db: Session) -> Dict[str, Any]:
     """
     Create a new form in the database
@@ -46,7 +49,7 @@ def create_form_db(form_data: FormCreateRequest, db: Session) -> Dict[str, Any]:
         }
     except Exception as e:
         db.rollback()
-        print(f"error creating form: {str(e)}")
+        logger.exception("Error creating form")
         raise HTTPException(status_code=500, detail=f"Error creating form: {str(e)}")
 
 def store_form_response_db(response_data: FormResponseSubmit, 
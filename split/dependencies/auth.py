@@ -9,6 +9,7 @@ from ..dependencies.get_db import get_db
 from ..schemas.auth_schemas import RoleType
 from ..models.channel import Channel
 from ..models.team_ta import Team_TA
+from .auth_context import record_auth_context
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
@@ -27,7 +28,6 @@ def get_verified_user(token: str = Depends(oauth2_scheme)):
 
 
 def get_current_user_from_string(token: str, db: Session):
-    print("In here")
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -68,6 +68,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
     
     role = db.query(Role).filter(Role.id == user.role_id).first().role
+    record_auth_context(user.id, role)
     
     return {"user": user, "role": role}
 
@@ -86,6 +87,7 @@ def prof_required(token: str = Depends(oauth2_scheme), db: Session = Depends(get
         role = db.query(Role).filter(Role.id == user.role_id).first()
         if role.role != RoleType.PROF:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized, professor access required")
+        record_auth_context(user.id, role.role)
             
         return payload
     except jwt.PyJWTError:
@@ -109,6 +111,7 @@ def prof_or_ta_required(token: str = Depends(oauth2_scheme), db: Session = Depen
                 status_code=status.HTTP_403_FORBIDDEN, 
                 detail="Not authorized, professor or TA access required"
             )
+        record_auth_context(user.id, role.role)
         return payload
     except jwt.PyJWTError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
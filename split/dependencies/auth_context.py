@@ -0,0 +1,56 @@
+from contextvars import ContextVar
+from typing import Optional
+from ..models.roles import RoleType
+
+
+class AuthContext:
+    """
+    Who is making the current HTTP request
+
+    AuthContextMiddleware installs an empty one per request and the auth
+    dependencies fill it in, so ORM validators can check the acting user's
+    role without opening a session of their own.
+    """
+    __slots__ = ("user_id", "role")
+
+    def __init__(self):
+        self.user_id = None
+        self.role = None
+
+# Sync dependencies and routes run in a threadpool on a copy of the context,
+# so the dependencies mutate the shared AuthContext instead of calling set()
+auth_context: ContextVar[Optional[AuthContext]] = ContextVar("auth_context", default=None)
+
+def record_auth_context(user_id: int, role):
+    """Attach the authenticated user to the current request, if there is one"""
+    context = auth_context.get()
+    if context is not None:
+        context.user_id = user_id
+        context.role = role
+
+def reject_student_creator(message: str):
+    """
+    Raise ValueError from a validator when the acting user is a student
+
+    Outside a request (startup seeding, scripts) there is no acting user and
+    the object is allowed, like before when the creator could not be found.
+    """
+    context = auth_context.get()
+    if context is not None and context.role == RoleType.STUDENT:
+        raise ValueError(message)
+
+
+class AuthContextMiddleware:
+    """Give every HTTP request its own, initially anonymous, AuthContext"""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = auth_context.set(AuthContext())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            auth_context.reset(token)
@@ -55,6 +55,9 @@ from .schemas.skill_schemas import (
 )
 from .database.db import Base
 from .dependencies.get_db import get_db
+from .dependencies.auth_context import AuthContextMiddleware
+import logging
+from logging_config import setup_logging, RequestIdMiddleware
 from .dependencies.auth import prof_or_ta_required, prof_required, get_current_user, get_verified_user, validate_channel_access
 from .database.init import create_default_roles, create_default_admin
 from .config.config import engine
@@ -66,6 +69,9 @@ from .routers import (
     api_quiz, api_announcements, api_auth, api_files
 )
 
+setup_logging()
+logger = logging.getLogger("sahara")
+
 app = FastAPI()
 # CORS Middleware
 app.add_middleware(
@@ -75,10 +81,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(AuthContextMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
-print("Creating tables...")
+logger.info("Creating tables...")
 Base.metadata.create_all(bind=engine)
-print("Tables created!")
+logger.info("Tables created!")
 
 
 
@@ -2,9 +2,8 @@ from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship, validates
 from datetime import datetime, timezone
 from ..database.db import Base
-from ..config.config import SessionLocal
+from ..dependencies.auth_context import reject_student_creator
 from ..models.user import User
-from ..models.roles import RoleType
 
 class Announcement(Base):
     __tablename__ = "announcements"
@@ -17,8 +16,5 @@ class Announcement(Base):
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create announcements.")
+        reject_student_creator("Students cannot create announcements.")
         return value
\ No newline at end of file
@@ -2,9 +2,8 @@ from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship, validates
 from datetime import datetime, timezone
 from ..database.db import Base
-from ..config.config import SessionLocal
+from ..dependencies.auth_context import reject_student_creator
 from ..models.user import User
-from ..models.roles import RoleType
 
 class Assignable(Base):
     __tablename__ = "assignables"
@@ -23,8 +22,5 @@ class Assignable(Base):
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as db:
-            user = db.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Only professors or TAs can create assignables.")
+        reject_student_creator("Only professors or TAs can create assignables.")
         return value
\ No newline at end of file
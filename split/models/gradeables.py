@@ -2,9 +2,8 @@ from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
 from sqlalchemy.orm import relationship, validates
 from datetime import datetime, timezone
 from ..database.db import Base
-from ..config.config import SessionLocal
+from ..dependencies.auth_context import reject_student_creator
 from ..models.user import User
-from ..models.roles import RoleType
 
 
 class Gradeable(Base):
@@ -22,9 +21,6 @@ class Gradeable(Base):
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create gradeables.")
+        reject_student_creator("Students cannot create gradeables.")
         return value
 
@@ -2,9 +2,8 @@ from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON
 from sqlalchemy.orm import relationship, validates
 from datetime import datetime, timezone
 from ..database.db import Base
-from ..config.config import SessionLocal
+from ..dependencies.auth_context import reject_student_creator
 from ..models.user import User
-from ..models.roles import RoleType
 
 class TeamCalendarEvent(Base):
     __tablename__ = "team_calendar_events"
@@ -20,10 +19,7 @@ class TeamCalendarEvent(Base):
 
     @validates("creator_id")
     def validate_creator(self, key, value):
-        with SessionLocal() as session:
-            user = session.query(User).filter_by(id=value).first()
-            if user and user.role.role == RoleType.STUDENT:
-                raise ValueError("Students cannot create calendar events.")
+        reject_student_creator("Students cannot create calendar events.")
         return value
 
 class NewTeamCalendarEvent(Base):
@@ -36,20 +36,15 @@ async def create(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    print(f"DEBUG: POST / route called - title: {title}, description length: {len(description)}")
-    print(f"DEBUG: Request file: {file.filename if file else 'No file'}")
-    print(f"DEBUG: Current user role: {current_user['role'].value}")
     try:
         # Check if user is professor
         if current_user["role"].value != "prof":
-            print(f"DEBUG: Permission denied - user role: {current_user['role'].value}")
             raise HTTPException(
                 status_code=403,
                 detail="Only professors can create announcements"
             )
             
         user = current_user["user"]
-        print(f"DEBUG: User ID: {user.id}, Username: {user.username}")
         # Create announcement
         announcement = Announcement(
             title=title,
@@ -57,7 +52,6 @@ async def create(
             creator_id=user.id,
             created_at=datetime.now(timezone.utc).isoformat()
         )
-        print(f"DEBUG: Created announcement object with title: {title}")
 
 
         # Handle file upload if provided
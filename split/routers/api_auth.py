@@ -14,9 +14,11 @@ from ..schemas.auth_schemas import ResetPasswordRequest, CreateProfRequest
 from ..dependencies.auth import prof_required, prof_or_ta_required
 from ..utils.auth import create_hashed_password, generate_random_string, extract_students
 from ..utils.csv import CSVFormatError, extract_student_data_from_content, extract_ta_data_from_content
-import traceback
+import logging
 from ..schemas.auth_schemas import TempRegisterRequest
 
+logger = logging.getLogger("sahara.auth")
+
 router = APIRouter(
     prefix="",
     tags=["API Auth"]
@@ -56,7 +58,7 @@ def login(request: Annotated[OAuth2PasswordRequestForm, Depends()], db: Session
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        logger.exception("Login error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -90,7 +92,7 @@ def reset_password(
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Reset password error: {str(e)}")
+        logger.exception("Reset password error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -148,7 +150,7 @@ def create_prof(
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Create professor error: {str(e)}")
+        logger.exception("Create professor error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -186,19 +188,13 @@ async def upload_students(
         # Process each student
         for student in students:
             try:
-                # Debug: Log the student being processed
-                print(f"Processing student: {student}")
-
                 # extract username from email
                 username = student['Email'].split('@')[0]
-                # Debug: Log the extracted username
-                print(f"Extracted username: {username}")
 
                 # Check if username already exists
                 existing_user = db.query(User).filter(User.username == username).first()
                 if (existing_user):
                     errors.append(f"Username {username} already exists")
-                    print(f"Error: Username {username} already exists")
                     continue
                 
                 # Generate random password
@@ -210,8 +206,6 @@ async def upload_students(
                     user_id = student['RollNo']
                 else:
                     user_id = None
-                # Debug: Log the user ID being assigned
-                print(f"Assigned user ID: {user_id}")
 
                 new_student = User(
                     id=user_id,
@@ -234,13 +228,10 @@ async def upload_students(
                     "username": username,
                     "temp_password": temp_password
                 })
-                # Debug: Log successful creation
-                print(f"Successfully created student: {new_student}")
                 
             except Exception as e:
                 errors.append(f"Error processing student {student}: {str(e)}")
-                # Debug: Log the exception
-                print(f"Exception occurred: {str(e)}")
+                logger.warning("Could not create student %s: %s", student.get('Email'), e)
         
         return {
             "message": f"Processed {len(created_students)} students",
@@ -255,7 +246,7 @@ async def upload_students(
             detail=f"CSV format error: {str(e)}"
         )
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Error processing student CSV")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing CSV file: {str(e)}"
@@ -10,7 +10,6 @@ from typing import List, Any
 from pydantic import BaseModel
 from ..models.roles import RoleType
 from ..dependencies.auth import get_current_user
-from ..crud.calendar import get_global_events, overwrite_global_events
 from ..models.global_calendar_event import NewGlobalCalendarEvent
 from ..models.user_calendar_event import NewUserCalendarEvent
 router = APIRouter(
@@ -143,33 +142,6 @@ def create_calendar(
     
     
 
-@router.post("/update")
-def update_calendar(
-    calendar_update_model: CalendarUpdateModel,
-    db: Session = Depends(get_db),
-    # user_id: int = Depends(resolve_token)
-):
-    # user = db.query(User).filter_by(id=user_id).first()
-    print(calendar_update_model.events)
-    global_events = calendar_update_model.events
-    # global_events, personal_events, team_events = split_events(calendar_update_model.events)
-    print(global_events)
-    overwrite_global_events(global_events, db)
-    return {"message": "Calendar updated"}
-    # if user.role == RoleType.PROF:
-    #     overwrite_global_events(events, db)
-    # elif user.role == RoleType.STUDENT:
-    #     overwrite_personal_events(user, events, db)
-    # elif user.role == RoleType.TA:
-    #     overwrite_team_events(user, events, db)
-    # return {"message": "Calendar updated"}
-    # if the role is admin
-    # select all the global events
-
-    # overwrite_global_events
-    
-    pass
-
 @router.get("/")
 def get_calendar(
     current_user: User = Depends(get_current_user),
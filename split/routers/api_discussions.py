@@ -239,7 +239,6 @@ async def websocket_endpoint(
     user = current_user_data["user"]
     
     # Validate user's access to the channel
-    print(f"User: {user.username}, Channel ID: {channel_id}")
     if not validate_channel_access(user, channel_id, db):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
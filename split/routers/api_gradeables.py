@@ -162,21 +162,16 @@ async def create_gradeable(
     """Create a new gradeable"""
     username = user_data.get('sub')
     user = db.query(User).filter(User.username == username).first()
-    print("2137")
     try:
-        print("Title is", title, "Max points is", max_points, "Creator ID is", user.id)
         new_gradeable = Gradeable(
             title=title,
             max_points=int(max_points),
             creator_id=user.id
         )
         
-        print("Hello")
         db.add(new_gradeable)
         db.commit()
         db.refresh(new_gradeable)
-        print(new_gradeable.id)
-        print("HELLO")
 
         # Read and parse file content
         content = await file.read()
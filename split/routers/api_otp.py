@@ -6,7 +6,7 @@ from ..schemas.auth_schemas import RequestOTPModel, VerifyOTPModel, ResetPasswor
 from ..utils.otp import generate_secure_otp, hash_otp, verify_otp
 from datetime import datetime, timezone, timedelta
 from ..models.user_otp import UserOTP
-import traceback
+import logging
 from email.mime.multipart import MIMEMultipart
 from email.utils import formatdate
 from email.mime.text import MIMEText
@@ -16,6 +16,8 @@ from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+logger = logging.getLogger("sahara.otp")
+
 router = APIRouter(
     
     tags=["OTP"]
@@ -49,54 +51,36 @@ def send_email(to_email, subject, html_content):
         # Attach HTML content
         msg.attach(MIMEText(html_content, 'html'))
         
-        print(f"Attempting to send email to {to_email}")
-        
         # Connect to SMTP server with more detailed error handling
         try:
-            # Enable debug output
             server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
-            server.set_debuglevel(1)  # Add this line to enable verbose debug output
-            print(f"Connected to SMTP server: {EMAIL_HOST}:{EMAIL_PORT}")
-            
             if EMAIL_USE_TLS:
                 server.starttls()
-                print("TLS encryption enabled")
-            
-            print(f"Logging in with user: {EMAIL_HOST_USER}")
             server.login(EMAIL_HOST_USER, EMAIL_HOST_PASSWORD)
-            print("Login successful")
-            
-            # Send email - more detailed debugging
-            print(f"Sending mail from {EMAIL_HOST_USER} to {to_email}")
-            result = server.sendmail(EMAIL_HOST_USER, to_email, msg.as_string())
-            print(f"Email sent successfully to {to_email}")
-            print(f"Server response: {result if result else 'No response (success)'}")
+            server.sendmail(EMAIL_HOST_USER, to_email, msg.as_string())
             server.quit()
-            
+            logger.info("Email sent", extra={"to": to_email})
             return True
         except smtplib.SMTPAuthenticationError as auth_err:
-            print(f"SMTP Authentication Error: {str(auth_err)}")
+            logger.error("SMTP authentication error: %s", auth_err)
             return False
         except smtplib.SMTPRecipientsRefused as ref_err:
-            print(f"Recipients refused: {str(ref_err)}")
+            logger.warning("Recipients refused: %s", ref_err, extra={"to": to_email})
             return False
         except smtplib.SMTPSenderRefused as send_err:
-            print(f"Sender refused: {str(send_err)}")
+            logger.error("Sender refused: %s", send_err)
             return False
         except smtplib.SMTPDataError as data_err:
-            print(f"SMTP data error: {str(data_err)}")
+            logger.error("SMTP data error: %s", data_err)
             return False
         except smtplib.SMTPException as smtp_e:
-            print(f"SMTP Error: {str(smtp_e)}")
+            logger.error("SMTP error: %s", smtp_e)
             return False
-        except Exception as conn_e:
-            print(f"Connection error: {str(conn_e)}")
-            print(f"Error type: {type(conn_e).__name__}")
-            print(f"Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Connection error while sending email", extra={"to": to_email})
             return False
-    except Exception as e:
-        print(f"Failed to prepare email: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+    except Exception:
+        logger.exception("Failed to prepare email")
         return False
 
 # Create HTML email template for OTP
@@ -165,7 +149,7 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         if not user:
             # For security, we return a similar message but with a special status code
             # that the frontend can use to show a helpful message
-            print(f"OTP request for non-existent email: {request.email}")
+            logger.info("OTP requested for unknown email")
             return {
                 "message": "If the email exists in our system, a verification code has been sent. Please check your spam folder if you don't see it in your inbox.",
                 "status": "user_not_found"  # Changed this to be more semantic
@@ -173,7 +157,6 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         
         # Generate secure OTP
         plain_otp = generate_secure_otp(6)
-        print(f"Generated OTP for {user.email}: {plain_otp}")  # Only log during development
         
         # Hash the OTP for secure storage
         hashed_otp = hash_otp(plain_otp)
@@ -206,15 +189,13 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         
         # Send email with OTP
         try:
-            print(f"Attempting to send email to {user.email} with OTP: {plain_otp}")
             email_sent = send_email(user.email, email_subject, email_html)
         except Exception as e:
-            print(f"Exception during email sending: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Exception during email sending")
             email_sent = False
         
         if not email_sent:
-            print(f"Failed to send OTP email to {user.email}")
+            logger.warning("Failed to send OTP email", extra={"user_id": user.id})
             return {
                 "message": "If the email exists in our system, a verification code has been sent. Please check your spam folder if you don't see it in your inbox.",
                 "status": "email_attempted" # For debugging purposes
@@ -230,8 +211,7 @@ async def request_otp(request: RequestOTPModel, db: Session = Depends(get_db)):
         raise he
     except Exception as e:
         db.rollback()
-        print(f"Error in request_otp: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error in request_otp")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process your request. Please try again."
@@ -287,7 +267,7 @@ async def verify_otp_endpoint(request: VerifyOTPModel, db: Session = Depends(get
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"Error in verify_otp: {e}")
+        logger.exception("Error in verify_otp")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to verify OTP. Please try again."
@@ -363,7 +343,7 @@ async def reset_password_with_otp(request: ResetPasswordWithOTPModel, db: Sessio
         raise he
     except Exception as e:
         db.rollback()
-        print(f"Error in reset_password_with_otp: {e}")
+        logger.exception("Error in reset_password_with_otp")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to reset password. Please try again."
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import logging
 import pandas as pd
 from sqlalchemy.orm import Session
 from typing import List
@@ -25,6 +26,8 @@ class JoinTeamModel(BaseModel):
 class TeamCreateModel(BaseModel):
     name: str
 
+logger = logging.getLogger("sahara.csv")
+
 router = APIRouter()
 
 #this endpoint is also not used in the frontend
@@ -313,7 +316,6 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
 
         # Validate the CSV format
         required_columns = ['team_name', 'member1', 'member2', 'member3', 'member4', 'member5', 'member6', 'member7', 'member8', 'member9', 'member10']
-        print(df.columns)
         for _column_name in required_columns:
             if _column_name not in df.columns:
                 raise HTTPException(status_code=400, detail=f"Invalid CSV format. Missing column: {_column_name}")
@@ -345,8 +347,7 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
             members_set.append(members)
 
         team_names = list(team_names)
-        print("Team names: ", team_names)
-        print("Members set:", members_set)
+        logger.info("Creating teams from CSV", extra={"teams": len(team_names)})
         
         for i in range(len(team_names)):
             team_name = team_names[i]
@@ -361,7 +362,6 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
             # Now add users to the team with the valid team ID
             for member in members:
                 user = db.query(User).filter_by(username=member).first()
-                print("Over here")
                 if user:
                     team.members.append(user)
                     user.team_id = team.id  # Now team.id is valid
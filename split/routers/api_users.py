@@ -206,7 +206,6 @@ async def get_user_data(
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
 
-        print("Decoded payload:", payload)  # Debugging line
         if not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,7 +73,6 @@ def extract_students(content: str) -> List[dict]:
 
         for student in students:
             if not student['RollNo'] or not student['Name'] or not student['Email']:
-                print(student)
                 raise CSVFormatError("All fields must be filled for each student.")
         
         return students
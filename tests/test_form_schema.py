@@ -0,0 +1,90 @@
+import fastjsonschema
+import pytest
+
+from form_schema import build_form_response_schema, iter_form_questions
+
+
+def validator(*elements, **page):
+    return fastjsonschema.compile(build_form_response_schema({"pages": [{"name": "p1", "elements": list(elements), **page}]}))
+
+
+def test_required_question_must_be_answered():
+    validate = validator({"type": "text", "name": "q1", "isRequired": True})
+    validate({"q1": "x"})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({})
+
+
+@pytest.mark.parametrize("condition", ["visibleIf", "enableIf", "requiredIf"])
+def test_conditional_required_question_may_be_missing(condition):
+    validate = validator(
+        {"type": "boolean", "name": "has_team"},
+        {"type": "text", "name": "team", "isRequired": True, condition: "{has_team} = true"},
+    )
+    validate({"has_team": False})
+
+
+def test_question_in_conditional_panel_may_be_missing():
+    validate = validator({
+        "type": "panel", "name": "extra", "visibleIf": "{q0} = 'yes'",
+        "elements": [{"type": "text", "name": "q1", "isRequired": True}],
+    })
+    validate({})
+
+
+def test_question_on_conditional_page_may_be_missing():
+    validate = validator({"type": "text", "name": "q1", "isRequired": True}, visibleIf="{q0} = 'yes'")
+    validate({})
+
+
+@pytest.mark.parametrize("flag", ["showNoneItem", "hasNone"])
+@pytest.mark.parametrize("question_type", ["radiogroup", "dropdown"])
+def test_none_item_is_accepted_for_single_choice(flag, question_type):
+    validate = validator({"type": question_type, "name": "q1", "choices": ["a", "b"], flag: True})
+    validate({"q1": "none"})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({"q1": "c"})
+
+
+def test_none_item_is_accepted_for_checkbox():
+    validate = validator({"type": "checkbox", "name": "q1", "choices": [{"value": "a"}, {"value": "b"}], "showNoneItem": True})
+    validate({"q1": ["none"]})
+    validate({"q1": ["a", "b"]})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({"q1": ["c"]})
+
+
+def test_none_is_rejected_without_the_flag():
+    validate = validator({"type": "radiogroup", "name": "q1", "choices": ["a", "b"]})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({"q1": "none"})
+
+
+def test_boolean_with_custom_values():
+    validate = validator({"type": "boolean", "name": "q1", "valueTrue": "yes", "valueFalse": "no"})
+    validate({"q1": "yes"})
+    validate({"q1": "no"})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({"q1": "maybe"})
+
+
+def test_boolean_with_only_value_true_keeps_false():
+    validate = validator({"type": "boolean", "name": "q1", "valueTrue": "agreed"})
+    validate({"q1": "agreed"})
+    validate({"q1": False})
+
+
+def test_plain_boolean_requires_json_boolean():
+    validate = validator({"type": "boolean", "name": "q1"})
+    validate({"q1": True})
+    with pytest.raises(fastjsonschema.JsonSchemaException):
+        validate({"q1": "yes"})
+
+
+def test_iter_form_questions_skips_containers():
+    form = {"pages": [{"name": "p1", "elements": [
+        {"type": "panel", "name": "panel", "elements": [{"type": "text", "name": "q1"}]},
+        {"type": "html", "name": "intro"},
+        {"type": "rating", "name": "q2"},
+    ]}]}
+    assert [question["name"] for question in iter_form_questions(form)] == ["q1", "q2"]